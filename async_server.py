@@ -0,0 +1,307 @@
+import asyncio
+import logging
+
+from config import (
+    HOST,
+    PORT,
+    OUTPUT_GAME_RESULT_FILE,
+    SERVER_SIM_WAIT_BETWEEN_GAMES,
+    DEFAULT_NUM_PLAYERS,
+    DEFAULT_TURN_TIMEOUT,
+    DEFAULT_BLIND_AMOUNT,
+    DEFAULT_BLIND_MULTIPLIER,
+    DEFAULT_BLIND_INCREASE_INTERVAL,
+    DEFAULT_INITIAL_MONEY
+)
+from framing import NEWLINE_FRAMING, read_stream_message
+from server import PokerEngineServer, TURN_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPokerEngineServer(PokerEngineServer):
+    """
+    asyncio transport for the poker engine.
+
+    Runs the same game flow as PokerEngineServer (see game_flow) but reads
+    player actions from StreamReaders under asyncio.wait_for, so a
+    slow client only delays its own table and turn_timeout is honoured.
+    Several servers can share one event loop. Clients speak the same
+    newline-delimited (or length-prefixed) JSON protocol as with the threaded server.
+    """
+
+    def __init__(self,
+                 host: str = HOST,
+                 port: int = PORT,
+                 num_players: int = DEFAULT_NUM_PLAYERS,
+                 turn_timeout: int = DEFAULT_TURN_TIMEOUT,
+                 debug: bool = False,
+                 sim: bool = False,
+                 blind_amount: int = DEFAULT_BLIND_AMOUNT,
+                 blind_multiplier: float = DEFAULT_BLIND_MULTIPLIER,
+                 blind_increase_interval: int = DEFAULT_BLIND_INCREASE_INTERVAL,
+                 initial_money: int = DEFAULT_INITIAL_MONEY,
+                 framing: str = NEWLINE_FRAMING):
+        super().__init__(host, port, num_players, turn_timeout, debug, sim, blind_amount,
+                         blind_multiplier, blind_increase_interval, initial_money, framing)
+        self.players_ready = None  # asyncio.Event, created inside the running loop
+
+    def create_server_socket(self):
+        # The listening socket is created by asyncio.start_server in serve()
+        return None
+
+    def start_server(self):
+        """Blocking entry point, runs serve() in a new event loop"""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        self.server_socket = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server_socket.sockets[0].getsockname()[1]  # Resolve port 0 to the bound port
+
+        logger.info(f"Server started on {self.host}:{self.port}")
+        print(f"Server started on {self.host}:{self.port}")
+        logger.info(f"Waiting for {self.required_players} players to join...")
+        print(f"Waiting for {self.required_players} players to join...")
+        if not self.sim:
+            self.remove_file_content(OUTPUT_GAME_RESULT_FILE)
+            self.append_to_file(OUTPUT_GAME_RESULT_FILE, "RUNNING")
+
+        await self.run_table()
+
+    async def run_table(self):
+        """Wait for the table to fill up, then play. Used directly by TableManager."""
+        try:
+            await self.get_players_ready().wait()
+            if self.running:
+                await self.run_continuous_games()
+        finally:
+            if self.running:
+                self.stop_server()
+
+    def get_players_ready(self) -> asyncio.Event:
+        if self.players_ready is None:
+            self.players_ready = asyncio.Event()
+        return self.players_ready
+
+    def is_accepting_players(self) -> bool:
+        return self.running and len(self.player_connections) < self.required_players
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if not self.is_accepting_players():
+            writer.close()
+            return
+
+        address = writer.get_extra_info('peername')
+        player_id = self.generate_player_id()
+        self.connection_count += 1
+        self.player_order[player_id] = self.connection_count  # hold true order of players
+        self.player_connections[player_id] = writer
+        self.player_readers[player_id] = reader
+        self.player_addresses[player_id] = address
+
+        if player_id not in self.player_money:
+            self.player_money[player_id] = self.initial_money
+            self.player_delta[player_id] = 0
+
+        logger.info(f"Player {player_id} connected from {address} with {self.player_money[player_id]} money (delta: {self.player_delta[player_id]})")
+        print(f"Player {player_id} connected from {address} with {self.player_money[player_id]} money (delta: {self.player_delta[player_id]})")
+
+        with self.game_lock:
+            self.game.add_player(player_id)
+
+        if len(self.player_connections) == self.required_players:
+            self.get_players_ready().set()
+
+    def stop_server(self):
+        self.running = False
+        if self.server_socket is not None:
+            self.server_socket.close()
+        for writer in self.player_connections.values():
+            writer.close()
+        if self.players_ready is not None:
+            self.players_ready.set()
+        if self.log_sink is not None:
+            self.log_sink.flush()
+
+        # A table of a TableManager leaves the shared status file to the manager
+        if self.sim and self.table_id is None:
+            self.replace_running_with_done()
+
+        logger.info("Server stopped.")
+        print("Server stopped.")
+
+    def send_bytes(self, conn, data: bytes):
+        if not conn.is_closing():
+            conn.write(data)
+
+    def remove_player(self, player_id):
+        if player_id in self.player_connections:
+            self.player_connections[player_id].close()
+            del self.player_connections[player_id]
+            del self.player_readers[player_id]
+            del self.player_addresses[player_id]
+            logger.info(f"Player {player_id} disconnected.")
+            print(f"Player {player_id} disconnected.")
+
+    async def receive_action(self, player_id):
+        """Same contract as PokerEngineServer.receive_action, without blocking the loop"""
+        try:
+            # Flush what we queued for this player (including the action request) first
+            await self.player_connections[player_id].drain()
+            return await asyncio.wait_for(read_stream_message(self.player_readers[player_id], self.framing), self.turn_timeout)
+        except asyncio.TimeoutError:
+            return TURN_TIMEOUT
+        except Exception as e:
+            return e
+
+    async def run_single_game(self):
+        """Run a single game"""
+        flow = self.game_flow()
+        try:
+            player_id = next(flow)
+            while True:
+                player_id = flow.send(await self.receive_action(player_id))
+        except StopIteration:
+            pass
+
+    async def run_continuous_games(self):
+        """Run multiple games with the same connections"""
+        while self.running and len(self.player_connections) >= self.required_players:
+            self.game_count += 1
+            logger.info(f"=== Starting Game #{self.game_count} ===")
+            print(f"\n=== Starting Game #{self.game_count} ===")
+
+            if hasattr(self, 'simulation_rounds') and self.game_count > self.simulation_rounds:
+                logger.info(f"Reached simulation limit of {self.simulation_rounds} games. Stopping.")
+                print(f"Reached simulation limit of {self.simulation_rounds} games. Stopping.")
+                break
+
+            self.reset_game_state()
+            await self.run_single_game()
+            self.rotate_dealer_button()
+
+            if len(self.player_connections) < self.required_players:
+                logger.warning("Not enough players remaining, stopping server.")
+                print("Not enough players remaining, stopping server.")
+                break
+
+            await asyncio.sleep(SERVER_SIM_WAIT_BETWEEN_GAMES)
+
+        logger.info("Game session ended.")
+        print("Game session ended.")
+        await self.drain_all()
+        self.stop_server()
+
+    async def drain_all(self):
+        """Wait until everything queued for the players has been written"""
+        await asyncio.gather(*(writer.drain() for writer in self.player_connections.values()), return_exceptions=True)
+
+
+class TableManager:
+    """
+    Hosts many independent tables behind one listening socket.
+
+    Each table is an AsyncPokerEngineServer without a listener of its own, so
+    game, dealer button, blind schedule and player money stay per table. New
+    connections are seated at the first table that still has a free seat.
+    """
+
+    def __init__(self,
+                 host: str = HOST,
+                 port: int = PORT,
+                 num_tables: int = 1,
+                 num_players: int = DEFAULT_NUM_PLAYERS,
+                 turn_timeout: int = DEFAULT_TURN_TIMEOUT,
+                 debug: bool = False,
+                 sim: bool = False,
+                 blind_amount: int = DEFAULT_BLIND_AMOUNT,
+                 blind_multiplier: float = DEFAULT_BLIND_MULTIPLIER,
+                 blind_increase_interval: int = DEFAULT_BLIND_INCREASE_INTERVAL,
+                 initial_money: int = DEFAULT_INITIAL_MONEY,
+                 framing: str = NEWLINE_FRAMING,
+                 simulation_rounds: int = None):
+        self.host = host
+        self.port = port
+        self.sim = sim
+        self.server_socket = None
+        self.tables = []
+        for table_id in range(num_tables):
+            table = AsyncPokerEngineServer(host, port, num_players, turn_timeout, debug, sim, blind_amount,
+                                           blind_multiplier, blind_increase_interval, initial_money, framing)
+            table.table_id = table_id
+            if simulation_rounds is not None:
+                table.simulation_rounds = simulation_rounds
+            self.tables.append(table)
+
+    @property
+    def simulation_rounds(self):
+        return self.tables[0].simulation_rounds
+
+    @simulation_rounds.setter
+    def simulation_rounds(self, rounds: int):
+        for table in self.tables:
+            table.simulation_rounds = rounds
+
+    @property
+    def deck_pool(self):
+        return self.tables[0].deck_pool
+
+    @deck_pool.setter
+    def deck_pool(self, deck_pool):
+        # DeckPool is thread-safe, one pool serves every table
+        for table in self.tables:
+            table.deck_pool = deck_pool
+
+    @property
+    def log_sink(self):
+        return self.tables[0].log_sink
+
+    @log_sink.setter
+    def log_sink(self, log_sink):
+        # Sinks are thread-safe, all tables write to the same stream
+        for table in self.tables:
+            table.log_sink = log_sink
+
+    def start_server(self):
+        """Blocking entry point, runs serve() in a new event loop"""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        table_tasks = [asyncio.create_task(table.run_table()) for table in self.tables]
+        self.server_socket = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server_socket.sockets[0].getsockname()[1]
+
+        logger.info(f"Table manager started on {self.host}:{self.port} with {len(self.tables)} tables")
+        print(f"Table manager started on {self.host}:{self.port} with {len(self.tables)} tables")
+        if not self.sim:
+            self.tables[0].remove_file_content(OUTPUT_GAME_RESULT_FILE)
+            self.tables[0].append_to_file(OUTPUT_GAME_RESULT_FILE, "RUNNING")
+
+        try:
+            await asyncio.gather(*table_tasks)
+        finally:
+            self.stop_server()
+        # Only now has every table finished its games
+        if self.sim:
+            self.tables[0].replace_running_with_done()
+
+    def table_for_new_connection(self):
+        for table in self.tables:
+            if table.is_accepting_players():
+                return table
+        return None
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        table = self.table_for_new_connection()
+        if table is None:
+            logger.warning("All tables are full, rejecting connection")
+            writer.close()
+            return
+        await table.handle_connection(reader, writer)
+
+    def stop_server(self):
+        if self.server_socket is not None:
+            self.server_socket.close()
+        for table in self.tables:
+            if table.running:
+                table.stop_server()
@@ -1,64 +1,267 @@
+import queue
+import random
+import threading
+from array import array
+
 from eval7 import Deck, Card
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, DeckPool falls back to random.Random
+    np = None
+
+SEED_BITS = 63  # Fits a signed 64-bit integer
+DECK_SIZE = 52
+DECK_POOL_BATCH_SIZE = 4096  # Permutations generated at once by a DeckPool
+DECK_POOL_PREFETCH = 2  # Batches the background thread keeps ready
+
+# The 52 cards in eval7's deck order (2c, 2d, 2h, 2s, 3c, ...), so a card's
+# code is rank * 4 + suit. Dealt cards are these shared objects, no per-deal
+# Card construction.
+CARDS = tuple(Deck().cards)
+
+
+def card_code(card: Card) -> int:
+    """0-51 code of an eval7 card"""
+    return card.rank * 4 + card.suit
+
+
+def code_to_card(code: int) -> Card:
+    """eval7 card for a 0-51 code"""
+    return CARDS[code]
+
+
 class PokerDeck():
     """
     A deck of cards for playing poker.
-    Wrapper for extensible integration with eval7.
+
+    Cards are kept as 0-51 codes in a preallocated array and only turned into
+    eval7 cards (from a shared table) when dealt. Dealing advances an index,
+    removing a card sets a bit in a mask that dealing skips, and shuffling is an
+    in-place Fisher-Yates over the undealt part of the array. Removing cards
+    keeps the dealing order of the others.
+
+    Shuffling uses a private random.Random seeded with `seed`, so the same seed
+    always deals the same cards. Without a seed one is drawn from the global
+    random module and kept in `self.seed` so the deal can be reproduced.
     """
 
-    def __init__(self):
-        self.deck = Deck()
+    def __init__(self, seed: int = None, order: bytes = None):
+        """
+        order is an already shuffled card order (52 codes), as handed out by a
+        DeckPool. Such a deck has no seed of its own.
+        """
+        if order is not None:
+            self.seed = None
+            self.rng = random  # Only used if the pre-shuffled deck is shuffled again
+            self.codes = array('B', order)
+        else:
+            self.seed = seed if seed is not None else random.getrandbits(SEED_BITS)
+            self.rng = random.Random(self.seed)
+            self.codes = array('B', range(DECK_SIZE))
+        self.pool_seed = None  # Set on decks handed out by a DeckPool
+        self.pool_index = None
+        self.top = 0  # Index of the next card to deal
+        self.taken = 0  # Bitmask of codes no longer in the deck (dealt or removed)
+        self.size = DECK_SIZE  # Cards left to deal
+
+    @classmethod
+    def from_pool(cls, pool: "DeckPool") -> "PokerDeck":
+        """
+        Take the next pre-shuffled deck from a DeckPool, no shuffle needed.
+        """
+        return pool.next_deck()
+
+    def copy(self) -> "PokerDeck":
+        """
+        Copy of the deck at its current position. The copy shares the shuffling
+        random generator, which is only used by shuffle().
+        """
+        deck = PokerDeck.__new__(PokerDeck)
+        deck.seed = self.seed
+        deck.rng = self.rng
+        deck.codes = array('B', self.codes)
+        deck.pool_seed = self.pool_seed
+        deck.pool_index = self.pool_index
+        deck.top = self.top
+        deck.taken = self.taken
+        deck.size = self.size
+        return deck
+
+    def deal_codes(self, num_cards: int) -> list:
+        """
+        Deal a number of cards from the deck as 0-51 codes.
+        """
+        if num_cards > self.size:
+            raise ValueError(f"Cannot deal {num_cards} cards, only {self.size} left")
+        codes = []
+        while len(codes) < num_cards:
+            code = self.codes[self.top]
+            self.top += 1
+            if not self.taken >> code & 1:
+                self.taken |= 1 << code
+                codes.append(code)
+        self.size -= num_cards
+        return codes
 
     def deal(self, num_cards: int) -> list:
         """
         Deal a number of cards from the deck.
         """
-        return self.deck.deal(num_cards)
-    
+        return [CARDS[code] for code in self.deal_codes(num_cards)]
+
     def shuffle(self):
         """
-        Shuffle the deck.
+        Shuffle the cards left in the deck.
         """
-        self.deck.shuffle()
+        # random.shuffle swaps items in place, here through a view of the undealt cards
+        self.rng.shuffle(memoryview(self.codes)[self.top:])
 
     def remove(self, card: Card):
         """
         Remove a card from the deck.
         """
-        self.deck.cards.remove(card)
+        self._remove_code(card_code(card))
 
     def remove_multiple(self, cards: list):
         """
         Remove multiple cards from the deck.
         """
         for card in cards:
-            self.deck.cards.remove(card)
-    
+            self._remove_code(card_code(card))
+
+    def _remove_code(self, code: int):
+        bit = 1 << code
+        if self.taken & bit:
+            raise ValueError(f"{CARDS[code]} is not in the deck")
+        self.taken |= bit
+        self.size -= 1
+
+    def remaining_codes(self) -> list:
+        """
+        Codes of the cards left in the deck, in dealing order.
+        """
+        return [code for code in self.codes[self.top:] if not self.taken >> code & 1]
+
     def peek(self, n):
         """
         Peek at the deck.
         """
-        return self.deck.peek(n)
-    
+        return [CARDS[code] for code in self.remaining_codes()[:n]]
+
     def sample(self, n):
         """
         Sample n cards from the deck.
         """
-        return self.deck.sample(n)
-    
+        return [CARDS[code] for code in random.sample(self.remaining_codes(), n)]
+
     def __str__(self):
-        return str(self.deck.__str__())
-    
+        return str(self.__repr__())
+
     def __repr__(self):
-        return str(self.deck.__repr__())
-    
+        return f"Deck({[CARDS[code] for code in self.remaining_codes()]!r})"
+
     def __len__(self):
-        return len(self.deck.cards)
-    
+        return self.size
+
     def __getitem__(self, i):
-        return self.deck.cards[i]
-    
+        return CARDS[self.remaining_codes()[i]]
+
+
+class DeckPool:
+    """
+    Source of pre-shuffled decks generated in bulk.
+
+    Permutations are made batch_size at a time, with numpy (argsort of a random
+    matrix) when it is installed and random.Random otherwise. Batch k is seeded
+    from (seed, k), so deck number i of a pool can be regenerated later from the
+    pool seed alone (see PokerDeck.pool_index). With background=True a daemon
+    thread keeps the next batches ready while games are played.
+
+    Decks are handed out in order by next_deck(); the pool is thread-safe, so
+    several tables can share one.
+    """
+
+    def __init__(self,
+                 seed: int = None,
+                 batch_size: int = DECK_POOL_BATCH_SIZE,
+                 background: bool = True,
+                 use_numpy: bool = None,
+                 start_index: int = 0):
+        if use_numpy and np is None:
+            raise ImportError("numpy is not installed")
+        self.seed = seed if seed is not None else random.getrandbits(SEED_BITS)
+        self.batch_size = batch_size
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self.lock = threading.Lock()
+
+        self.next_index = start_index  # Index of the next deck handed out
+        self.batch_index = start_index // batch_size
+        self.batch = None
+        self.row = start_index % batch_size
+
+        self.stopped = threading.Event()
+        self.batches = None
+        self.thread = None
+        if background:
+            self.batches = queue.Queue(maxsize=DECK_POOL_PREFETCH)
+            self.thread = threading.Thread(target=self._refill, args=(self.batch_index,), daemon=True)
+            self.thread.start()
+
+    def generate_batch(self, batch_index: int) -> bytes:
+        """The batch_size permutations of batch batch_index, 52 codes each, concatenated"""
+        if self.use_numpy:
+            rng = np.random.default_rng([batch_index, self.seed])
+            permutations = rng.random((self.batch_size, DECK_SIZE)).argsort(axis=1).astype(np.uint8)
+            return permutations.tobytes()
+
+        rng = random.Random(f"{self.seed}:{batch_index}")
+        permutations = bytearray()
+        codes = list(range(DECK_SIZE))
+        for _ in range(self.batch_size):
+            rng.shuffle(codes)
+            permutations.extend(codes)
+        return bytes(permutations)
+
+    def _refill(self, batch_index: int):
+        while not self.stopped.is_set():
+            batch = self.generate_batch(batch_index)
+            while not self.stopped.is_set():
+                try:
+                    self.batches.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            batch_index += 1
+
+    def _load_batch(self):
+        if self.batches is not None:
+            self.batch = self.batches.get()
+        else:
+            self.batch = self.generate_batch(self.batch_index)
+
+    def next_deck(self) -> PokerDeck:
+        """The next pre-shuffled deck; its pool_seed and pool_index identify it"""
+        with self.lock:
+            if self.batch is None or self.row == self.batch_size:
+                if self.batch is not None:
+                    self.batch_index += 1
+                    self.row = 0
+                self._load_batch()
+            start = self.row * DECK_SIZE
+            order = self.batch[start:start + DECK_SIZE]
+            self.row += 1
+            index = self.next_index
+            self.next_index += 1
 
-    
+        deck = PokerDeck(order=order)
+        deck.pool_seed = self.seed
+        deck.pool_index = index
+        return deck
 
-    
\ No newline at end of file
+    def close(self):
+        """Stop the background thread"""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
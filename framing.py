@@ -0,0 +1,145 @@
+import asyncio
+import socket
+import struct
+import time
+from typing import List, Optional
+
+# Framing modes for messages on a connection
+NEWLINE_FRAMING = "newline"  # JSON text terminated by "\n" (default protocol)
+LENGTH_PREFIX_FRAMING = "length"  # 4-byte big-endian payload length, then the payload
+
+FRAMING_MODES = (NEWLINE_FRAMING, LENGTH_PREFIX_FRAMING)
+
+LENGTH_PREFIX = struct.Struct(">I")
+MAX_MESSAGE_SIZE = 1 << 20  # 1 MiB
+RECV_SIZE = 65536
+MAX_IOV = 512  # Buffers per sendmsg call, below the usual IOV_MAX of 1024
+
+
+def encode_message(message: str, framing: str = NEWLINE_FRAMING) -> bytes:
+    """Encode a message for the wire"""
+    if framing == NEWLINE_FRAMING:
+        return (message + "\n").encode('utf-8')
+    payload = message.encode('utf-8')
+    return LENGTH_PREFIX.pack(len(payload)) + payload
+
+
+def send_buffers(conn: socket.socket, buffers: List[bytes]):
+    """
+    Write several encoded messages with vectored sendmsg calls (writev), handling
+    partial writes. Falls back to a single sendall where sendmsg isn't available.
+    """
+    if not hasattr(conn, "sendmsg"):
+        conn.sendall(b"".join(buffers))
+        return
+
+    views = [memoryview(buffer) for buffer in buffers]
+    start = 0
+    while start < len(views):
+        sent = conn.sendmsg(views[start:start + MAX_IOV])
+        while sent > 0:
+            if sent >= len(views[start]):
+                sent -= len(views[start])
+                start += 1
+            else:
+                views[start] = views[start][sent:]
+                sent = 0
+
+
+class MessageReader:
+    """
+    Buffered reader splitting a socket's byte stream into messages.
+
+    A single recv() may contain several pipelined messages or only part of one;
+    complete messages are served from the buffer without another syscall and
+    partial ones wait for the rest of their bytes.
+    """
+
+    def __init__(self, conn: socket.socket, framing: str = NEWLINE_FRAMING, max_message_size: int = MAX_MESSAGE_SIZE):
+        if framing not in FRAMING_MODES:
+            raise ValueError(f"Invalid framing mode: {framing}")
+        self.conn = conn
+        self.framing = framing
+        self.max_message_size = max_message_size
+        self.buffer = bytearray()
+        self.eof = False
+
+    def read_message(self, timeout: float = None) -> str:
+        """
+        Return the next complete message, or "" once the peer closed the connection.
+        Raises socket.timeout if no complete message arrived within timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            message = self.pop_message()
+            if message is not None:
+                return message
+            if self.eof:
+                return ""
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout()
+                self.conn.settimeout(remaining)
+            else:
+                self.conn.settimeout(None)
+
+            chunk = self.conn.recv(RECV_SIZE)
+            if not chunk:
+                self.eof = True
+            self.feed(chunk)
+
+    def feed(self, data: bytes):
+        """Append received bytes to the buffer"""
+        self.buffer += data
+
+    def pop_message(self) -> Optional[str]:
+        """Take the next complete message out of the buffer, None if there isn't one"""
+        if self.framing == NEWLINE_FRAMING:
+            while True:
+                end = self.buffer.find(b"\n")
+                if end < 0:
+                    self._check_size(len(self.buffer))
+                    return None
+                line = bytes(self.buffer[:end])
+                del self.buffer[:end + 1]
+                if line.strip():
+                    return line.decode('utf-8')
+
+        if len(self.buffer) < LENGTH_PREFIX.size:
+            return None
+        (length,) = LENGTH_PREFIX.unpack_from(self.buffer)
+        self._check_size(length)
+        end = LENGTH_PREFIX.size + length
+        if len(self.buffer) < end:
+            return None
+        payload = bytes(self.buffer[LENGTH_PREFIX.size:end])
+        del self.buffer[:end]
+        return payload.decode('utf-8')
+
+    def _check_size(self, size: int):
+        if size > self.max_message_size:
+            self.buffer.clear()
+            raise ValueError(f"Message exceeds {self.max_message_size} bytes")
+
+
+async def read_stream_message(reader: asyncio.StreamReader, framing: str = NEWLINE_FRAMING) -> str:
+    """asyncio counterpart of MessageReader.read_message, "" once the peer closed the connection"""
+    if framing == NEWLINE_FRAMING:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return ""
+            if line.strip():
+                return line.rstrip(b"\n").decode('utf-8')
+
+    try:
+        header = await reader.readexactly(LENGTH_PREFIX.size)
+        (length,) = LENGTH_PREFIX.unpack(header)
+        if length > MAX_MESSAGE_SIZE:
+            raise ValueError(f"Message exceeds {MAX_MESSAGE_SIZE} bytes")
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return ""
+    return payload.decode('utf-8')
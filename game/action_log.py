@@ -0,0 +1,193 @@
+"""
+Columnar action history for a betting round.
+
+Every action used to allocate an ActionRecord plus fresh lists of side pot
+dicts, which were converted again into JSON dicts at the end of the round.
+ActionLog stores the same information in parallel arrays and only builds
+records or JSON dicts when something asks for them (usually the game log
+writer).
+"""
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Set
+
+from poker_type.game import PokerAction
+from poker_type.utils import get_poker_action_name_from_enum
+
+# JSON action names by PokerAction value, e.g. 5 -> "ALL IN"
+ACTION_NAMES = {action.value: get_poker_action_name_from_enum(action).upper() for action in PokerAction}
+
+
+@dataclass
+class ActionRecord:
+    """Represents a single action taken by a player"""
+    __slots__ = ("player_id", "action", "amount", "timestamp", "pot_after_action",
+                 "side_pots_after_action", "total_pot_after_action", "cumulative_side_pots_base")
+
+    player_id: int
+    action: PokerAction
+    amount: int
+    timestamp: int
+    # Round-specific pot information
+    pot_after_action: int
+    side_pots_after_action: List[Dict]
+    # Cumulative pot information across all rounds
+    total_pot_after_action: int
+    # Side pots of the completed rounds, shared with the other records of the round
+    cumulative_side_pots_base: List[Dict]
+
+    @property
+    def total_side_pots_after_action(self) -> List[Dict]:
+        """Side pots of the completed rounds followed by this round's pots"""
+        return with_cumulative_ids(self.cumulative_side_pots_base, self.side_pots_after_action)
+
+
+def with_cumulative_ids(cumulative_side_pots: List[Dict], side_pots: List[Dict]) -> List[Dict]:
+    """Append a round's side pots to the cumulative ones, numbering them after the existing ids"""
+    next_id = len(cumulative_side_pots)
+    return cumulative_side_pots + [
+        {
+            "id": next_id + i,
+            "amount": side_pot["amount"],
+            "eligible_players": side_pot["eligible_players"]
+        }
+        for i, side_pot in enumerate(side_pots)
+    ]
+
+
+class ActionLog:
+    """
+    Append-only log of the actions of one round, one array per column.
+
+    The side pots after action i are pot_amounts[pot_offsets[i]:pot_offsets[i + 1]]
+    with the matching eligible sets. Eligible sets are stored by reference: RoundState
+    replaces a pot's set rather than mutating it, so the reference keeps the set as
+    it was when the action happened.
+
+    Indexing returns an ActionRecord built on demand, so code written against the
+    old list of records keeps working.
+    """
+
+    __slots__ = ("players", "actions", "amounts", "timestamps", "pots", "total_pots",
+                 "pot_offsets", "pot_amounts", "pot_eligible", "cumulative_side_pots_base")
+
+    def __init__(self, cumulative_side_pots_base: List[Dict] = None):
+        self.players = array('q')
+        self.actions = array('b')
+        self.amounts = array('q')
+        self.timestamps = array('q')
+        self.pots = array('q')
+        self.total_pots = array('q')
+        self.pot_offsets = array('l', [0])
+        self.pot_amounts = array('q')
+        self.pot_eligible: List[Set[int]] = []
+        self.cumulative_side_pots_base = cumulative_side_pots_base if cumulative_side_pots_base is not None else []
+
+    def append(self, player_id: int, action: PokerAction, amount: int, timestamp: int,
+               pot: int, total_pot: int, side_pots) -> None:
+        """Record an action; side_pots are the round's Pot objects after the action"""
+        self.players.append(player_id)
+        self.actions.append(action.value)
+        self.amounts.append(amount)
+        self.timestamps.append(timestamp)
+        self.pots.append(pot)
+        self.total_pots.append(total_pot)
+        for side_pot in side_pots:
+            self.pot_amounts.append(side_pot.amount)
+            self.pot_eligible.append(side_pot.eligible_players)
+        self.pot_offsets.append(len(self.pot_amounts))
+
+    def copy(self) -> "ActionLog":
+        """Independent copy; the eligible sets are shared since they are never mutated"""
+        log = ActionLog.__new__(ActionLog)
+        for name in ("players", "actions", "amounts", "timestamps", "pots", "total_pots", "pot_offsets", "pot_amounts"):
+            setattr(log, name, array(getattr(self, name).typecode, getattr(self, name)))
+        log.pot_eligible = self.pot_eligible.copy()
+        log.cumulative_side_pots_base = self.cumulative_side_pots_base
+        return log
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def __bool__(self) -> bool:
+        return len(self.players) > 0
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("action index out of range")
+        return index
+
+    def side_pots_after(self, index: int) -> List[Dict]:
+        """Side pots after the given action, in the get_side_pots_info format"""
+        index = self._index(index)
+        return [
+            {
+                "amount": self.pot_amounts[i],
+                "eligible_players": list(self.pot_eligible[i])
+            }
+            for i in range(self.pot_offsets[index], self.pot_offsets[index + 1])
+        ]
+
+    def __getitem__(self, index: int) -> ActionRecord:
+        index = self._index(index)
+        return ActionRecord(
+            player_id=self.players[index],
+            action=PokerAction(self.actions[index]),
+            amount=self.amounts[index],
+            timestamp=self.timestamps[index],
+            pot_after_action=self.pots[index],
+            side_pots_after_action=self.side_pots_after(index),
+            total_pot_after_action=self.total_pots[index],
+            cumulative_side_pots_base=self.cumulative_side_pots_base
+        )
+
+    def __iter__(self) -> Iterator[ActionRecord]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_json(self, index: int) -> Dict:
+        """One entry of the game log's action_sequence"""
+        index = self._index(index)
+        side_pots = self.side_pots_after(index)
+        return {
+            "player": self.players[index] - 1,  # Convert to 0-based indexing for JSON
+            "action": ACTION_NAMES[self.actions[index]],
+            "amount": self.amounts[index],
+            "timestamp": self.timestamps[index],
+            # Round-specific pot information
+            "pot_after_action": self.pots[index],
+            "side_pots_after_action": side_pots,
+            # Cumulative pot information across all rounds
+            "total_pot_after_action": self.total_pots[index],
+            "total_side_pots_after_action": with_cumulative_ids(self.cumulative_side_pots_base, side_pots)
+        }
+
+
+class ActionSequence:
+    """
+    Lazy, read-only view of an ActionLog in the game log's action_sequence format.
+    Entries are built when indexed; to_list() materialises the whole sequence.
+    """
+
+    __slots__ = ("log",)
+
+    def __init__(self, log: ActionLog):
+        self.log = log
+
+    def __len__(self) -> int:
+        return len(self.log)
+
+    def __bool__(self) -> bool:
+        return bool(self.log)
+
+    def __getitem__(self, index: int) -> Dict:
+        return self.log.to_json(index)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(len(self.log)):
+            yield self.log.to_json(index)
+
+    def to_list(self) -> List[Dict]:
+        return list(self)
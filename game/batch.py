@@ -0,0 +1,245 @@
+"""
+Headless in-process simulation.
+
+BatchSimulator plays hands by driving Game directly with Python bot callables,
+following the same hand flow as PokerEngineServer.run_single_game (blind
+assignment, action order, retries, money checks, dealer rotation and blind
+schedule) without any sockets in between.
+"""
+import contextlib
+import os
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import (
+    RETRY_COUNT,
+    DEFAULT_BLIND_AMOUNT,
+    DEFAULT_BLIND_MULTIPLIER,
+    DEFAULT_BLIND_INCREASE_INTERVAL,
+    DEFAULT_INITIAL_MONEY
+)
+from deck import SEED_BITS, DeckPool
+from game.equity import LOGGED_EQUITY_SAMPLES
+from game.game import Game
+from game.hand_strength import HandStrengthCache
+from game.log_sink import LogSink
+from poker_type.game import PokerAction
+from poker_type.messsage import GameStateMessage
+
+# A bot gets its player id, its hole cards and the current game state,
+# and returns an (action, amount) tuple like a client's PLAYER_ACTION.
+Bot = Callable[[int, List[str], GameStateMessage], Tuple[PokerAction, int]]
+
+
+@contextlib.contextmanager
+def seeded_random(seed):
+    """
+    Seed the random module while inside, for bots that use it, and put the
+    caller's random state back on the way out.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(state)
+
+
+class BatchSimulator:
+    def __init__(self,
+                 bots: Dict[int, Bot],
+                 blind_amount: int = DEFAULT_BLIND_AMOUNT,
+                 blind_multiplier: float = DEFAULT_BLIND_MULTIPLIER,
+                 blind_increase_interval: int = DEFAULT_BLIND_INCREASE_INTERVAL,
+                 initial_money: int = DEFAULT_INITIAL_MONEY,
+                 debug: bool = False,
+                 quiet: bool = True,
+                 write_logs: bool = False,
+                 game_id: str = None,
+                 seed: int = None,
+                 deck_pool: DeckPool = None,
+                 hand_cache: HandStrengthCache = None,
+                 record_equity: bool = False,
+                 equity_samples: int = LOGGED_EQUITY_SAMPLES,
+                 log_sink: LogSink = None):
+        """
+        bots maps player id -> bot callable. Insertion order is the seating order,
+        like connection order on the server. With a seed, the per-game deck seeds
+        come from random.Random(seed), so the same seed deals the same cards.
+        Otherwise decks come from deck_pool when one is given. A hand_cache is
+        shared by all the games' showdowns. With record_equity the game logs get
+        the players' all-in equity (see Game._record_all_in_equity), sampled from
+        equity_samples runouts when it isn't enumerated. With
+        write_logs, game logs go to log_sink (one JSON file per game by default).
+        """
+        if len(bots) < 2:
+            raise ValueError("At least two bots are required")
+
+        self.bots = dict(bots)
+        self.debug = debug
+        self.quiet = quiet  # Silence the engine's stdout while simulating
+        self.write_logs = write_logs
+        self.simulation_game_id = game_id
+        self.blind_amount = blind_amount
+        self.initial_blind_amount = blind_amount
+        self.blind_multiplier = blind_multiplier
+        self.blind_increase_interval = blind_increase_interval
+        self.initial_money = initial_money
+        self.seed_rng = random.Random(seed) if seed is not None else None
+        self.deck_pool = deck_pool
+        self.hand_cache = hand_cache
+        self.record_equity = record_equity
+        self.equity_samples = equity_samples
+        self.log_sink = log_sink
+
+        self.player_money: Dict[int, int] = {player_id: initial_money for player_id in self.bots}
+        self.player_delta: Dict[int, int] = {player_id: 0 for player_id in self.bots}
+        self.dealer_button_position = 0
+        self.game_count = 0
+        self.game: Optional[Game] = None
+        self.invalid_actions: Dict[int, int] = {player_id: 0 for player_id in self.bots}
+
+    def run(self, num_games: int) -> Dict[int, int]:
+        """Play num_games hands in a row and return the cumulative delta of each player"""
+        with self.output_context():
+            for _ in range(num_games):
+                self.play_next_game()
+        if self.log_sink is not None:
+            self.log_sink.flush()
+        return self.player_delta
+
+    def play_next_game(self) -> Dict[int, int]:
+        """Play one hand, rotate the dealer button and return the hand's scores"""
+        self.game_count += 1
+        self.reset_game_state()
+        score = self.run_single_game()
+        self.rotate_dealer_button()
+        return score
+
+    @contextlib.contextmanager
+    def output_context(self):
+        """Silence the engine's stdout while inside, unless quiet is off"""
+        if not self.quiet:
+            yield
+            return
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+
+    def update_blind_amount(self):
+        """Update blind amount based on the game count and blind increase settings"""
+        if self.blind_increase_interval > 0 and self.game_count > 0:
+            increase_count = self.game_count // self.blind_increase_interval
+            if increase_count > 0:
+                self.blind_amount = int(self.initial_blind_amount * (self.blind_multiplier ** increase_count))
+
+    def reset_game_state(self):
+        """Create a fresh Game for the next hand, keeping money and dealer button"""
+        self.update_blind_amount()
+
+        game_seed = self.seed_rng.getrandbits(SEED_BITS) if self.seed_rng else None
+        self.game = Game(self.debug, self.blind_amount, self.game_count, self.simulation_game_id, write_log=self.write_logs, seed=game_seed, deck_pool=self.deck_pool, hand_cache=self.hand_cache, record_equity=self.record_equity, log_sink=self.log_sink, equity_samples=self.equity_samples)
+        self.game.set_dealer_button_position(self.dealer_button_position)
+        for player_id in self.bots:
+            self.game.add_player(player_id)
+
+        self.game.set_player_money_info(
+            self.player_money.copy(),
+            self.player_delta.copy(),
+            self.initial_money
+        )
+
+    def run_single_game(self) -> Dict[int, int]:
+        """Play the current game to completion, same flow as the server"""
+        game = self.game
+        game.assign_blinds_with_money_check(self.player_money, self.blind_amount)
+        game.start_game()
+        game.post_blinds()
+
+        while True:
+            if len(game.active_players) == 1 or (game.is_current_round_complete() and game.is_game_over()):
+                if game.is_running:
+                    game.end_game()
+
+                score = game.get_final_score()
+                self.update_player_money_after_game(score)
+                game.update_final_money_after_game(score, self.player_money.copy(), self.player_delta.copy())
+                return score
+
+            while not game.is_current_round_complete():
+                waiting_for = game.get_current_waiting_for()
+                if len(waiting_for) == 0:
+                    break
+
+                if game.round_index == 0:
+                    queue = game.get_preflop_order(list(waiting_for))
+                else:
+                    queue = game.get_positional_order(list(waiting_for))
+
+                for player_id in queue:
+                    self._play_turn(player_id)
+
+            game.end_round()
+            if game.is_all_in_runout():
+                game.run_out_board()
+            else:
+                game.start_round()
+
+    def _play_turn(self, player_id: int):
+        """Ask a bot for an action, retrying and auto-folding like the server does"""
+        for _ in range(RETRY_COUNT):
+            try:
+                action = self.bots[player_id](
+                    player_id,
+                    self.game.get_player_hands(player_id),
+                    self.game.get_game_state(self.player_money)
+                )
+                if self.process_action(player_id, action):
+                    return
+            except Exception as e:
+                if self.debug:
+                    print(f"Bot {player_id} raised: {e}")
+            self.invalid_actions[player_id] += 1
+
+        # Exhausted retries: automatically fold the player
+        self.process_action(player_id, (PokerAction.FOLD, 0))
+
+    def process_action(self, player_id: int, action: Tuple[PokerAction, int]) -> bool:
+        """Apply a bot's action to the game, returns False if the engine rejected it"""
+        action_type, amount = action
+        action_tuple = (PokerAction(action_type), amount)
+        action_tuple, _ = self.game.limit_action_to_money(player_id, action_tuple, self.player_money)
+
+        try:
+            self.game.update_game(player_id, action_tuple)
+        except Exception as e:
+            if self.debug:
+                print(f"Error processing action from player {player_id}: {e}")
+            return False
+        return True
+
+    def rotate_dealer_button(self):
+        """Rotate the dealer button to the next player who can afford the big blind"""
+        players_who_can_afford_blind = [
+            player_id for player_id in self.bots
+            if self.player_money.get(player_id, 0) >= self.blind_amount
+        ]
+        if len(players_who_can_afford_blind) == 0:
+            return
+
+        all_players = list(self.bots)
+        current_dealer_player = all_players[self.dealer_button_position % len(all_players)]
+        try:
+            current_dealer_index = players_who_can_afford_blind.index(current_dealer_player)
+        except ValueError:
+            current_dealer_index = -1
+
+        next_dealer_index = (current_dealer_index + 1) % len(players_who_can_afford_blind)
+        next_dealer_player = players_who_can_afford_blind[next_dealer_index]
+        self.dealer_button_position = all_players.index(next_dealer_player)
+
+    def update_player_money_after_game(self, game_scores: Dict[int, int]):
+        """Update player money based on game results using delta approach"""
+        for player_id, score in game_scores.items():
+            if player_id in self.player_delta:
+                self.player_delta[player_id] += score
+                self.player_money[player_id] = self.initial_money + self.player_delta[player_id]
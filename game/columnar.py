@@ -0,0 +1,334 @@
+"""
+Columnar export of game logs for analytics.
+
+ColumnarExporter turns game logs into three tables kept as one array per
+column, the way ActionLog stores a round:
+
+    hands    one row per game: game_sequence (-1 when the game had none), seed
+             (the deck's, -1 when the log has none, e.g. deck-pool games),
+             small_blind, big_blind, num_players, num_rounds, pot (all rounds),
+             board (5 card codes, -1 for cards not dealt) and game_id
+    players  one row per player dealt in: hand (row in hands), player_id, delta
+             (net chips), hole (2 card codes), vpip and pfr (0/1)
+    actions  one row per action: hand, round (0 = preflop), player_id, action
+             (PokerAction value), amount, pot (total after the action) and
+             forced (1 for the posted blinds)
+
+Player ids are the engine's (the log's 0-based player indexes + 1, as in
+playerMoney), card codes are rank * 4 + suit as in deck.CARDS. Win rates,
+VPIP and the like are then array operations, e.g. with numpy
+
+    players = load_columns("hands.npz")["players"]
+    vpip = players["vpip"][players["player_id"] == 1].mean()
+
+save() writes a .npz with numpy installed and otherwise a directory holding
+columns.json and one raw little-endian file per column; load_columns reads
+either. ColumnarSink exports games live as they finish, into a directory of
+chunk_<n> files of that kind that load_columns concatenates.
+"""
+import json
+import os
+import sys
+import threading
+from array import array
+from typing import Dict, Iterable, List
+
+from config import BASE_PATH
+from deck import CARDS, np
+from game.action_log import ACTION_NAMES
+from game.log_sink import LogSink
+from poker_type.game import PokerAction
+
+# (column, array typecode, values per row) of each table
+SCHEMA = {
+    "hands": [("game_sequence", 'q', 1), ("seed", 'q', 1), ("small_blind", 'q', 1), ("big_blind", 'q', 1),
+              ("num_players", 'b', 1), ("num_rounds", 'b', 1), ("pot", 'q', 1), ("board", 'b', 5)],
+    "players": [("hand", 'q', 1), ("player_id", 'q', 1), ("delta", 'q', 1), ("hole", 'b', 2),
+                ("vpip", 'b', 1), ("pfr", 'b', 1)],
+    "actions": [("hand", 'q', 1), ("round", 'b', 1), ("player_id", 'q', 1), ("action", 'b', 1),
+                ("amount", 'q', 1), ("pot", 'q', 1), ("forced", 'b', 1)],
+}
+STRING_COLUMNS = {"hands": ["game_id"]}
+COLUMNS_HEADER = "columns.json"
+CHUNK_PREFIX = "chunk_"
+COLUMNAR_CHUNK_SIZE = 10000  # Hands a ColumnarSink buffers before writing a chunk
+
+_DTYPES = {'q': '<i8', 'b': 'i1'}
+_CARD_CODES = {str(card): code for code, card in enumerate(CARDS)}
+_ACTION_VALUES = {name: value for value, name in ACTION_NAMES.items()}
+_VOLUNTARY = {PokerAction.CALL.value, PokerAction.RAISE.value, PokerAction.ALL_IN.value}
+_AGGRESSIVE = {PokerAction.RAISE.value, PokerAction.ALL_IN.value}
+NO_SEQUENCE = -1
+NO_SEED = -1  # Deck seeds are non-negative (deck.SEED_BITS), so 0 stays a real seed
+NO_CARD = -1
+
+
+def _card_codes(cards, size: int):
+    codes = [_CARD_CODES[str(card)] for card in cards[:size]]
+    return codes + [NO_CARD] * (size - len(codes))
+
+
+class ColumnarExporter:
+    """Accumulates game logs as columns; tables() and save() give them back"""
+
+    def __init__(self):
+        self.columns = {table: {name: array(typecode) for name, typecode, _ in columns}
+                        for table, columns in SCHEMA.items()}
+        self.strings = {table: {name: [] for name in names} for table, names in STRING_COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self.strings["hands"]["game_id"])
+
+    def add(self, game_log: Dict, game_sequence: int = None):
+        """Append one game log (as written to a log sink or read back from one)"""
+        hand = len(self)
+        hands = self.columns["hands"]
+        blinds = game_log.get("blinds", {})
+        rounds = sorted(game_log.get("rounds", {}).items(), key=lambda item: int(item[0]))
+        player_hands = game_log.get("playerHands", {})
+
+        hands["game_sequence"].append(NO_SEQUENCE if game_sequence is None else game_sequence)
+        seed = game_log.get("seed")
+        hands["seed"].append(NO_SEED if seed is None else seed)
+        hands["small_blind"].append(blinds.get("small", 0))
+        hands["big_blind"].append(blinds.get("big", 0))
+        hands["num_players"].append(len(player_hands))
+        hands["num_rounds"].append(len(rounds))
+        hands["pot"].append(sum(round_log.get("pot", 0) for _, round_log in rounds))
+        hands["board"].extend(_card_codes(game_log.get("finalBoard", []), 5))
+        self.strings["hands"]["game_id"].append(str(game_log.get("gameId", "")))
+
+        # Blinds are the first two preflop actions, posted by these players
+        blind_players = [blinds[key] + 1 for key in ("smallBlindPlayer", "bigBlindPlayer") if key in blinds]
+        vpip = set()
+        pfr = set()
+        actions = self.columns["actions"]
+        for round_key, round_log in rounds:
+            round_index = int(round_key)
+            players, values, amounts, pots = self._round_actions(round_log.get("action_sequence", []))
+            forced = [0] * len(players)
+            if round_index == 0:
+                for i, player_id in enumerate(blind_players[:len(players)]):
+                    forced[i] = int(players[i] == player_id)
+                for player_id, value, is_forced in zip(players, values, forced):
+                    if not is_forced and value in _VOLUNTARY:
+                        vpip.add(player_id)
+                        if value in _AGGRESSIVE:
+                            pfr.add(player_id)
+            actions["hand"].extend([hand] * len(players))
+            actions["round"].extend([round_index] * len(players))
+            actions["player_id"].extend(players)
+            actions["action"].extend(values)
+            actions["amount"].extend(amounts)
+            actions["pot"].extend(pots)
+            actions["forced"].extend(forced)
+
+        scores = {int(player_id): score for player_id, score in game_log.get("playerMoney", {}).get("gameScores", {}).items()}
+        table = self.columns["players"]
+        for index, cards in player_hands.items():
+            player_id = int(index) + 1
+            table["hand"].append(hand)
+            table["player_id"].append(player_id)
+            table["delta"].append(scores.get(player_id, 0))
+            table["hole"].extend(_card_codes(cards, 2))
+            table["vpip"].append(player_id in vpip)
+            table["pfr"].append(player_id in pfr)
+
+    @staticmethod
+    def _round_actions(action_sequence):
+        """Player ids, action values, amounts and total pots of a round's actions"""
+        return ([entry["player"] + 1 for entry in action_sequence],
+                [_ACTION_VALUES[entry["action"]] for entry in action_sequence],
+                [entry["amount"] for entry in action_sequence],
+                [entry["total_pot_after_action"] for entry in action_sequence])
+
+    def tables(self) -> Dict[str, Dict]:
+        """{table: {column: values}}, numpy arrays when numpy is installed, otherwise array/list"""
+        if np is None:
+            return {table: {**self.columns[table], **self.strings.get(table, {})} for table in SCHEMA}
+        tables = {}
+        for table, columns in SCHEMA.items():
+            tables[table] = {name: _to_numpy(self.columns[table][name], width) for name, _, width in columns}
+            for name, values in self.strings.get(table, {}).items():
+                tables[table][name] = np.array(values, dtype=str)
+        return tables
+
+    def save(self, path: str, layout: str = None) -> str:
+        """
+        Write the tables to path: 'npz' (the default with numpy) as one
+        .npz archive of <table>.<column> arrays, 'columns' as a directory of
+        raw column files. Returns the path written.
+        """
+        layout = layout or ("npz" if np is not None else "columns")
+        if layout == "npz":
+            if np is None:
+                raise ImportError("numpy is not installed")
+            path = path if path.endswith(".npz") else path + ".npz"
+            arrays = {f"{table}.{name}": values for table, columns in self.tables().items() for name, values in columns.items()}
+            tmp_path = path + ".tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)  # Readers never see half a file
+            return path
+        if layout != "columns":
+            raise ValueError(f"Unknown columnar layout: {layout}")
+
+        os.makedirs(path, exist_ok=True)
+        header = {"rows": {}, "columns": {}, "strings": STRING_COLUMNS}
+        for table, columns in SCHEMA.items():
+            header["rows"][table] = len(self.columns[table][columns[0][0]])
+            header["columns"][table] = [[name, typecode, width] for name, typecode, width in columns]
+            for name, _, _ in columns:
+                values = self.columns[table][name]
+                if sys.byteorder != "little":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                with open(os.path.join(path, f"{table}.{name}.bin"), 'wb') as f:
+                    values.tofile(f)
+            for name, values in self.strings.get(table, {}).items():
+                with open(os.path.join(path, f"{table}.{name}.json"), 'w') as f:
+                    json.dump(values, f)
+        with open(os.path.join(path, COLUMNS_HEADER), 'w') as f:
+            json.dump(header, f)
+        return path
+
+
+def _to_numpy(values: array, width: int):
+    column = np.frombuffer(values, dtype=values.typecode).copy() if len(values) else np.zeros(0, dtype=_DTYPES[values.typecode])
+    return column.reshape(-1, width) if width > 1 else column
+
+
+def chunk_paths(directory: str) -> List[str]:
+    """The chunk_<n> files (or column directories) of a ColumnarSink directory in write order"""
+    chunks = []
+    for name in os.listdir(directory):
+        number = name[len(CHUNK_PREFIX):].split(".")[0]
+        if name.startswith(CHUNK_PREFIX) and number.isdigit() and not name.endswith(".tmp.npz"):
+            chunks.append((int(number), os.path.join(directory, name)))
+    return [path for _, path in sorted(chunks)]
+
+
+def load_columns(path: str) -> Dict[str, Dict]:
+    """
+    Tables written by ColumnarExporter.save or a ColumnarSink directory (its
+    chunks concatenated, hand columns renumbered), as numpy arrays when numpy
+    is installed.
+    """
+    if os.path.isdir(path) and not os.path.exists(os.path.join(path, COLUMNS_HEADER)):
+        return _concatenate([_load_chunk(chunk) for chunk in chunk_paths(path)])
+    return _load_chunk(path)
+
+
+def _concatenate(chunks: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    if not chunks:
+        return ColumnarExporter().tables()
+    tables = {table: {name: [] for name in columns} for table, columns in chunks[0].items()}
+    hand_offset = 0
+    for chunk in chunks:
+        for table, columns in chunk.items():
+            for name, values in columns.items():
+                if name == "hand" and table != "hands":
+                    # Rows in this chunk's hands table, shifted past the earlier chunks
+                    values = values + hand_offset if np is not None else array(values.typecode, (hand + hand_offset for hand in values))
+                tables[table][name].append(values)
+        hand_offset += len(chunk["hands"]["game_id"])
+    for columns in tables.values():
+        for name, parts in columns.items():
+            if np is not None:
+                columns[name] = np.concatenate(parts)
+            else:
+                merged = parts[0][:0]
+                for part in parts:
+                    merged.extend(part)
+                columns[name] = merged
+    return tables
+
+
+def _load_chunk(path: str) -> Dict[str, Dict]:
+    if os.path.isdir(path):
+        with open(os.path.join(path, COLUMNS_HEADER)) as f:
+            header = json.load(f)
+        tables = {}
+        for table, columns in header["columns"].items():
+            tables[table] = {}
+            for name, typecode, width in columns:
+                file_path = os.path.join(path, f"{table}.{name}.bin")
+                if np is not None:
+                    column = np.fromfile(file_path, dtype=_DTYPES[typecode])
+                    tables[table][name] = column.reshape(-1, width) if width > 1 else column
+                else:
+                    column = array(typecode)
+                    with open(file_path, 'rb') as f:
+                        column.frombytes(f.read())
+                    if sys.byteorder != "little":
+                        column.byteswap()
+                    tables[table][name] = column
+            for name in header["strings"].get(table, []):
+                with open(os.path.join(path, f"{table}.{name}.json")) as f:
+                    values = json.load(f)
+                tables[table][name] = np.array(values, dtype=str) if np is not None else values
+        return tables
+
+    if np is None:
+        raise ImportError("numpy is not installed")
+    tables = {}
+    with np.load(path) as archive:
+        for key in archive.files:
+            table, name = key.split(".", 1)
+            tables.setdefault(table, {})[name] = archive[key]
+    return tables
+
+
+def export_game_logs(game_logs: Iterable[Dict], path: str, layout: str = None) -> str:
+    """Export game logs (e.g. read_game_logs(directory)) to a columnar file"""
+    exporter = ColumnarExporter()
+    for game_log in game_logs:
+        exporter.add(game_log)
+    return exporter.save(path, layout)
+
+
+class ColumnarSink(LogSink):
+    """
+    Log sink exporting games to columns as they finish.
+
+    Hands are buffered in a ColumnarExporter and written to the directory as
+    chunk_<n> (.npz or column directory) of chunk_size hands each, so memory
+    stays bounded and a long run makes few files. flush() and close() write the
+    hands buffered so far as the current, partial chunk; later hands are added
+    to it and it is rewritten until it is full. Numbering continues after the
+    chunks already in the directory; load_columns(directory) reads them all
+    back as one set of tables.
+    """
+
+    def __init__(self,
+                 directory: str = os.path.join(BASE_PATH, "hand_columns"),
+                 layout: str = None,
+                 chunk_size: int = COLUMNAR_CHUNK_SIZE):
+        self.directory = directory
+        self.layout = layout
+        self.chunk_size = chunk_size
+        self.exporter = ColumnarExporter()
+        self.lock = threading.Lock()
+        self.next_chunk = None
+        self.unsaved = 0  # Hands buffered since the current chunk was last written
+
+    def write(self, game_log: Dict, game_sequence: int = None):
+        with self.lock:
+            self.exporter.add(game_log, game_sequence)
+            self.unsaved += 1
+            if len(self.exporter) >= self.chunk_size:
+                self._write_chunk()
+                self.next_chunk += 1
+                self.exporter = ColumnarExporter()
+
+    def flush(self):
+        with self.lock:
+            if self.unsaved:
+                self._write_chunk()  # Rewritten with the later hands until it is full
+
+    def _write_chunk(self):
+        if self.next_chunk is None:
+            os.makedirs(self.directory, exist_ok=True)
+            existing = chunk_paths(self.directory)
+            self.next_chunk = int(os.path.basename(existing[-1])[len(CHUNK_PREFIX):].split(".")[0]) + 1 if existing else 0
+        self.exporter.save(os.path.join(self.directory, f"{CHUNK_PREFIX}{self.next_chunk:05d}"), self.layout)
+        self.unsaved = 0
@@ -0,0 +1,99 @@
+"""
+Duplicate poker evaluation.
+
+Plain bot-vs-bot results are dominated by who was dealt the better cards. In
+duplicate mode every deal is played once per seat rotation: each rotation is
+a BatchSimulator session with the same seed, so deal i gives the same cards to
+the same seat in every session, and every bot holds every seat's cards once.
+Summed over the rotations most of the card luck cancels out, which leaves the
+difference in play.
+
+Deals stay aligned across rotations as long as the dealer button moves the
+same way, i.e. nobody drops below the big blind; use an initial_money that is
+large compared to the blinds.
+"""
+import math
+import statistics
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from game.batch import BatchSimulator, Bot, seeded_random
+
+
+@dataclass
+class DuplicateResult:
+    """Per-bot duplicate results, deal_deltas[name][i] is the bot's total over all rotations of deal i"""
+    deltas: Dict[str, int] = field(default_factory=dict)  # Cumulative delta per bot
+    games: Dict[str, int] = field(default_factory=dict)   # Hands played per bot
+    deal_deltas: Dict[str, List[int]] = field(default_factory=dict)
+    rotations: int = 0
+
+    def merge(self, other: "DuplicateResult") -> "DuplicateResult":
+        """Combine runs over different seeds with the same seating"""
+        if self.rotations and other.rotations and self.rotations != other.rotations:
+            raise ValueError("Can't merge duplicate results with a different number of rotations")
+        merged = DuplicateResult(rotations=self.rotations or other.rotations)
+        for result in (self, other):
+            for name, delta in result.deltas.items():
+                merged.deltas[name] = merged.deltas.get(name, 0) + delta
+                merged.games[name] = merged.games.get(name, 0) + result.games[name]
+                merged.deal_deltas.setdefault(name, []).extend(result.deal_deltas[name])
+        return merged
+
+    def delta_per_game(self) -> Dict[str, float]:
+        """Average delta per hand played for each bot"""
+        return {name: self.deltas[name] / self.games[name] for name in self.deltas if self.games.get(name)}
+
+    def standard_error(self) -> Dict[str, float]:
+        """Standard error of delta_per_game, estimated from the per-deal totals"""
+        errors = {}
+        for name, deal_deltas in self.deal_deltas.items():
+            if len(deal_deltas) < 2:
+                errors[name] = float('nan')
+                continue
+            errors[name] = statistics.stdev(deal_deltas) / math.sqrt(len(deal_deltas)) / self.rotations
+        return errors
+
+
+def seat_rotations(seats: List[str]) -> List[List[str]]:
+    """Every cyclic rotation of the seating, so each bot sits in each seat once"""
+    return [seats[r:] + seats[:r] for r in range(len(seats))]
+
+
+def run_duplicate(bots: Dict[str, Bot],
+                  seats: List[str],
+                  num_deals: int,
+                  seed: int = 0,
+                  **simulator_kwargs) -> DuplicateResult:
+    """
+    Play num_deals deals for every rotation of seats and return the duplicate result.
+    Extra keyword arguments (blind schedule, initial money) go to each BatchSimulator.
+    """
+    if len(set(seats)) != len(seats):
+        raise ValueError("Each bot can only take one seat in duplicate mode")
+
+    rotations = seat_rotations(seats)
+    result = DuplicateResult(rotations=len(rotations))
+    for name in seats:
+        result.deltas[name] = 0
+        result.games[name] = 0
+        result.deal_deltas[name] = [0] * num_deals
+
+    for rotation in rotations:
+        simulator = BatchSimulator(
+            {seat + 1: bots[name] for seat, name in enumerate(rotation)},
+            seed=seed,
+            **simulator_kwargs
+        )
+        # Same random module state for each rotation, for bots using it
+        with seeded_random(seed), simulator.output_context():
+            for deal in range(num_deals):
+                score = simulator.play_next_game()
+                for seat, name in enumerate(rotation):
+                    result.deal_deltas[name][deal] += score.get(seat + 1, 0)
+
+        for seat, name in enumerate(rotation):
+            result.deltas[name] += simulator.player_delta[seat + 1]
+            result.games[name] += num_deals
+
+    return result
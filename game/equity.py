@@ -0,0 +1,165 @@
+"""
+Hand equity from any point of a hand.
+
+Given the players' hole cards and a partial board (eval7 cards or strings, as
+in GameStateMessage.community_cards), calculate_equity deals out the rest of
+the board from the cards left in a PokerDeck and scores every runout. Small
+runout counts (turn, river and, by default, the flop) are enumerated exactly;
+otherwise runouts are sampled, with numpy when it is installed (one random
+matrix per chunk) and random.Random otherwise. Sampling can be split over
+several processes.
+
+A player's equity is the share of runouts they win, with split pots counted
+as 1 / number of winners.
+"""
+import itertools
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence
+
+import eval7
+
+from deck import CARDS, SEED_BITS, PokerDeck, card_code, np
+from game.hand_strength import HandStrengthCache
+
+BOARD_SIZE = 5
+DEFAULT_EQUITY_SAMPLES = 20000  # Monte Carlo runouts, about 0.5% standard error on an even spot
+LOGGED_EQUITY_SAMPLES = 1000  # Runouts sampled for a logged all-in, a few ms on the game thread (about 1.5% standard error)
+EXACT_RUNOUT_LIMIT = 2000  # Enumerate when there are at most this many runouts (a flop has 990 heads-up)
+
+
+@dataclass
+class EquityResult:
+    """Win, tie and overall equity (0-1) of each player over the runouts that were scored"""
+    win: Dict[int, float]
+    tie: Dict[int, float]
+    equity: Dict[int, float]
+    runouts: int
+    exact: bool
+
+
+def _to_codes(cards: Iterable) -> List[int]:
+    return [card_code(card if isinstance(card, eval7.Card) else eval7.Card(card)) for card in cards]
+
+
+def _score_runouts(hole_codes: List[List[int]], board_codes: List[int], runouts: Iterable[Sequence[int]],
+                   cache: HandStrengthCache = None):
+    """Win counts, tie counts and equity sums per player index over the runouts"""
+    num_players = len(hole_codes)
+    wins = [0] * num_players
+    ties = [0] * num_players
+    shares = [0.0] * num_players
+    count = 0
+
+    if cache is not None:
+        evaluate = cache.evaluate_codes
+        hands = hole_codes
+        board = board_codes
+    else:
+        evaluate = eval7.evaluate
+        hands = [[CARDS[code] for code in codes] for codes in hole_codes]
+        board = [CARDS[code] for code in board_codes]
+
+    for runout in runouts:
+        count += 1
+        if cache is None:
+            runout = [CARDS[code] for code in runout]
+        full_board = board + list(runout)
+        values = [evaluate(hand + full_board) for hand in hands]
+        best = max(values)
+        winners = [i for i, value in enumerate(values) if value == best]
+        if len(winners) == 1:
+            wins[winners[0]] += 1
+            shares[winners[0]] += 1.0
+        else:
+            share = 1.0 / len(winners)
+            for i in winners:
+                ties[i] += 1
+                shares[i] += share
+    return wins, ties, shares, count
+
+
+def _sample_runouts(remaining: List[int], num_cards: int, samples: int, seed: int, chunk: int, use_numpy: bool):
+    """samples random runouts of num_cards from remaining; chunk k is seeded from (seed, k)"""
+    if use_numpy:
+        rng = np.random.default_rng([chunk, seed])
+        # The num_cards smallest of a row of random keys are a uniform sample without replacement
+        picks = rng.random((samples, len(remaining))).argpartition(num_cards - 1, axis=1)[:, :num_cards]
+        return np.asarray(remaining, dtype=np.uint8)[picks].tolist()
+    rng = random.Random(f"{seed}:{chunk}")
+    return [rng.sample(remaining, num_cards) for _ in range(samples)]
+
+
+def _sample_chunk(hole_codes, board_codes, remaining, num_cards, samples, seed, chunk, use_numpy):
+    """Score one chunk of sampled runouts (module level so a process pool can run it)"""
+    runouts = _sample_runouts(remaining, num_cards, samples, seed, chunk, use_numpy)
+    return _score_runouts(hole_codes, board_codes, runouts)
+
+
+def calculate_equity(hands: Dict[int, Sequence],
+                     board: Sequence = (),
+                     samples: int = DEFAULT_EQUITY_SAMPLES,
+                     exact: bool = None,
+                     workers: int = 1,
+                     seed: int = None,
+                     cache: HandStrengthCache = None,
+                     use_numpy: bool = None) -> EquityResult:
+    """
+    Equity of each player's hand (player id -> two hole cards) given the board
+    so far. exact=None enumerates when there are at most EXACT_RUNOUT_LIMIT
+    runouts and samples otherwise. Sampling with the same seed and number of
+    workers gives the same result; workers > 1 scores the samples in that many
+    processes.
+    """
+    if len(hands) < 2:
+        raise ValueError("Equity needs at least two hands")
+    if samples < 1:
+        raise ValueError("samples must be at least 1")
+    if use_numpy and np is None:
+        raise ImportError("numpy is not installed")
+    use_numpy = np is not None if use_numpy is None else use_numpy
+
+    players = list(hands)
+    hole_codes = [_to_codes(hands[player]) for player in players]
+    board_codes = _to_codes(board)
+    if len(board_codes) > BOARD_SIZE:
+        raise ValueError(f"A board has at most {BOARD_SIZE} cards")
+
+    deck = PokerDeck(0)  # Unshuffled, only the remaining cards are used
+    deck.remove_multiple([CARDS[code] for codes in hole_codes for code in codes] + [CARDS[code] for code in board_codes])
+    remaining = deck.remaining_codes()
+    num_cards = BOARD_SIZE - len(board_codes)
+
+    if exact is None:
+        exact = num_cards == 0 or math.comb(len(remaining), num_cards) <= EXACT_RUNOUT_LIMIT
+
+    if exact:
+        wins, ties, shares, count = _score_runouts(hole_codes, board_codes, itertools.combinations(remaining, num_cards), cache)
+    else:
+        seed = seed if seed is not None else random.getrandbits(SEED_BITS)
+        workers = min(workers, samples)  # Every worker gets at least one runout
+        if workers > 1:
+            sizes = [samples // workers + (i < samples % workers) for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_sample_chunk, hole_codes, board_codes, remaining, num_cards, size, seed, chunk, use_numpy)
+                           for chunk, size in enumerate(sizes) if size]
+                chunks = [future.result() for future in futures]
+        else:
+            runouts = _sample_runouts(remaining, num_cards, samples, seed, 0, use_numpy)
+            chunks = [_score_runouts(hole_codes, board_codes, runouts, cache)]
+        wins, ties, shares, count = chunks[0]
+        for chunk_wins, chunk_ties, chunk_shares, chunk_count in chunks[1:]:
+            wins = [a + b for a, b in zip(wins, chunk_wins)]
+            ties = [a + b for a, b in zip(ties, chunk_ties)]
+            shares = [a + b for a, b in zip(shares, chunk_shares)]
+            count += chunk_count
+
+    return EquityResult(
+        win={player: wins[i] / count for i, player in enumerate(players)},
+        tie={player: ties[i] / count for i, player in enumerate(players)},
+        equity={player: shares[i] / count for i, player in enumerate(players)},
+        runouts=count,
+        exact=exact
+    )
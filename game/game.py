@@ -2,31 +2,112 @@ from typing import Tuple, Set, Dict, List
 
 import eval7
 from config import NUM_ROUNDS
-from deck import PokerDeck
-from game.round_state import RoundState
+from deck import DeckPool, PokerDeck
+from game.action_log import ActionSequence, with_cumulative_ids
+from game.round_state import Pot, RoundState
+from game.equity import BOARD_SIZE, LOGGED_EQUITY_SAMPLES, calculate_equity
+from game.hand_strength import HandStrengthCache
+from game.log_sink import JsonFileSink, LogSink
+from game.showdown import evaluate_hands, rank_hands, resolve_pots
 from poker_type.game import PokerRound, PokerAction
 from poker_type.messsage import GameStateMessage
 from poker_type.utils import get_poker_action_name_from_enum, get_round_name
-from config import BASE_PATH
 import time
-import os
-import json
 import uuid
 
 GAME_ROUNDS = [PokerRound.PREFLOP, PokerRound.FLOP, PokerRound.TURN, PokerRound.RIVER]
 
+# Game attributes that change while a hand is played, saved by Game.snapshot().
+# Settings like debug, seed, write_log or the deck pool are not part of it.
+HAND_STATE = (
+    "players", "active_players", "seats", "active_mask", "deck", "hands", "board", "round_index",
+    "total_pot", "historical_pots", "cumulative_pot", "cumulative_side_pots", "player_history",
+    "current_round", "score", "is_running", "game_start_time", "blind_amount", "small_blind_player",
+    "big_blind_player", "dealer_button_position", "blind_players_added_back", "player_starting_money",
+    "player_final_money", "player_delta", "json_game_log"
+)
+
+
+class GameSnapshot:
+    """Saved hand state of a Game, see Game.snapshot()"""
+    __slots__ = HAND_STATE
+
+
+def _copy_hand_state(source, target):
+    """
+    Copy the hand state from source to target (a Game or a GameSnapshot).
+    Containers a hand mutates are copied one level deep; what is only ever
+    replaced (hole cards, completed rounds, cumulative side pots) is shared.
+    """
+    target.players = source.players.copy()
+    target.active_players = source.active_players.copy()
+    target.seats = source.seats.copy()
+    target.active_mask = source.active_mask
+    target.deck = source.deck.copy() if source.deck is not None else None
+    target.hands = source.hands.copy()
+    target.board = list(source.board)
+    target.round_index = source.round_index
+    target.total_pot = source.total_pot
+    target.historical_pots = source.historical_pots.copy()
+    target.cumulative_pot = source.cumulative_pot
+    target.cumulative_side_pots = source.cumulative_side_pots
+    target.player_history = source.player_history.copy()
+    target.current_round = source.current_round.copy() if source.current_round is not None else None
+    target.score = source.score.copy()
+    target.is_running = source.is_running
+    target.game_start_time = source.game_start_time
+    target.blind_amount = source.blind_amount
+    target.small_blind_player = source.small_blind_player
+    target.big_blind_player = source.big_blind_player
+    target.dealer_button_position = source.dealer_button_position
+    target.blind_players_added_back = source.blind_players_added_back
+    target.player_starting_money = source.player_starting_money.copy()
+    target.player_final_money = source.player_final_money.copy()
+    target.player_delta = source.player_delta.copy()
+
+    game_log = dict(source.json_game_log)
+    game_log["rounds"] = dict(game_log["rounds"])
+    if "playerMoney" in game_log:
+        game_log["playerMoney"] = dict(game_log["playerMoney"])
+    target.json_game_log = game_log
+
+
 class Game:
-    def __init__(self, debug: bool = False, blind_amount: int = 10, game_sequence: int = None, game_id: str = None):
+    __slots__ = (
+        "debug", "seed", "deck_pool", "write_log", "log_sink", "hand_cache", "record_equity", "equity_samples", "nums_round",
+        "players", "active_players", "seats", "active_mask", "deck", "hands", "board", "round_index",
+        "total_pot", "historical_pots", "cumulative_pot", "cumulative_side_pots", "player_history",
+        "current_round", "score", "is_running", "game_start_time", "game_sequence", "simulation_game_id",
+        "blind_amount", "small_blind_player", "big_blind_player", "dealer_button_position",
+        "blind_players_added_back", "player_starting_money", "player_final_money", "player_delta",
+        "initial_money", "json_game_log"
+    )
+
+    def __init__(self, debug: bool = False, blind_amount: int = 10, game_sequence: int = None, game_id: str = None, write_log: bool = True, seed: int = None, deck_pool: DeckPool = None, hand_cache: HandStrengthCache = None, record_equity: bool = False, log_sink: LogSink = None, equity_samples: int = LOGGED_EQUITY_SAMPLES):
         self.debug = debug
+        self.seed = seed  # Deck seed, a fresh one is drawn for each start_game() when None
+        self.deck_pool = deck_pool  # Source of pre-shuffled decks, used when no seed is given
+        self.write_log = write_log  # Write the JSON game log when the game ends
+        self.log_sink = log_sink  # Where the game log goes, one JSON file per game when None
+        self.hand_cache = hand_cache  # Optional HandStrengthCache for showdown evaluation, can be shared by games
+        self.record_equity = record_equity  # Log each player's equity once no more betting is possible
+        self.equity_samples = equity_samples  # Runouts sampled for it when there are too many to enumerate
         self.nums_round = NUM_ROUNDS
         self.players: List[int] = []
         self.active_players: List[int] = []
-        self.deck = PokerDeck()
+        # Seat bookkeeping: players[seat] is the player in a seat, seats maps a player
+        # to it, and bit `seat` of active_mask is set while the player is in the hand
+        self.seats: Dict[int, int] = {}
+        self.active_mask = 0
+        self.deck: PokerDeck = None  # Created and shuffled in start_game
         self.hands: Dict[int, List[eval7.Card]] = {}
         self.board: List[str] = []
         self.round_index = -1
         self.total_pot = 0
         self.historical_pots: List[int] = []
+        # Pot and side pots of the completed rounds, updated once per round in end_round
+        self.cumulative_pot = 0
+        self.cumulative_side_pots: List[Dict] = []
         self.player_history: Dict = {}
         self.current_round: RoundState = None
         self.score = {}
@@ -103,9 +184,7 @@ class Game:
         forced_fold_players = []
         big_blind_amount = blind_amount
         
-        # Get all players in order starting from dealer button position
-        all_players = self.players.copy()
-        num_players = len(all_players)
+        num_players = len(self.players)
         
         # First pass: remove players who can't afford the big blind
         players_to_remove = []
@@ -115,29 +194,16 @@ class Game:
         
         for player_id in players_to_remove:
             forced_fold_players.append(player_id)
-            self.active_players.remove(player_id)
+            self._deactivate(player_id)
         
         # If we don't have enough players after removing those who can't afford big blind
         if len(self.active_players) < 2:
             return forced_fold_players
         
-        # Find small blind player (first player who can afford big blind)
-        small_blind_player = None
-        for i in range(num_players):
-            player_pos = (self.dealer_button_position + i) % num_players
-            player_id = all_players[player_pos]
-            if player_id in self.active_players:
-                small_blind_player = player_id
-                break
-        
-        # Find big blind player (next player who can afford big blind)
-        big_blind_player = None
-        for i in range(num_players):
-            player_pos = (self.dealer_button_position + i) % num_players
-            player_id = all_players[player_pos]
-            if player_id in self.active_players and player_id != small_blind_player:
-                big_blind_player = player_id
-                break
+        # Small blind is the first active player from the dealer button position, big blind the next one
+        blind_order = self._players_from_seat(self.dealer_button_position % num_players, self.active_mask)
+        small_blind_player = blind_order[0] if blind_order else None
+        big_blind_player = blind_order[1] if len(blind_order) > 1 else None
         
         # Assign the blind players
         self.small_blind_player = small_blind_player
@@ -185,9 +251,43 @@ class Game:
         self.board = board
 
     def add_player(self, player_id: int):
+        seat = len(self.players)
+        self.seats[player_id] = seat
+        self.active_mask |= 1 << seat
         self.players.append(player_id)
         self.active_players.append(player_id)
 
+    def _deactivate(self, player_id: int):
+        """Take a player out of the hand (folded or can't afford the blind)"""
+        self.active_players.remove(player_id)
+        self.active_mask &= ~(1 << self.seats[player_id])
+
+    def is_active(self, player_id: int) -> bool:
+        """Whether the player is still in the hand"""
+        seat = self.seats.get(player_id)
+        return seat is not None and bool(self.active_mask >> seat & 1)
+
+    def _seat_mask(self, players) -> int:
+        """Bitmask of the seats of the given players, players without a seat are ignored"""
+        mask = 0
+        for player_id in players:
+            seat = self.seats.get(player_id)
+            if seat is not None:
+                mask |= 1 << seat
+        return mask
+
+    def _players_from_seat(self, start_seat: int, mask: int) -> List[int]:
+        """Players whose seat bit is set in mask, going around the table from start_seat"""
+        num_seats = len(self.players)
+        # Rotate the mask so start_seat becomes bit 0, then walk the set bits
+        rotated = (mask >> start_seat | mask << (num_seats - start_seat)) & ((1 << num_seats) - 1)
+        ordered_players = []
+        while rotated:
+            low_bit = rotated & -rotated
+            ordered_players.append(self.players[(start_seat + low_bit.bit_length() - 1) % num_seats])
+            rotated ^= low_bit
+        return ordered_players
+
     def get_active_players(self):
         return self.active_players
     
@@ -233,8 +333,11 @@ class Game:
 
     def start_game(self):
         self.game_start_time = int(time.time() * 1000)
-        self.deck = PokerDeck()
-        self.deck.shuffle()
+        if self.seed is None and self.deck_pool is not None:
+            self.deck = PokerDeck.from_pool(self.deck_pool)
+        else:
+            self.deck = PokerDeck(self.seed)
+            self.deck.shuffle()
         self.round_index = 0
         self.is_running = True
         self.blind_players_added_back = False  # Reset for new game
@@ -244,12 +347,20 @@ class Game:
         
         self.json_game_log = {
             "gameId": game_id,
+            "seed": self.deck.seed,
             "rounds": {},
             "playerNames": {},
             "blinds": {},
             "finalBoard": [],
             "sidePots": []
         }
+        if self.deck.pool_index is not None:
+            self.json_game_log["deckPool"] = {
+                "seed": self.deck_pool.seed,
+                "index": self.deck.pool_index,
+                "batchSize": self.deck_pool.batch_size,
+                "numpy": self.deck_pool.use_numpy
+            }
         
         # Add player money information if available
         if self.player_starting_money or self.player_delta:
@@ -266,6 +377,8 @@ class Game:
         
         self.total_pot = 0
         self.historical_pots = []
+        self.cumulative_pot = 0
+        self.cumulative_side_pots = []
         self.player_history = {}
         self.score = {
             player: 0 for player in self.active_players
@@ -282,6 +395,9 @@ class Game:
             "small": self.blind_amount // 2,
             "big": self.blind_amount
         }
+        if self.small_blind_player and self.big_blind_player:
+            self.json_game_log['blinds']["smallBlindPlayer"] = self.small_blind_player - 1
+            self.json_game_log['blinds']["bigBlindPlayer"] = self.big_blind_player - 1
 
         # Initialize the first round
         self.current_round = RoundState(self.active_players)
@@ -310,8 +426,35 @@ class Game:
         self.current_round.waiting_for.discard(self.small_blind_player)
         self.current_round.waiting_for.discard(self.big_blind_player)
 
+    def limit_action_to_money(self, player_id: int, action: Tuple[PokerAction, int], player_money: Dict[int, int]) -> Tuple[Tuple[PokerAction, int], bool]:
+        """
+        Adjust an action to what the player can afford.
+        Calls and raises the player can't pay for become folds, an oversized all-in
+        is reduced to the player's money. Fold and check are never adjusted.
+        Returns the (possibly adjusted) action and whether the player was forced to fold.
+        """
+        action_type, amount = action
+        if action_type in (PokerAction.FOLD, PokerAction.CHECK):
+            return action, False
+
+        current_money = player_money.get(player_id, 0)
+
+        if action_type == PokerAction.CALL:
+            # The amount sent by the client doesn't matter for a call
+            call_amount = self.current_round.raise_amount - self.current_round.player_bets.get(player_id, 0)
+            if call_amount > current_money:
+                return (PokerAction.FOLD, 0), True
+            return action, False
+
+        if amount > current_money:
+            if action_type == PokerAction.ALL_IN:
+                return (PokerAction.ALL_IN, current_money), False
+            return (PokerAction.FOLD, 0), True
+
+        return action, False
+
     def update_game(self, player_id: int, action: Tuple[PokerAction, int]):
-        if player_id not in self.active_players:
+        if not self.is_active(player_id):
             raise ValueError("Player is not active in the game")
         
         action_type, amount = action
@@ -322,32 +465,6 @@ class Game:
                     print(f"Player {player_id} is all in from previous round")
                 action_type, amount = PokerAction.ALL_IN, 0
 
-        # Calculate cumulative pot information from all previous rounds
-        cumulative_pot = 0
-        cumulative_side_pots = []
-        side_pot_id_counter = 0
-        
-        # Add historical pots from completed rounds
-        for round_idx in self.player_history:
-            round_history = self.player_history[round_idx]
-            # Add the total pot amount for this round (just once per round)
-            cumulative_pot += round_history["pot"]
-            
-            # For side pots, use the final state of the round if available
-            if "action_sequence" in round_history and round_history["action_sequence"]:
-                final_action = round_history["action_sequence"][-1]
-                # Add side pots with unique IDs from the final action of the round
-                for side_pot in final_action["side_pots_after_action"]:
-                    cumulative_side_pots.append({
-                        "id": side_pot_id_counter,
-                        "amount": side_pot["amount"],
-                        "eligible_players": side_pot["eligible_players"]
-                    })
-                    side_pot_id_counter += 1
-
-        # Update round state with cumulative information
-        self.current_round.set_cumulative_pot_info(cumulative_pot, cumulative_side_pots)
-        
         # Update round state
         self.current_round.update_player_action(player_id, action_type, amount)
 
@@ -356,7 +473,7 @@ class Game:
         
         # Remove player from active players if they folded
         if action_type == PokerAction.FOLD:
-            self.active_players.remove(player_id)
+            self._deactivate(player_id)
             
         # Special preflop logic: After all non-blind players have acted once, 
         # add blind players back for their option to act
@@ -405,8 +522,9 @@ class Game:
 
         self.round_index += 1
         
-        # Create new round state
+        # Create new round state, carrying the pots of the completed rounds
         self.current_round = RoundState(self.active_players)
+        self.current_round.set_cumulative_pot_info(self.cumulative_pot, self.cumulative_side_pots)
 
         if(GAME_ROUNDS[self.round_index] == PokerRound.FLOP):
             # Burn one card
@@ -421,25 +539,47 @@ class Game:
         self.json_game_log['finalBoard'] = [str(card) for card in self.board]
         
 
+    def is_all_in_runout(self) -> bool:
+        """
+        True when no more betting is possible: two or more players are left, at
+        most one of them isn't all-in and board cards are still to come.
+        """
+        if not self.is_running or len(self.active_players) < 2 or len(self.board) >= BOARD_SIZE:
+            return False
+        all_in_players = self._all_in_players()
+        return sum(1 for player in self.active_players if player not in all_in_players) <= 1
+
+    def run_out_board(self):
+        """
+        Deal the rest of the board in one step and go to showdown, instead of a
+        betting round per street in which nobody can bet. Cards are burned and
+        dealt in the same order as street by street, so a seed deals the same board.
+        """
+        if not self.board:
+            self.deck.deal(1)  # Burn a card
+            self.board = self.deck.deal(3)
+        while len(self.board) < BOARD_SIZE:
+            self.deck.deal(1)  # Burn a card
+            self.board.append(self.deck.deal(1)[0])
+
+        self.json_game_log['finalBoard'] = [str(card) for card in self.board]
+        self.end_game()
+
+    def _all_in_players(self) -> Set[int]:
+        """Players who went all-in in any round so far"""
+        return {
+            player
+            for history in self.player_history.values()
+            for player, action in history["player_actions"].items()
+            if action == PokerAction.ALL_IN
+        }
+
     def end_round(self):
         if not self.current_round.is_round_complete():
             raise ValueError("Round cannot end while players are still waiting to act")
         
-        # Convert action history to the new format
-        action_sequence = []
-        for action_record in self.current_round.action_history:
-            action_sequence.append({
-                "player": action_record.player_id - 1,  # Convert to 0-based indexing for JSON
-                "action": get_poker_action_name_from_enum(action_record.action).upper(),
-                "amount": action_record.amount,
-                "timestamp": action_record.timestamp,
-                # Round-specific pot information
-                "pot_after_action": action_record.pot_after_action,
-                "side_pots_after_action": action_record.side_pots_after_action,
-                # Cumulative pot information across all rounds
-                "total_pot_after_action": action_record.total_pot_after_action,
-                "total_side_pots_after_action": action_record.total_side_pots_after_action
-            })
+        # Lazy view of the action history in the log format, materialised when the log is written
+        action_sequence = ActionSequence(self.current_round.action_history)
 
         # Keep backward compatibility with old format for now
         actions = {
@@ -457,12 +597,48 @@ class Game:
 
         self.historical_pots.append(self.current_round.pot)
         self.total_pot += self.current_round.pot
+        self._add_round_to_cumulative_pots()
         self.player_history[self.round_index] =  {
             "pot": self.current_round.pot,
             "player_bets": self.current_round.player_bets,
             "player_actions": self.current_round.player_actions,
             "action_sequence": action_sequence  # Store new format in history too
         }
+        if self.record_equity and "allInEquity" not in self.json_game_log:
+            self._record_all_in_equity()
+
+    def _record_all_in_equity(self):
+        """
+        Log the players' equity at the end of the first round after which no
+        more betting is possible (see is_all_in_runout).
+        Comparing it to the result gives a luck-adjusted score. This runs on
+        the game thread, so spots with too many runouts to enumerate (preflop)
+        only sample equity_samples of them.
+        """
+        if not self.is_all_in_runout():
+            return
+
+        result = calculate_equity({player: self.hands[player] for player in self.active_players}, self.board,
+                                  samples=self.equity_samples, seed=self.deck.seed, cache=self.hand_cache)
+        self.json_game_log["allInEquity"] = {
+            "round": self.round_index,
+            "board": [str(card) for card in self.board],
+            "equity": {player - 1: equity for player, equity in result.equity.items()},
+            "win": {player - 1: win for player, win in result.win.items()},
+            "tie": {player - 1: tie for player, tie in result.tie.items()},
+            "runouts": result.runouts,
+            "exact": result.exact
+        }
+
+    def _add_round_to_cumulative_pots(self):
+        """Fold the finished round's pot and final side pots into the cumulative summary"""
+        self.cumulative_pot += self.current_round.pot
+        action_history = self.current_round.action_history
+        if not action_history:
+            return
+        # Side pots as of the round's last action, with ids continuing from earlier rounds.
+        # A new list is built so the one shared by earlier action records stays untouched.
+        self.cumulative_side_pots = with_cumulative_ids(self.cumulative_side_pots, action_history.side_pots_after(-1))
 
     def end_game(self):
         # Ensure current round bets are included in player history if not already
@@ -581,53 +757,24 @@ class Game:
                 self._write_game_log_to_file()
                 return
         
-        # Evaluate hands for all active players
-        hand_values = {}
-        for player in self.active_players:
-            players_hand = self.hands[player].copy()
-            players_hand.extend(self.board)
-            hand_values[player] = eval7.evaluate(players_hand)
+        # Evaluate and rank all active hands once, then split every pot from that ranking
+        hand_values = evaluate_hands(self.hands, self.board, self.active_players, self.hand_cache)
+        ranks = rank_hands(hand_values)
         
         if self.debug:
             print(f"Hand values: {hand_values}")
             print(f"Distributing {len(final_pots)} pot(s)")
         
-        # Award each pot to the best hand among eligible players
-        for i, pot in enumerate(final_pots):
-            print(f"Pot {i}: {pot.amount} chips, eligible players: {pot.eligible_players}")
-            print(f"Active players: {self.active_players}")
-            print(f"Player history: {self.player_history}")
-            if pot.amount == 0:
-                continue
-                
-            # Find eligible players who are still active
-            eligible_active_players = pot.eligible_players.intersection(set(self.active_players))
-            
-            if len(eligible_active_players) == 0:
-                if self.debug:
-                    print(f"Pot {i}: No eligible active players, pot amount {pot.amount} is lost")
-                continue
-            
-            # Find the best hand among eligible players
-            eligible_hand_values = {player: hand_values[player] for player in eligible_active_players}
-            pot_winners = [player for player, value in eligible_hand_values.items() 
-                          if value == max(eligible_hand_values.values())]
-            
-            # Split pot among tied winners
-            pot_share = pot.amount // len(pot_winners)
-            remainder = pot.amount % len(pot_winners)
-            
+        for i, award in enumerate(resolve_pots(final_pots, ranks, self.active_players)):
             if self.debug:
-                print(f"Pot {i}: {pot.amount} chips, eligible players: {eligible_active_players}")
-                print(f"Winners: {pot_winners}, each gets {pot_share} chips")
-                if remainder > 0:
-                    print(f"Remainder of {remainder} chips goes to player {pot_winners[0]}")
+                print(f"Pot {i}: {award.amount} chips, winners: {award.winners}, each gets {award.share} chips")
+                if award.remainder > 0:
+                    print(f"Remainder of {award.remainder} chips goes to player {award.winners[0]}")
             
-            for j, winner in enumerate(pot_winners):
-                self.score[winner] += pot_share
-                # Give remainder to first winner (arbitrary but fair)
-                if j == 0:
-                    self.score[winner] += remainder
+            for winner in award.winners:
+                self.score[winner] += award.share
+            # Give remainder to first winner (arbitrary but fair)
+            self.score[award.winners[0]] += award.remainder
 
         if self.debug:
             print(f"Player hands:")
@@ -704,9 +851,9 @@ class Game:
             total_pot = sum(sum(round_bets.values()) for round_bets in 
                            [self.player_history[round_idx]["player_bets"] for round_idx in self.player_history])
             if len(active_players) == 1:
-                return [type('Pot', (), {'amount': total_pot, 'eligible_players': active_players})()]
+                return [Pot(total_pot, active_players)]
             else:
-                return [type('Pot', (), {'amount': total_pot, 'eligible_players': set()})()]
+                return [Pot(total_pot, set())]
         
         # Calculate cumulative bet amounts for each player
         cumulative_bets = {}
@@ -722,7 +869,7 @@ class Game:
         if len(bet_levels) <= 1:
             # All players bet the same amount
             total_pot = sum(cumulative_bets.values())
-            return [type('Pot', (), {'amount': total_pot, 'eligible_players': active_players})()]
+            return [Pot(total_pot, active_players)]
         
         # Create side pots for each betting level
         pots = []
@@ -752,39 +899,52 @@ class Game:
             
             if contributing_count > 0 and level_contribution > 0:
                 pot_amount = level_contribution * contributing_count
-                pots.append(type('Pot', (), {'amount': pot_amount, 'eligible_players': eligible_players})())
+                pots.append(Pot(pot_amount, eligible_players))
         
         # If no pots were created, create a single main pot
         if len(pots) == 0:
             total_pot = sum(cumulative_bets.values())
-            pots = [type('Pot', (), {'amount': total_pot, 'eligible_players': active_players})()]
+            pots = [Pot(total_pot, active_players)]
         
         return pots
 
     def _write_game_log_to_file(self):
-        """Write the game log to a JSON file"""
-        try:
-            game_id = self.json_game_log.get('gameId', f"unknown_{int(time.time())}")
-            
-            # Include game sequence number in filename if available
-            if self.game_sequence is not None:
-                filename = f"game_log_{self.game_sequence}_{game_id}.json"
-            else:
-                filename = f"game_log_{game_id}.json"
-                
-            os.makedirs(BASE_PATH, exist_ok=True)
-            filepath = os.path.join(BASE_PATH, filename)
+        """Hand the game log to the log sink (by default a JSON file per game)"""
+        if not self.write_log:
+            return
 
-            with open(filepath, 'w') as f:
-                json.dump(self.json_game_log, f, indent = 2)
+        try:
+            self._materialize_action_sequences()
+            sink = self.log_sink if self.log_sink is not None else JsonFileSink()
+            sink.write(self.json_game_log, self.game_sequence)
 
             if self.debug:
-                print(f"Game log successfully written to {filepath}")
+                print(f"Game log successfully written to {type(sink).__name__}")
         except Exception as e:
             print(f"Error writing game log to JSON: {e}")
 
+    def _materialize_action_sequences(self):
+        """Replace the lazy action_sequence views in the game log with plain lists"""
+        for round_log in self.json_game_log["rounds"].values():
+            if isinstance(round_log.get("action_sequence"), ActionSequence):
+                round_log["action_sequence"] = round_log["action_sequence"].to_list()
+
     def get_final_score(self):
         return self.score
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Save the hand state (round state, pots, deck position, history and log)
+        so it can be restored any number of times, e.g. to branch rollouts from
+        one decision point. Much cheaper than copy.deepcopy of the game.
+        """
+        snapshot = GameSnapshot()
+        _copy_hand_state(self, snapshot)
+        return snapshot
+
+    def restore(self, snapshot: GameSnapshot):
+        """Go back to a snapshot of this game; the snapshot stays valid for later restores"""
+        _copy_hand_state(snapshot, self)
     
     def get_game_state(self, player_money: Dict[int, int] = None) -> GameStateMessage:
         round_name = get_round_name(self.round_index)
@@ -824,9 +984,7 @@ class Game:
         # In multi-player games, this is typically the small blind position
         # In heads-up, this is the big blind position
         
-        # Get all players in their seated order
-        all_players = self.players.copy()
-        num_players = len(all_players)
+        num_players = len(self.players)
         
         if num_players < 2:
             return players_to_order
@@ -839,15 +997,8 @@ class Game:
             # Multi-player: small blind acts first post-flop (to the left of dealer)
             start_pos = (self.dealer_button_position) % num_players
         
-        # Create ordered list starting from the correct position
-        ordered_players = []
-        for i in range(num_players):
-            player_pos = (start_pos + i) % num_players
-            player_id = all_players[player_pos]
-            if player_id in players_to_order:
-                ordered_players.append(player_id)
-        
-        return ordered_players
+        # Seats of the players to order, walked from the starting position
+        return self._players_from_seat(start_pos, self._seat_mask(players_to_order))
 
     def get_preflop_order(self, players_to_order: List[int]) -> List[int]:
         """
@@ -858,9 +1009,7 @@ class Game:
         if not players_to_order:
             return []
         
-        # Get all players in their seated order
-        all_players = self.players.copy()
-        num_players = len(all_players)
+        num_players = len(self.players)
         
         if num_players < 2:
             return players_to_order
@@ -874,15 +1023,8 @@ class Game:
             # Small blind is at position (dealer_button_position + 1) % num_players
             start_pos = (self.dealer_button_position + 2) % num_players
         
-        # Create ordered list starting from small blind position
-        ordered_players = []
-        for i in range(num_players):
-            player_pos = (start_pos + i) % num_players
-            player_id = all_players[player_pos]
-            if player_id in players_to_order:
-                ordered_players.append(player_id)
-        
-        return ordered_players
+        # Seats of the players to order, walked from the small blind position
+        return self._players_from_seat(start_pos, self._seat_mask(players_to_order))
 
     def set_player_money_info(self, player_starting_money: Dict[int, int], player_delta: Dict[int, int], initial_money: int):
         """Set player money information from the server"""
@@ -0,0 +1,297 @@
+"""
+Hand history store: a JSON Lines log plus a fixed-size binary index.
+
+HandStore is a log sink that appends each game log as one line to
+<name>.jsonl and a record to <name>.idx with where that line is (byte offset
+and length), the game's id and sequence number, and each player's net chips
+for the hand. Index records all have the same size, so HandStoreReader finds
+record i with one multiplication on a memory-mapped index, and a hand (or a
+run of consecutive hands) with one seek into the log. Analysis that only needs
+who played and who won can scan the index without touching the log; with numpy
+installed, index_array() views the whole index as a structured array.
+
+Index layout (little-endian): a 16-byte header (magic, version, player slots)
+followed by records of
+
+    game key    16 bytes  uuid bytes of gameId (md5 of it when it isn't a uuid)
+    sequence    int64     game_sequence, -1 when the game had none
+    offset      uint64    byte offset of the log line
+    length      uint32    length of the log line, newline included
+    players     uint16    number of player slots used
+    (padding)   2 bytes
+    slots       player_slots x (uint32 player id, int32 net chips)
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from config import BASE_PATH
+from deck import np
+from game.log_sink import JSONL_BATCH_SIZE, LogSink, json_default
+
+INDEX_MAGIC = b"PKHIDX"
+INDEX_VERSION = 1
+INDEX_PLAYER_SLOTS = 10  # Players a record has room for, a full-ring table
+NO_SEQUENCE = -1
+
+_HEADER = struct.Struct("<6sHH6x")
+_RECORD_HEAD = struct.Struct("<16sqQIH2x")
+
+
+def game_key(game_id: str) -> bytes:
+    """16-byte index key of a gameId"""
+    try:
+        return uuid.UUID(game_id).bytes
+    except (ValueError, TypeError, AttributeError):
+        return hashlib.md5(str(game_id).encode('utf-8')).digest()
+
+
+def _record_struct(player_slots: int) -> struct.Struct:
+    return struct.Struct(_RECORD_HEAD.format + "Ii" * player_slots)
+
+
+@dataclass
+class IndexEntry:
+    """One index record: where a hand's log line is and each player's net chips"""
+    game_key: bytes
+    game_sequence: Optional[int]
+    offset: int
+    length: int
+    deltas: Dict[int, int]
+
+
+def _read_header(path: str) -> int:
+    """Player slots of an existing index file"""
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} is not a hand index")
+    magic, version, player_slots = _HEADER.unpack(header)
+    if magic != INDEX_MAGIC or version != INDEX_VERSION:
+        raise ValueError(f"{path} is not a version {INDEX_VERSION} hand index")
+    return player_slots
+
+
+class HandStore(LogSink):
+    """
+    Log sink writing <directory>/<name>.jsonl and its index <name>.idx.
+
+    Logs are serialised right away and written batch_size at a time (and on
+    flush/close), log lines before their index records. Opening an existing
+    store appends to it; log lines a crash left without an index record are
+    cut off first.
+    """
+
+    def __init__(self,
+                 directory: str = BASE_PATH,
+                 name: str = "hands",
+                 player_slots: int = INDEX_PLAYER_SLOTS,
+                 batch_size: int = JSONL_BATCH_SIZE):
+        self.directory = directory
+        self.name = name
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending: List[tuple] = []
+        self.log_file = None
+        self.index_file = None
+        self.offset = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.log_path = os.path.join(directory, f"{name}.jsonl")
+        self.index_path = os.path.join(directory, f"{name}.idx")
+        if os.path.exists(self.index_path):
+            player_slots = _read_header(self.index_path)
+        self.player_slots = player_slots
+        self.record = _record_struct(player_slots)
+
+    def write(self, game_log: Dict, game_sequence: int = None):
+        line = (json.dumps(game_log, separators=(',', ':'), default=json_default) + "\n").encode('utf-8')
+        deltas = game_log.get('playerMoney', {}).get('gameScores', {})
+        if len(deltas) > self.player_slots:
+            raise ValueError(f"Hand has {len(deltas)} players, the index has room for {self.player_slots}")
+        with self.lock:
+            self.pending.append((game_key(game_log.get('gameId')), game_sequence, line, deltas))
+            if len(self.pending) >= self.batch_size:
+                self._write_pending()
+
+    def flush(self):
+        with self.lock:
+            self._write_pending()
+            if self.log_file is not None:
+                self.log_file.flush()
+                self.index_file.flush()
+
+    def close(self):
+        with self.lock:
+            self._write_pending()
+            if self.log_file is not None:
+                self.log_file.close()
+                self.index_file.close()
+                self.log_file = None
+                self.index_file = None
+
+    def _open(self):
+        if os.path.exists(self.index_path):
+            count = (os.path.getsize(self.index_path) - _HEADER.size) // self.record.size
+            self.index_file = open(self.index_path, 'r+b')
+            self.index_file.truncate(_HEADER.size + count * self.record.size)  # Drop a torn last record
+            self.offset = 0
+            if count:
+                self.index_file.seek(_HEADER.size + (count - 1) * self.record.size)
+                _, _, offset, length, _ = _RECORD_HEAD.unpack_from(self.index_file.read(self.record.size))
+                self.offset = offset + length
+            self.index_file.seek(0, os.SEEK_END)
+            self.log_file = open(self.log_path, 'a+b')
+            self.log_file.truncate(self.offset)
+        else:
+            self.index_file = open(self.index_path, 'wb')
+            self.index_file.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.player_slots))
+            self.log_file = open(self.log_path, 'wb')
+            self.offset = 0
+
+    def _write_pending(self):
+        if not self.pending:
+            return
+        if self.log_file is None:
+            self._open()
+
+        lines = []
+        records = []
+        empty_slots = [0, 0] * self.player_slots
+        for key, game_sequence, line, deltas in self.pending:
+            slots = [value for player_id, delta in deltas.items() for value in (int(player_id), delta)]
+            records.append(self.record.pack(
+                key, NO_SEQUENCE if game_sequence is None else game_sequence, self.offset, len(line), len(deltas),
+                *slots, *empty_slots[len(slots):]))
+            lines.append(line)
+            self.offset += len(line)
+        self.log_file.write(b"".join(lines))
+        self.log_file.flush()  # Log lines reach the file before the records pointing at them
+        self.index_file.write(b"".join(records))
+        self.pending = []
+
+
+class HandStoreReader:
+    """
+    Read side of a HandStore: the index is memory-mapped, hands are read from
+    the log with one seek each. Lookups by sequence are O(1) when sequences
+    were written in order without gaps (as BatchSimulator and the servers do);
+    otherwise, and for gameIds, a dict is built from one scan of the index.
+    """
+
+    def __init__(self, directory: str = BASE_PATH, name: str = "hands"):
+        self.log_path = os.path.join(directory, f"{name}.jsonl")
+        self.index_path = os.path.join(directory, f"{name}.idx")
+        self.player_slots = _read_header(self.index_path)
+        self.record = _record_struct(self.player_slots)
+
+        self.index_file = open(self.index_path, 'rb')
+        size = os.path.getsize(self.index_path)
+        self.count = (size - _HEADER.size) // self.record.size
+        self.index = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ) if self.count else b""
+        self.log_file = open(self.log_path, 'rb')
+        self._by_sequence = None
+        self._by_key = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.index, mmap.mmap):
+            try:
+                self.index.close()
+            except BufferError:
+                pass  # An index_array() view still uses the map, it is unmapped with the view
+        self.index_file.close()
+        self.log_file.close()
+
+    def entry(self, position: int) -> IndexEntry:
+        """Index record number position (write order)"""
+        if not 0 <= position < self.count:
+            raise IndexError(f"Index record {position} out of range")
+        values = self.record.unpack_from(self.index, _HEADER.size + position * self.record.size)
+        key, game_sequence, offset, length, num_players = values[:5]
+        slots = values[5:5 + 2 * num_players]
+        return IndexEntry(key, None if game_sequence == NO_SEQUENCE else game_sequence, offset, length,
+                          dict(zip(slots[::2], slots[1::2])))
+
+    def entries(self) -> Iterator[IndexEntry]:
+        for position in range(self.count):
+            yield self.entry(position)
+
+    def _sequence_at(self, position: int) -> int:
+        return struct.unpack_from("<q", self.index, _HEADER.size + position * self.record.size + 16)[0]
+
+    def position_of_sequence(self, game_sequence: int) -> Optional[int]:
+        """Index position of a game_sequence, None when it isn't in the store"""
+        if not self.count:
+            return None
+        position = game_sequence - self._sequence_at(0)
+        if 0 <= position < self.count and self._sequence_at(position) == game_sequence:
+            return position
+        if self._by_sequence is None:
+            self._by_sequence = {self._sequence_at(i): i for i in range(self.count)}
+        return self._by_sequence.get(game_sequence)
+
+    def positions_of_game(self, game_id: str) -> List[int]:
+        """Index positions of every hand with this gameId (a simulation shares one id)"""
+        if self._by_key is None:
+            self._by_key = {}
+            for i in range(self.count):
+                start = _HEADER.size + i * self.record.size
+                self._by_key.setdefault(bytes(self.index[start:start + 16]), []).append(i)
+        return self._by_key.get(game_key(game_id), [])
+
+    def read(self, position: int) -> Dict:
+        """Game log of index record number position"""
+        entry = self.entry(position)
+        self.log_file.seek(entry.offset)
+        return json.loads(self.log_file.read(entry.length))
+
+    def get(self, game_sequence: int) -> Optional[Dict]:
+        """Game log of a game_sequence, None when it isn't in the store"""
+        position = self.position_of_sequence(game_sequence)
+        return None if position is None else self.read(position)
+
+    def find(self, game_id: str) -> List[Dict]:
+        """Game logs with this gameId, in write order"""
+        return [self.read(position) for position in self.positions_of_game(game_id)]
+
+    def read_range(self, start: int, stop: int) -> List[Dict]:
+        """Game logs of index positions start to stop (exclusive), read with one seek"""
+        start, stop = max(start, 0), min(stop, self.count)
+        if start >= stop:
+            return []
+        first, last = self.entry(start), self.entry(stop - 1)
+        self.log_file.seek(first.offset)
+        data = self.log_file.read(last.offset + last.length - first.offset)
+        return [json.loads(line) for line in data.splitlines()]
+
+    def index_array(self):
+        """
+        The index as a numpy structured array over the mapped file (numpy
+        required), e.g. arr['slots']['delta'] for every player's net chips
+        per hand. The array stays valid after close().
+        """
+        if np is None:
+            raise ImportError("numpy is not installed")
+        dtype = np.dtype([
+            ('game_key', 'V16'), ('game_sequence', '<i8'), ('offset', '<u8'), ('length', '<u4'),
+            ('num_players', '<u2'), ('pad', 'V2'),
+            ('slots', [('player_id', '<u4'), ('delta', '<i4')], (self.player_slots,))
+        ])
+        if not self.count:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(self.index, dtype=dtype, count=self.count, offset=_HEADER.size)
@@ -0,0 +1,107 @@
+"""
+LRU cache of hand values keyed by a suit-isomorphic encoding of the cards.
+
+A 5-7 card hand's value only depends on how many cards of each rank it holds
+and, when five or more share a suit, which ranks are in that suit. That gives
+a canonical integer key: the rank counts packed in base 5, plus the flush
+suit's rank mask above them. Hands that only differ by suit permutation (or in
+the suits of non-flush cards) share a key, so replays, duplicate sessions and
+equity enumeration hit the same entries over and over.
+"""
+import functools
+from typing import List
+
+import eval7
+
+from deck import CARDS, card_code
+
+DEFAULT_CACHE_SIZE = 1 << 18
+
+RANK_KEY_BITS = 31  # 5 ** 13 < 2 ** 31
+RANK_WEIGHTS = [5 ** (code >> 2) for code in range(52)]
+SUIT_COUNT_WEIGHTS = [1 << 4 * (code & 3) for code in range(52)]  # 4-bit card count per suit
+
+
+def canonical_key(codes: List[int]) -> int:
+    """Suit-isomorphic key of 5-7 card codes, equal keys have equal hand values"""
+    rank_key = 0
+    suit_counts = 0
+    for code in codes:
+        rank_key += RANK_WEIGHTS[code]
+        suit_counts += SUIT_COUNT_WEIGHTS[code]
+
+    for suit in range(4):
+        if suit_counts >> 4 * suit & 15 >= 5:
+            flush_mask = 0
+            for code in codes:
+                if code & 3 == suit:
+                    flush_mask |= 1 << (code >> 2)
+            return rank_key | flush_mask << RANK_KEY_BITS
+    return rank_key
+
+
+def representative_hand(key: int) -> List[eval7.Card]:
+    """Some hand with the given canonical key (flush cards in clubs, the rest spread over the suits)"""
+    rank_key = key & ((1 << RANK_KEY_BITS) - 1)
+    flush_mask = key >> RANK_KEY_BITS
+
+    codes = []
+    suit_sizes = [0, 0, 0, 0]
+    free_suits = (1, 2, 3) if flush_mask else (0, 1, 2, 3)
+    for rank in range(13):
+        count = rank_key // 5 ** rank % 5
+        used_suits = set()
+        if flush_mask >> rank & 1:
+            used_suits.add(0)
+            codes.append(rank * 4)
+            suit_sizes[0] += 1
+            count -= 1
+        for _ in range(count):
+            # The emptiest suit this rank doesn't use yet, clubs only when there's no flush
+            suit = min((s for s in free_suits if s not in used_suits), key=lambda s: suit_sizes[s])
+            used_suits.add(suit)
+            codes.append(rank * 4 + suit)
+            suit_sizes[suit] += 1
+    return [CARDS[code] for code in codes]
+
+
+def _evaluate_key(key: int) -> int:
+    return eval7.evaluate(representative_hand(key))
+
+
+class HandStrengthCache:
+    """
+    Bounded LRU cache in front of eval7.evaluate.
+
+    eval7 itself evaluates a hand in under a microsecond, so the cache pays off
+    where keys are cheap to build or repeat a lot: equity enumeration over a
+    fixed board, replays and duplicate sessions. One cache can be shared by
+    several games (Game(hand_cache=...)).
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._lookup = functools.lru_cache(maxsize=maxsize)(_evaluate_key)
+
+    def evaluate_codes(self, codes: List[int]) -> int:
+        """Hand value of 5-7 card codes, same scale as eval7.evaluate"""
+        return self._lookup(canonical_key(codes))
+
+    def evaluate(self, cards: List[eval7.Card]) -> int:
+        """Drop-in replacement for eval7.evaluate"""
+        return self._lookup(canonical_key([card_code(card) for card in cards]))
+
+    @property
+    def hits(self) -> int:
+        return self._lookup.cache_info().hits
+
+    @property
+    def misses(self) -> int:
+        return self._lookup.cache_info().misses
+
+    def __len__(self) -> int:
+        return self._lookup.cache_info().currsize
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        self._lookup.cache_clear()
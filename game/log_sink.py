@@ -0,0 +1,321 @@
+"""
+Destinations for finished game logs.
+
+Game hands its JSON game log to a sink when the hand ends. JsonFileSink keeps
+the original format, one pretty-printed game_log_<seq>_<id>.json per hand.
+JsonlSink appends one compact line per hand to a JSON Lines stream, batches
+the writes and starts a new file once the current one is big enough, so a
+long run produces a few large files instead of millions of small ones.
+GzipJsonlSink does the same into gzip-compressed <prefix>_<n>.jsonl.gz files
+for logs that are kept around; read_game_logs streams every file of a run
+back one game at a time.
+
+BackgroundLogWriter moves the writing of another sink (and of the result
+lines the server appends) to a thread behind a bounded queue, so a slow disk
+doesn't hold up the hand loop.
+
+Sinks are thread-safe; the tables of a TableManager share one. A sink owns
+the game logs it is given, they must not be changed afterwards.
+"""
+import abc
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List
+
+from config import BASE_PATH
+from game.action_log import ActionSequence
+
+JSONL_PREFIX = "game_logs"
+JSONL_MAX_BYTES = 256 * 1024 * 1024  # Rotate to a new file after this many bytes
+JSONL_BATCH_SIZE = 64  # Game logs buffered before they are written out
+GZIP_COMPRESS_LEVEL = 6  # zlib's default, level 9 is much slower for a few % smaller files
+BACKGROUND_QUEUE_SIZE = 1024  # Pending writes a BackgroundLogWriter holds before blocking or dropping
+
+
+def json_default(obj):
+    """json.dump fallback for game logs whose action sequences weren't materialised yet"""
+    if isinstance(obj, ActionSequence):
+        return obj.to_list()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def game_log_filename(game_log: Dict, game_sequence: int = None) -> str:
+    """File name of a game log in the one-file-per-game format"""
+    game_id = game_log.get('gameId', f"unknown_{int(time.time())}")
+    if game_sequence is not None:
+        return f"game_log_{game_sequence}_{game_id}.json"
+    return f"game_log_{game_id}.json"
+
+
+class LogSink(abc.ABC):
+    """Base class: write() gets every finished game log, flush() and close() at shutdown"""
+
+    @abc.abstractmethod
+    def write(self, game_log: Dict, game_sequence: int = None):
+        """Store one finished game log"""
+
+    def append_line(self, path: str, line: str):
+        """Append a line to a text file such as game_result.log"""
+        with open(path, "a") as f:
+            f.write(f"{line}\n")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class JsonFileSink(LogSink):
+    """One indented JSON file per game, the engine's original log format"""
+
+    def __init__(self, directory: str = BASE_PATH):
+        self.directory = directory
+
+    def write(self, game_log: Dict, game_sequence: int = None):
+        os.makedirs(self.directory, exist_ok=True)
+        filepath = os.path.join(self.directory, game_log_filename(game_log, game_sequence))
+        with open(filepath, 'w') as f:
+            json.dump(game_log, f, indent=2, default=json_default)
+        return filepath
+
+
+class JsonlSink(LogSink):
+    """
+    Compact game logs, one per line, appended to <prefix>_<n>.jsonl files.
+
+    Logs are serialised right away but written batch_size at a time (and on
+    flush/close). A new file is started once the current one reaches max_bytes
+    or holds max_games logs; numbering continues after the files already in
+    the directory.
+    """
+
+    suffix = ".jsonl"
+
+    def __init__(self,
+                 directory: str = BASE_PATH,
+                 prefix: str = JSONL_PREFIX,
+                 max_bytes: int = JSONL_MAX_BYTES,
+                 batch_size: int = JSONL_BATCH_SIZE,
+                 max_games: int = None):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_games = max_games
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending: List[str] = []
+        self.file = None
+        self.file_index = None
+        self.file_size = 0
+        self.file_games = 0
+
+    @property
+    def path(self) -> str:
+        """The file currently appended to"""
+        return self._path(self.file_index)
+
+    def _path(self, index: int) -> str:
+        return os.path.join(self.directory, f"{self.prefix}_{index:05d}{self.suffix}")
+
+    def write(self, game_log: Dict, game_sequence: int = None):
+        line = json.dumps(game_log, separators=(',', ':'), default=json_default) + "\n"
+        with self.lock:
+            self.pending.append(line)
+            if len(self.pending) >= self.batch_size:
+                self._write_pending()
+
+    def flush(self):
+        with self.lock:
+            self._write_pending()
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self._write_pending()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def _open_file(self, path: str):
+        return open(path, 'a', encoding='utf-8')
+
+    def _open(self, index: int):
+        self.file_index = index
+        self.file = self._open_file(self._path(index))
+        self.file_size = self.file.tell()
+        self.file_games = 0
+
+    def _write_pending(self):
+        if not self.pending:
+            return
+        if self.file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            index = 0
+            while os.path.exists(self._path(index)):
+                index += 1
+            self._open(index)
+
+        chunk = []
+        for line in self.pending:
+            size = len(line.encode('utf-8'))
+            full = self.max_games is not None and self.file_games >= self.max_games
+            if self.file_size and (full or self.file_size + size > self.max_bytes):
+                self._write_chunk(chunk)
+                chunk = []
+                self.file.close()
+                self._open(self.file_index + 1)
+            chunk.append(line)
+            self.file_size += size
+            self.file_games += 1
+        self._write_chunk(chunk)
+        self.pending = []
+
+    def _write_chunk(self, lines: List[str]):
+        self.file.write("".join(lines))
+
+
+class GzipJsonlSink(JsonlSink):
+    """
+    JsonlSink writing gzip-compressed <prefix>_<n>.jsonl.gz files.
+
+    Each flushed batch is appended as a gzip member, so a file cut short by a
+    crash still reads back up to its last complete batch. max_bytes counts the
+    uncompressed JSON, a file ends up several times smaller on disk.
+    """
+
+    suffix = ".jsonl.gz"
+
+    def __init__(self,
+                 directory: str = BASE_PATH,
+                 prefix: str = JSONL_PREFIX,
+                 max_bytes: int = JSONL_MAX_BYTES,
+                 batch_size: int = JSONL_BATCH_SIZE,
+                 max_games: int = None,
+                 compresslevel: int = GZIP_COMPRESS_LEVEL):
+        super().__init__(directory, prefix, max_bytes, batch_size, max_games)
+        self.compresslevel = compresslevel
+
+    def _open_file(self, path: str):
+        return open(path, 'ab')
+
+    def _write_chunk(self, lines: List[str]):
+        if lines:
+            self.file.write(gzip.compress("".join(lines).encode('utf-8'), self.compresslevel))
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """Game logs of a JSON Lines file (gzip-compressed if the name ends in .gz), in order"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def log_stream_files(directory: str = BASE_PATH, prefix: str = JSONL_PREFIX) -> List[str]:
+    """The <prefix>_<n>.jsonl and .jsonl.gz files of a directory in write order"""
+    paths = []
+    start = f"{prefix}_"
+    for name in os.listdir(directory):
+        for suffix in (JsonlSink.suffix, GzipJsonlSink.suffix):
+            number = name[len(start):-len(suffix)]
+            if name.startswith(start) and name.endswith(suffix) and number.isdigit():
+                paths.append((int(number), os.path.join(directory, name)))
+    return [path for _, path in sorted(paths)]
+
+
+def read_game_logs(directory: str = BASE_PATH, prefix: str = JSONL_PREFIX) -> Iterator[Dict]:
+    """
+    Every game log of a JsonlSink/GzipJsonlSink run, one at a time. Files are
+    decompressed as a stream, so memory use doesn't grow with the archive.
+    """
+    for path in log_stream_files(directory, prefix):
+        yield from read_jsonl(path)
+
+
+class BackgroundLogWriter(LogSink):
+    """
+    Writes through another sink on a background thread.
+
+    Game logs and result lines go into a queue of at most max_pending entries.
+    When it is full, write() waits for room (block=True, backpressure on the
+    game thread) or drops the entry and counts it in `dropped` (block=False).
+    The thread takes everything that is queued at once and writes it in order;
+    when the inner sink writes to disk is left to its own batching, so a
+    JsonlSink still writes batch_size logs at a time. flush() returns once
+    every entry queued before the call is on disk, close() also stops the
+    thread and closes the inner sink.
+    """
+
+    def __init__(self, sink: LogSink = None, max_pending: int = BACKGROUND_QUEUE_SIZE, block: bool = True):
+        self.sink = sink if sink is not None else JsonFileSink()
+        self.block = block
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, game_log: Dict, game_sequence: int = None):
+        self._put((self.sink.write, game_log, game_sequence))
+
+    def append_line(self, path: str, line: str):
+        self._put((self.sink.append_line, path, line))
+
+    def _put(self, entry):
+        if self.closed:
+            raise ValueError("Log writer is closed")
+        if self.block:
+            self.queue.put(entry)
+            return
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while True:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stop = False
+            for entry in batch:
+                if entry is None:
+                    stop = True
+                    continue
+                write, *args = entry
+                try:
+                    write(*args)
+                    self.written += 1
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Error writing game log: {e}")
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """Wait until everything queued so far is written and flushed"""
+        if not self.closed:
+            self.queue.join()
+        self.sink.flush()
+
+    def close(self):
+        if not self.closed:
+            self.queue.put(None)  # Written entries before it are still processed
+            self.closed = True
+            self.thread.join()
+        self.sink.close()
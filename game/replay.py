@@ -0,0 +1,139 @@
+"""
+Replay a logged hand from its deck seed and action sequence.
+
+Game logs record the deck seed next to the gameId, the seating, the blind
+players and every action. replay_game() deals the same cards again and feeds
+the logged actions back through Game, following the same hand flow as the
+server, so a suspicious hand can be stepped through or checked for engine
+regressions:
+
+    python -m game.replay output/game_log_12_<id>.json
+"""
+import contextlib
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+
+from deck import DeckPool
+from game.game import Game
+from poker_type.game import PokerAction
+from poker_type.utils import POKER_ACTIONS_MAPPING
+
+# Log action names ("ALL IN") back to PokerAction
+ACTIONS_BY_NAME = {name.upper(): action for action, name in POKER_ACTIONS_MAPPING.items()}
+
+
+def load_game_log(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _round_actions(game_log: Dict) -> Dict[int, List[Tuple[int, PokerAction, int]]]:
+    """Logged actions per round index as (player id, action, amount)"""
+    rounds = {}
+    for round_index, round_log in game_log["rounds"].items():
+        rounds[int(round_index)] = [
+            (entry["player"] + 1, ACTIONS_BY_NAME[entry["action"]], entry["amount"])
+            for entry in round_log.get("action_sequence", [])
+        ]
+    return rounds
+
+
+def replay_game(game_log: Dict, debug: bool = False) -> Game:
+    """
+    Re-run a logged hand and return the finished Game.
+    Raises ValueError if the log has no seed or the replay deals different cards.
+    """
+    deck_pool = None
+    pool_log = game_log.get("deckPool")
+    if pool_log is not None:
+        # Regenerate only the batch holding this hand's deck
+        deck_pool = DeckPool(pool_log["seed"], pool_log["batchSize"], background=False,
+                             use_numpy=pool_log["numpy"], start_index=pool_log["index"])
+    elif game_log.get("seed") is None:
+        raise ValueError("Game log has no deck seed, it can't be replayed")
+
+    blinds = game_log["blinds"]
+    game = Game(debug, blinds["big"], game_id=game_log.get("gameId"), write_log=False,
+                seed=game_log.get("seed"), deck_pool=deck_pool)
+    for player_index in game_log["playerNames"]:
+        game.add_player(int(player_index) + 1)
+    # Players who couldn't afford the big blind were never dealt in
+    dealt_in = {int(player_index) + 1 for player_index in game_log["playerHands"]}
+    for player_id in game.players:
+        if player_id not in dealt_in:
+            game._deactivate(player_id)
+
+    blinds_posted = "smallBlindPlayer" in blinds
+    if blinds_posted:
+        game.small_blind_player = blinds["smallBlindPlayer"] + 1
+        game.big_blind_player = blinds["bigBlindPlayer"] + 1
+
+    money = game_log.get("playerMoney")
+    if money:
+        game.set_player_money_info(
+            {int(p_id): amount for p_id, amount in money.get("startingMoney", {}).items()},
+            {int(p_id): delta for p_id, delta in money.get("startingDelta", {}).items()},
+            money.get("initialAmount", 0)
+        )
+
+    game.start_game()
+    logged_hands = {int(p): cards for p, cards in game_log["playerHands"].items()}
+    dealt_hands = {p_id - 1: [str(card) for card in hand] for p_id, hand in game.hands.items()}
+    if dealt_hands != logged_hands:
+        raise ValueError("Replay dealt different hole cards than the log, was it written with another deck?")
+
+    rounds = _round_actions(game_log)
+    if blinds_posted:
+        game.post_blinds()
+        rounds[0] = rounds.get(0, [])[2:]  # The forced blind posts are logged as the first two actions
+
+    # Same hand flow as PokerEngineServer.run_single_game, with actions taken from the log
+    while True:
+        if len(game.active_players) == 1 or (game.is_current_round_complete() and game.is_game_over()):
+            if game.is_running:
+                game.end_game()
+            break
+
+        for player_id, action, amount in rounds.get(game.round_index, []):
+            game.update_game(player_id, (action, amount))
+        if not game.is_current_round_complete():
+            raise ValueError(f"Game log ends before round {game.round_index} is complete")
+
+        game.end_round()
+        if game.is_all_in_runout():
+            game.run_out_board()
+        else:
+            game.start_round()
+
+    if [str(card) for card in game.board] != game_log["finalBoard"]:
+        raise ValueError("Replay dealt a different board than the log")
+    return game
+
+
+def main(argv: List[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python -m game.replay GAME_LOG.json")
+        return 2
+
+    game_log = load_game_log(argv[0])
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        game = replay_game(game_log)  # Silence the engine's own prints
+    print(f"Game {game_log.get('gameId')} (seed {game_log.get('seed')})")
+    print(f"Board: {' '.join(str(card) for card in game.board)}")
+    for player_id, hand in game.hands.items():
+        print(f"player{player_id}: {' '.join(str(card) for card in hand)} -> {game.score.get(player_id, 0):+d}")
+
+    logged_scores = game_log.get("playerMoney", {}).get("gameScores")
+    if logged_scores is not None:
+        replayed_scores = {str(p_id): score for p_id, score in game.score.items()}
+        if replayed_scores != logged_scores:
+            print(f"Scores differ from the log: logged {logged_scores}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
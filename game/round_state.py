@@ -1,25 +1,16 @@
 from poker_type.game import PokerAction
 from typing import List, Dict, Set
+from bisect import bisect_right
 from dataclasses import dataclass
 import time
 
-@dataclass
-class ActionRecord:
-    """Represents a single action taken by a player"""
-    player_id: int
-    action: PokerAction
-    amount: int
-    timestamp: int
-    # Round-specific pot information
-    pot_after_action: int
-    side_pots_after_action: List[Dict]
-    # Cumulative pot information across all rounds
-    total_pot_after_action: int
-    total_side_pots_after_action: List[Dict]
-    
+from game.action_log import ActionLog, ActionRecord
+
 @dataclass
 class Pot:
     """Represents a single pot (main pot or side pot)"""
+    __slots__ = ("amount", "eligible_players")
+
     amount: int
     eligible_players: Set[int]  # Players who can win this pot
     
@@ -28,6 +19,11 @@ class Pot:
         self.eligible_players = eligible_players if eligible_players else set()
 
 class RoundState:
+    __slots__ = ("pots", "raise_amount", "bettor", "waiting_for", "player_bets", "player_actions",
+                 "action_history", "all_in_players", "player_action_times", "_seats", "_seat_bits",
+                 "_out_mask", "_total_bets", "_level_counts", "_side_pots_current", "_pot_levels",
+                 "cumulative_pot_base", "cumulative_side_pots_base")
+
     def __init__(self, active_players: List[int]):
         self.pots: List[Pot] = [Pot(0, set(active_players))]  # Start with main pot
         self.raise_amount = 0
@@ -35,18 +31,64 @@ class RoundState:
         self.waiting_for: Set[int] = set(active_players)
         self.player_bets: Dict[int, int] = {player: 0 for player in active_players}
         self.player_actions: Dict[int, PokerAction] = {}  # Keep for backward compatibility
-        self.action_history: List[ActionRecord] = []  # New: track all actions in order
+        self.action_history = ActionLog()  # New: track all actions in order
         self.all_in_players: Set[int] = set()  # Track all-in players
         self.player_action_times: Dict[int, int] = {}
+
+        # Seat bitmasks: each player of the round gets a bit, _out_mask has the bits
+        # of players whose last action is a fold or all-in (they don't act again)
+        self._seats: List[int] = list(self.player_bets)
+        self._seat_bits: Dict[int, int] = {player: 1 << seat for seat, player in enumerate(self._seats)}
+        self._out_mask = 0
+
+        # Incremental pot bookkeeping: running total of all bets and how many
+        # players sit at each positive bet level. Once bets diverge, _pot_levels
+        # holds the bet level of each side pot; calls, raises and folds update the
+        # pots they touch, and only an all-in adding a level rebuilds them all.
+        self._total_bets = 0
+        self._level_counts: Dict[int, int] = {}
+        self._side_pots_current = False
+        self._pot_levels: List[int] = None
         
         # Cumulative pot tracking
         self.cumulative_pot_base = 0
         self.cumulative_side_pots_base = []
 
+    def copy(self) -> "RoundState":
+        """
+        Independent copy of the round. Pots are copied because side pots are
+        patched in place; their eligible sets, the seat map and the cumulative
+        bases are shared since they are replaced, never mutated.
+        """
+        state = RoundState.__new__(RoundState)
+        state.pots = [Pot(pot.amount, pot.eligible_players) for pot in self.pots]
+        state.raise_amount = self.raise_amount
+        state.bettor = self.bettor
+        state.waiting_for = self.waiting_for.copy()
+        state.player_bets = self.player_bets.copy()
+        state.player_actions = self.player_actions.copy()
+        state.action_history = self.action_history.copy()
+        state.all_in_players = self.all_in_players.copy()
+        state.player_action_times = self.player_action_times.copy()
+        state._seats = self._seats
+        state._seat_bits = self._seat_bits
+        state._out_mask = self._out_mask
+        state._total_bets = self._total_bets
+        state._level_counts = self._level_counts.copy()
+        state._side_pots_current = self._side_pots_current
+        state._pot_levels = self._pot_levels.copy() if self._pot_levels is not None else None
+        state.cumulative_pot_base = self.cumulative_pot_base
+        state.cumulative_side_pots_base = self.cumulative_side_pots_base
+        return state
+
     def set_cumulative_pot_info(self, cumulative_pot: int, cumulative_side_pots: List[Dict]):
-        """Set the cumulative pot information from previous rounds"""
+        """
+        Set the cumulative pot information from previous rounds. The side pot list
+        is shared with the action records, so callers must not mutate it afterwards.
+        """
         self.cumulative_pot_base = cumulative_pot
         self.cumulative_side_pots_base = cumulative_side_pots
+        self.action_history.cumulative_side_pots_base = cumulative_side_pots
 
     def get_total_pot_info(self) -> Dict:
         """Get total cumulative pot information including current round"""
@@ -74,7 +116,24 @@ class RoundState:
     @property
     def pot(self) -> int:
         """Total pot amount across all pots (for backward compatibility)"""
-        return sum(pot.amount for pot in self.pots)
+        return self._total_bets
+
+    def _add_to_bet(self, player_id: int, amount: int) -> None:
+        """Increase a player's bet, keeping the running total and bet levels in sync"""
+        if amount == 0:
+            return
+        old_bet = self.player_bets[player_id]
+        new_bet = old_bet + amount
+        self.player_bets[player_id] = new_bet
+        self._total_bets += amount
+
+        if old_bet > 0:
+            if self._level_counts[old_bet] == 1:
+                del self._level_counts[old_bet]
+            else:
+                self._level_counts[old_bet] -= 1
+        if new_bet > 0:
+            self._level_counts[new_bet] = self._level_counts.get(new_bet, 0) + 1
     
     def get_pot_and_side_pots_info(self) -> Dict:
         """Get current pot and side pot information"""
@@ -95,6 +154,12 @@ class RoundState:
 
     def _create_side_pots(self):
         """Create side pots when players have unequal investments"""
+        if self._side_pots_current:
+            # Nothing changed since the last rebuild
+            return
+        self._side_pots_current = True
+        self._pot_levels = None
+
         # Get all active players (not folded) - these are eligible to win pots
         active_players = set()
         for player_id, action in self.player_actions.items():
@@ -103,7 +168,7 @@ class RoundState:
         
         if len(active_players) <= 1:
             # Still create pots even with 1 or 0 active players (folded players contribute)
-            total_pot = sum(self.player_bets.values())
+            total_pot = self._total_bets
             if len(active_players) == 1:
                 self.pots = [Pot(total_pot, active_players)]
             else:
@@ -112,29 +177,34 @@ class RoundState:
             return
         
         # Get unique bet levels in ascending order (from ALL players, including folded)
-        bet_levels = sorted(set(bet for bet in self.player_bets.values() if bet > 0))
+        bet_levels = sorted(self._level_counts)
         
         if len(bet_levels) <= 1:
             # All players bet the same amount
-            total_pot = sum(self.player_bets.values())
-            self.pots = [Pot(total_pot, active_players)]
+            self.pots = [Pot(self._total_bets, active_players)]
             return
+
+        # Number of players (including folded ones) who bet at least each level
+        contributing_counts = [0] * len(bet_levels)
+        running_count = 0
+        for i in range(len(bet_levels) - 1, -1, -1):
+            running_count += self._level_counts[bet_levels[i]]
+            contributing_counts[i] = running_count
         
         # Clear existing pots and recreate them
         self.pots = []
+        self._pot_levels = bet_levels
         
         # Create pots for each betting level
         for i, current_level in enumerate(bet_levels):
             prev_level = bet_levels[i-1] if i > 0 else 0
             level_contribution = current_level - prev_level
+            contributing_count = contributing_counts[i]
             
-            # Find players who contributed to this level (bet >= current_level)
-            # Count ALL players who bet at this level, including folded ones
+            # Find active players who contributed to this level (bet >= current_level)
             eligible_players = set()
-            contributing_count = 0
             for player_id, bet_amount in self.player_bets.items():
                 if bet_amount >= current_level:
-                    contributing_count += 1
                     # Only active players are eligible to win
                     if player_id in active_players:
                         # CRITICAL FIX: All-in players from previous rounds should only be eligible
@@ -155,53 +225,56 @@ class RoundState:
         
         # If no pots were created, create a single main pot
         if len(self.pots) == 0:
-            total_pot = sum(self.player_bets.values())
+            total_pot = self._total_bets
             self.pots = [Pot(total_pot, active_players)]
 
+    def _set_action(self, player_id: int, action: PokerAction) -> None:
+        """Record a player's latest action, keeping the fold/all-in mask in sync"""
+        self.player_actions[player_id] = action
+        bit = self._seat_bits.get(player_id, 0)
+        if action == PokerAction.FOLD or action == PokerAction.ALL_IN:
+            self._out_mask |= bit
+        else:
+            self._out_mask &= ~bit
+
     def _update_waiting_for_after_raise(self, player_id: int) -> None:
-        self.waiting_for = set(p for p in self.player_bets.keys() if p != player_id)
-        for player in self.waiting_for.copy():
-            if player in self.player_actions and self.player_actions[player] in [PokerAction.FOLD, PokerAction.ALL_IN]:
-                self.waiting_for.discard(player)
-            else:
+        # Everyone except the raiser and players who folded or are all-in acts again
+        to_act = ((1 << len(self._seats)) - 1) & ~self._out_mask & ~self._seat_bits[player_id]
+        waiting_for = set()
+        seat = 0
+        while to_act:
+            if to_act & 1:
+                player = self._seats[seat]
+                waiting_for.add(player)
                 self.player_actions[player] = None
+            to_act >>= 1
+            seat += 1
+        self.waiting_for = waiting_for
 
     def post_forced_blind(self, player_id: int, action: PokerAction, amount: int = 0) -> None:
         """Post a forced blind without affecting the waiting_for logic like a normal raise would"""
         if amount < 0:
             raise ValueError("Amount cannot be negative")
 
-        self.player_actions[player_id] = action
+        self._set_action(player_id, action)
         
         # For forced blinds, we don't check if player is in waiting_for
         # and we don't modify waiting_for here
         
+        old_bet = self.player_bets[player_id]
         if action == PokerAction.RAISE:
             # Update the bet amount and raise amount
-            self.player_bets[player_id] += amount
+            self._add_to_bet(player_id, amount)
             if self.player_bets[player_id] > self.raise_amount:
                 self.raise_amount = self.player_bets[player_id]
                 self.bettor = player_id
             # NOTE: We don't call _update_waiting_for_after_raise for forced blinds
         
         # Update pots after blind posting
-        self._update_pots()
+        self._update_pots(player_id, old_bet)
         
         # Record this action in history
-        round_pot_info = self.get_pot_and_side_pots_info()
-        total_pot_info = self.get_total_pot_info()
-        
-        action_record = ActionRecord(
-            player_id=player_id,
-            action=action,
-            amount=amount,
-            timestamp=int(time.time() * 1000),
-            pot_after_action=round_pot_info["total_pot"],
-            side_pots_after_action=round_pot_info["side_pots"],
-            total_pot_after_action=total_pot_info["total_pot"],
-            total_side_pots_after_action=total_pot_info["total_side_pots"]
-        )
-        self.action_history.append(action_record)
+        self._record_action(player_id, action, amount)
 
     def add_blind_players_for_second_action(self, small_blind_player: int, big_blind_player: int) -> None:
         """Add blind players back for their second action after all other players have acted"""
@@ -220,11 +293,20 @@ class RoundState:
         if amount < 0:
             raise ValueError("Amount cannot be negative")
 
-        self.player_actions[player_id] = action
+        self._set_action(player_id, action)
+        try:
+            self._apply_action(player_id, action, amount)
+        except ValueError:
+            # The action is recorded even when rejected, so the pots can no longer be patched
+            self._side_pots_current = False
+            raise
 
+    def _apply_action(self, player_id: int, action: PokerAction, amount: int) -> None:
         if player_id not in self.waiting_for:
             raise ValueError("Player is not waiting for their turn")
 
+        old_bet = self.player_bets[player_id]
+
         actual_amount = 0  # Track the actual amount bet/called for logging
         
         if action == PokerAction.FOLD:
@@ -250,12 +332,12 @@ class RoundState:
             call_amount = self.raise_amount - self.player_bets[player_id]
             if call_amount < 0:
                 raise ValueError("Cannot call with less than the raise amount")
-            self.player_bets[player_id] += call_amount
+            self._add_to_bet(player_id, call_amount)
             actual_amount = call_amount
             self.waiting_for.discard(player_id)
             self.player_actions[player_id] = PokerAction.CALL
         elif action == PokerAction.ALL_IN:
-            self.player_bets[player_id] += amount
+            self._add_to_bet(player_id, amount)
             actual_amount = amount
             self.all_in_players.add(player_id)
             self.waiting_for.discard(player_id)
@@ -270,45 +352,41 @@ class RoundState:
                 raise ValueError("Raise amount + current bet must be higher than the current raise")
             self.raise_amount = self.player_bets[player_id] + amount
             self.bettor = player_id
-            self.player_bets[player_id] += amount
+            self._add_to_bet(player_id, amount)
             actual_amount = amount
-            self.waiting_for = set(p for p in self.player_bets.keys() if p != player_id)
             self._update_waiting_for_after_raise(player_id)
         
         # Update pots after any action that changes bet amounts
-        self._update_pots()
-        
-        # Get round-specific pot information
-        round_pot_info = self.get_pot_and_side_pots_info()
-        
-        # Get total cumulative pot information
-        total_pot_info = self.get_total_pot_info()
+        self._update_pots(player_id, old_bet)
         
         # Record this action in history with both round-specific and cumulative info
-        action_record = ActionRecord(
-            player_id=player_id,
-            action=action,
-            amount=actual_amount,
-            timestamp=int(time.time() * 1000),
-            # Round-specific pot information
-            pot_after_action=round_pot_info["total_pot"],
-            side_pots_after_action=round_pot_info["side_pots"],
-            # Cumulative pot information across all rounds
-            total_pot_after_action=total_pot_info["total_pot"],
-            total_side_pots_after_action=total_pot_info["total_side_pots"]
+        self._record_action(player_id, action, actual_amount)
+
+    def _record_action(self, player_id: int, action: PokerAction, amount: int) -> None:
+        """Append an action and the pots after it to the round's action log"""
+        self.action_history.append(
+            player_id,
+            action,
+            amount,
+            int(time.time() * 1000),
+            self.pot,
+            self.cumulative_pot_base + self.pot,
+            self.pots
         )
-        self.action_history.append(action_record)
 
-    def _update_pots(self):
-        """Update pot amounts based on current player bets"""
+    def _update_pots(self, player_id: int, old_bet: int):
+        """Update pot amounts after player_id's action moved their bet from old_bet"""
         # Always try to create side pots when there are unequal bet amounts
-        bet_amounts = [amount for amount in self.player_bets.values() if amount > 0]
-        if len(set(bet_amounts)) > 1:
-            # Unequal bet amounts - create side pots
-            self._create_side_pots()
+        if len(self._level_counts) > 1:
+            # Unequal bet amounts - patch the side pots, or rebuild them if that isn't possible
+            if not (self._side_pots_current and self._patch_side_pots(player_id, old_bet)):
+                self._side_pots_current = False
+                self._create_side_pots()
         else:
+            # Bets or actions changed, so any side pots built earlier are stale
+            self._side_pots_current = False
             # Equal bet amounts - use simple pot calculation
-            total_contributed = sum(self.player_bets.values())
+            total_contributed = self._total_bets
             if len(self.pots) == 1:
                 self.pots[0].amount = total_contributed
             else:
@@ -319,10 +397,59 @@ class RoundState:
                         active_players.add(player_id)
                 self.pots = [Pot(total_contributed, active_players)]
 
+    def _eligible_at(self, level: int) -> Set[int]:
+        """Players still in with a bet of at least level, built like _create_side_pots does"""
+        return {player_id for player_id, bet_amount in self.player_bets.items()
+                if bet_amount >= level and player_id in self.player_actions
+                and self.player_actions[player_id] != PokerAction.FOLD}
+
+    def _patch_side_pots(self, player_id: int, old_bet: int) -> bool:
+        """
+        Bring up-to-date side pots in line with one player's action: only the
+        pots between their old and new bet change. Returns False when a full
+        rebuild is needed (the pots aren't per-level side pots, an all-in adds
+        a bet level, or a fold leaves fewer than two players in).
+        """
+        levels = self._pot_levels
+        if levels is None:
+            return False
+        new_bet = self.player_bets[player_id]
+
+        if new_bet == old_bet:
+            if self.player_actions[player_id] != PokerAction.FOLD:
+                return True  # Checks don't change any pot
+            players_in = sum(1 for action in self.player_actions.values() if action != PokerAction.FOLD)
+            if players_in <= 1:
+                return False
+            for i in range(bisect_right(levels, new_bet)):
+                self.pots[i].eligible_players = self._eligible_at(levels[i])
+            return True
+
+        if new_bet not in levels and (new_bet < levels[-1] or self.player_actions[player_id] == PokerAction.ALL_IN):
+            return False  # An all-in between the existing levels splits a pot
+
+        # One more contributor to every level between the old and the new bet
+        start = bisect_right(levels, old_bet)
+        for i in range(start, bisect_right(levels, new_bet)):
+            pot = self.pots[i]
+            pot.amount += levels[i] - (levels[i - 1] if i > 0 else 0)
+            pot.eligible_players = self._eligible_at(levels[i])
+        if new_bet > levels[-1]:
+            # A raise opens a new top level
+            self.pots.append(Pot(new_bet - levels[-1], self._eligible_at(new_bet)))
+            levels.append(new_bet)
+        if old_bet > 0 and old_bet not in self._level_counts:
+            # Nobody is left at the old level, its pot merges into the one above
+            j = start - 1
+            self.pots[j + 1].amount += self.pots[j].amount
+            del self.pots[j]
+            del levels[j]
+        return True
+
     def is_round_complete(self) -> bool:
         """Check if the current round is complete"""
         if len(self.waiting_for) == 0:
-            # Create final side pots when round is complete
+            # Create final side pots when round is complete (no-op if already up to date)
             self._create_side_pots()
             return True
         return False
@@ -337,8 +464,15 @@ class RoundState:
         self.bettor = None
         self.waiting_for = set(active_players) - still_all_in  # All-in players don't act
         self.player_bets = {player: 0 for player in active_players}
+        self._total_bets = 0
+        self._level_counts = {}
+        self._side_pots_current = False
+        self._pot_levels = None
         self.player_actions = {}
-        self.action_history = []  # Clear action history for new round
+        self._seats = list(self.player_bets)
+        self._seat_bits = {player: 1 << seat for seat, player in enumerate(self._seats)}
+        self._out_mask = 0
+        self.action_history = ActionLog(self.cumulative_side_pots_base)  # Clear action history for new round
         self.all_in_players = still_all_in
         self.player_action_times = {}
 
@@ -0,0 +1,63 @@
+"""
+Showdown resolution.
+
+All hands are scored against the board once, ranked once, and every pot
+(main and side pots) is then split from that ranking, instead of evaluating
+and taking a max of the eligible hands again for each pot.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Set
+
+import eval7
+
+
+@dataclass
+class PotAward:
+    """How one pot is split: winners in pot order, the first one also gets the remainder"""
+    amount: int
+    winners: List[int]
+    share: int
+    remainder: int
+
+
+def evaluate_hands(hands: Dict[int, List[eval7.Card]], board: List[eval7.Card], players: Iterable[int], cache=None) -> Dict[int, int]:
+    """
+    eval7 hand value (higher is better) of each player's hole cards plus the
+    board, looked up in a HandStrengthCache when one is given.
+    """
+    evaluate = cache.evaluate if cache is not None else eval7.evaluate
+    return {player: evaluate(hands[player] + board) for player in players}
+
+
+def rank_hands(hand_values: Dict[int, int]) -> Dict[int, int]:
+    """Dense rank of each player's hand, 0 is the best; tied hands share a rank"""
+    ordered_values = sorted(set(hand_values.values()), reverse=True)
+    rank_of_value = {value: rank for rank, value in enumerate(ordered_values)}
+    return {player: rank_of_value[value] for player, value in hand_values.items()}
+
+
+def pot_winners(eligible_players: Set[int], ranks: Dict[int, int]) -> List[int]:
+    """Best ranked eligible players, in the eligible set's iteration order"""
+    eligible_ranks = [(player, ranks[player]) for player in eligible_players]
+    if not eligible_ranks:
+        return []
+    best_rank = min(rank for _, rank in eligible_ranks)
+    return [player for player, rank in eligible_ranks if rank == best_rank]
+
+
+def resolve_pots(pots, ranks: Dict[int, int], active_players: Iterable[int]) -> List[PotAward]:
+    """
+    Split each pot among the best hands of its eligible players who are still
+    active. Pots that are empty or have no eligible active player are skipped.
+    """
+    active = set(active_players)
+    awards = []
+    for pot in pots:
+        if pot.amount == 0:
+            continue
+        winners = pot_winners(pot.eligible_players.intersection(active), ranks)
+        if not winners:
+            continue
+        share, remainder = divmod(pot.amount, len(winners))
+        awards.append(PotAward(pot.amount, winners, share, remainder))
+    return awards
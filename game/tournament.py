@@ -0,0 +1,158 @@
+"""
+Multi-core tournament runner.
+
+A tournament is a list of independent MatchSpecs (seat order, seed, blind
+schedule, number of hands). Matches are played with BatchSimulator and
+sharded across a ProcessPoolExecutor; per-bot deltas are aggregated into a
+TournamentResult which can be saved, loaded and merged, so a schedule can be
+split across several machines and combined afterwards.
+"""
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from config import (
+    DEFAULT_BLIND_AMOUNT,
+    DEFAULT_BLIND_MULTIPLIER,
+    DEFAULT_BLIND_INCREASE_INTERVAL,
+    DEFAULT_INITIAL_MONEY
+)
+from game.batch import BatchSimulator, Bot, seeded_random
+
+
+@dataclass
+class MatchSpec:
+    """One independent match: which bots sit where and how the hands are played"""
+    seats: List[str]  # Bot names in seating order
+    num_games: int
+    seed: Optional[int] = None
+    blind_amount: int = DEFAULT_BLIND_AMOUNT
+    blind_multiplier: float = DEFAULT_BLIND_MULTIPLIER
+    blind_increase_interval: int = DEFAULT_BLIND_INCREASE_INTERVAL
+    initial_money: int = DEFAULT_INITIAL_MONEY
+
+
+@dataclass
+class TournamentResult:
+    """Aggregated per-bot results, mergeable across processes and machines"""
+    deltas: Dict[str, int] = field(default_factory=dict)  # Cumulative delta per bot
+    games: Dict[str, int] = field(default_factory=dict)   # Hands played per bot
+    matches: int = 0
+
+    def add_match(self, seats: List[str], player_delta: Dict[int, int], num_games: int):
+        """Add the final deltas of one match (player ids are 1-based seat numbers)"""
+        for seat, name in enumerate(seats):
+            self.deltas[name] = self.deltas.get(name, 0) + player_delta[seat + 1]
+            self.games[name] = self.games.get(name, 0) + num_games
+        self.matches += 1
+
+    def merge(self, other: "TournamentResult") -> "TournamentResult":
+        """Return a new result combining this one with another"""
+        merged = TournamentResult(dict(self.deltas), dict(self.games), self.matches + other.matches)
+        for name, delta in other.deltas.items():
+            merged.deltas[name] = merged.deltas.get(name, 0) + delta
+        for name, games in other.games.items():
+            merged.games[name] = merged.games.get(name, 0) + games
+        return merged
+
+    def delta_per_game(self) -> Dict[str, float]:
+        """Average delta per hand played for each bot"""
+        return {name: self.deltas[name] / self.games[name] for name in self.deltas if self.games.get(name)}
+
+    def to_dict(self) -> Dict:
+        return {"deltas": self.deltas, "games": self.games, "matches": self.matches}
+
+    @staticmethod
+    def from_dict(data: Dict) -> "TournamentResult":
+        return TournamentResult(dict(data["deltas"]), dict(data["games"]), data["matches"])
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @staticmethod
+    def load(path: str) -> "TournamentResult":
+        with open(path, 'r') as f:
+            return TournamentResult.from_dict(json.load(f))
+
+
+def merge_results(results: Iterable[TournamentResult]) -> TournamentResult:
+    """Combine results from several runs (e.g. one per machine)"""
+    merged = TournamentResult()
+    for result in results:
+        merged = merged.merge(result)
+    return merged
+
+
+def build_schedule(bot_names: List[str],
+                   num_matches: int,
+                   games_per_match: int,
+                   seats_per_table: int = None,
+                   base_seed: int = 0,
+                   **match_kwargs) -> List[MatchSpec]:
+    """
+    Build a schedule cycling through every seat permutation of the bots.
+    Match i uses seed base_seed + i so the schedule is reproducible.
+    Extra keyword arguments (blind schedule, initial money) go to every MatchSpec.
+    """
+    seats_per_table = seats_per_table or len(bot_names)
+    if seats_per_table < 2 or seats_per_table > len(bot_names):
+        raise ValueError("seats_per_table must be between 2 and the number of bots")
+
+    seatings = itertools.cycle(itertools.permutations(bot_names, seats_per_table))
+    return [
+        MatchSpec(list(next(seatings)), games_per_match, base_seed + i, **match_kwargs)
+        for i in range(num_matches)
+    ]
+
+
+def shard(specs: List[MatchSpec], num_shards: int, shard_index: int) -> List[MatchSpec]:
+    """Deterministically pick this machine's share of a schedule"""
+    if not 0 <= shard_index < num_shards:
+        raise ValueError("shard_index must be in [0, num_shards)")
+    return specs[shard_index::num_shards]
+
+
+def run_match(bots: Dict[str, Bot], spec: MatchSpec) -> TournamentResult:
+    """Play a single match in the current process"""
+    simulator = BatchSimulator(
+        {seat + 1: bots[name] for seat, name in enumerate(spec.seats)},
+        blind_amount=spec.blind_amount,
+        blind_multiplier=spec.blind_multiplier,
+        blind_increase_interval=spec.blind_increase_interval,
+        initial_money=spec.initial_money,
+        seed=spec.seed
+    )
+    if spec.seed is None:
+        player_delta = simulator.run(spec.num_games)
+    else:
+        # The deal is seeded through the simulator; this covers bots using the random module
+        with seeded_random(spec.seed):
+            player_delta = simulator.run(spec.num_games)
+
+    result = TournamentResult()
+    result.add_match(spec.seats, player_delta, spec.num_games)
+    return result
+
+
+def _run_match_batch(bots: Dict[str, Bot], specs: List[MatchSpec]) -> TournamentResult:
+    return merge_results(run_match(bots, spec) for spec in specs)
+
+
+def run_tournament(bots: Dict[str, Bot],
+                   specs: List[MatchSpec],
+                   max_workers: int = None,
+                   chunksize: int = 1) -> TournamentResult:
+    """
+    Run all matches and aggregate the results.
+    Bots must be picklable (module-level functions or classes) to be sent to workers.
+    max_workers=1 runs everything in the current process.
+    """
+    if max_workers == 1:
+        return _run_match_batch(bots, specs)
+
+    chunks = [specs[i:i + chunksize] for i in range(0, len(specs), chunksize)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return merge_results(executor.map(_run_match_batch, itertools.repeat(bots), chunks))
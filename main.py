@@ -3,6 +3,10 @@ import logging
 import os
 import glob
 from server import PokerEngineServer
+from async_server import AsyncPokerEngineServer, TableManager
+from deck import DeckPool
+from game.hand_store import HandStore
+from game.log_sink import BackgroundLogWriter, GzipJsonlSink, JsonlSink
 from config import NUM_ROUNDS, OUTPUT_FILE_SIMULATION, OUTPUT_GAME_RESULT_FILE, BASE_PATH
 
 def cleanup_game_logs():
@@ -26,6 +30,25 @@ def cleanup_game_logs():
     except Exception as e:
         print(f"Warning: Error during game log cleanup: {e}")
 
+def create_server(args, sim):
+    """Create the server (or table manager) selected on the command line"""
+    if args.tables > 1:
+        server = TableManager(args.host, args.port, args.tables, args.players, args.timeout, args.debug, sim, args.blind, args.blind_multiplier, args.blind_increase_interval, framing=args.framing)
+    else:
+        server_class = AsyncPokerEngineServer if args.use_async else PokerEngineServer
+        server = server_class(args.host, args.port, args.players, args.timeout, args.debug, sim, args.blind, args.blind_multiplier, args.blind_increase_interval, framing=args.framing)
+    if args.deck_pool:
+        server.deck_pool = DeckPool(args.deck_seed)
+    if args.log_format == 'jsonl':
+        server.log_sink = JsonlSink()
+    elif args.log_format == 'gzip':
+        server.log_sink = GzipJsonlSink()
+    elif args.log_format == 'indexed':
+        server.log_sink = HandStore()
+    if args.background_log:
+        server.log_sink = BackgroundLogWriter(server.log_sink)
+    return server
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Poker Engine Server')
     parser.add_argument('--host', type=str, default='0.0.0.0', help='Host address')
@@ -39,6 +62,13 @@ if __name__ == "__main__":
     parser.add_argument('--log-file', type=str, default=None, help='Log file path (if not specified, logs to console)')
     parser.add_argument('--blind-multiplier', type=float, default=1.0, help='Factor to multiply blind amount by (default: 1.0 = no increase)')
     parser.add_argument('--blind-increase-interval', type=int, default=0, help='Number of games after which to increase blinds (default: 0 = never increase)')
+    parser.add_argument('--async', dest='use_async', default=False, action='store_true', help='Use the asyncio server transport')
+    parser.add_argument('--framing', type=str, default='newline', choices=['newline', 'length'], help='Message framing on the wire: newline-delimited or 4-byte length-prefixed')
+    parser.add_argument('--tables', type=int, default=1, help='Number of tables hosted on the same port (more than 1 implies --async)')
+    parser.add_argument('--deck-pool', default=False, action='store_true', help='Deal from a pool of decks shuffled in bulk (uses numpy when installed)')
+    parser.add_argument('--deck-seed', type=int, default=None, help='Master seed of the deck pool (default: random)')
+    parser.add_argument('--log-format', type=str, default='json', choices=['json', 'jsonl', 'gzip', 'indexed'], help='Game logs as one JSON file per game, appended to rotating (gzip-compressed) JSON Lines files, or to an indexed hand store')
+    parser.add_argument('--background-log', default=False, action='store_true', help='Write game logs and results on a background thread behind a bounded queue')
     args = parser.parse_args()
 
     # Clean up existing game log files before starting
@@ -79,7 +109,7 @@ if __name__ == "__main__":
             logger.info(f"Starting continuous simulation mode for {args.sim_rounds} games")
             print(f"Starting continuous simulation mode for {args.sim_rounds} games")
             # Create one server that runs multiple games
-            server = PokerEngineServer(args.host, args.port, args.players, args.timeout, args.debug, args.sim, args.blind, args.blind_multiplier, args.blind_increase_interval)
+            server = create_server(args, args.sim)
             server.simulation_rounds = args.sim_rounds  # Add this attribute to track rounds
             server.start_server()
 
@@ -99,7 +129,7 @@ if __name__ == "__main__":
             logger.info("Starting single game mode")
             print("Starting single game mode")
             # Create server that runs 1 game (sim=False to use game_result output)
-            server = PokerEngineServer(args.host, args.port, args.players, args.timeout, args.debug, False, args.blind, args.blind_multiplier, args.blind_increase_interval)
+            server = create_server(args, False)
             server.simulation_rounds = 1  # Set to run only 1 game
             server.start_server()
 
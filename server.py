@@ -1,7 +1,7 @@
 import socket
 import threading
 import time
-from typing import Dict, Tuple
+from typing import Dict, List, Set, Tuple
 import uuid
 import logging
 from config import (
@@ -19,6 +19,7 @@ from config import (
     DEFAULT_INITIAL_MONEY
 )
 from game.game import Game
+from framing import NEWLINE_FRAMING, FRAMING_MODES, MessageReader, encode_message, send_buffers
 import os
 
 from message import (
@@ -42,6 +43,9 @@ from poker_type.utils import (
 
 logger = logging.getLogger(__name__)
 
+# Returned by receive_action when a player doesn't answer within turn_timeout
+TURN_TIMEOUT = object()
+
 class PokerEngineServer:
     def __init__(self, 
                  host: str = HOST, 
@@ -53,7 +57,11 @@ class PokerEngineServer:
                  blind_amount: int = DEFAULT_BLIND_AMOUNT, 
                  blind_multiplier: float = DEFAULT_BLIND_MULTIPLIER, 
                  blind_increase_interval: int = DEFAULT_BLIND_INCREASE_INTERVAL, 
-                 initial_money: int = DEFAULT_INITIAL_MONEY):
+                 initial_money: int = DEFAULT_INITIAL_MONEY,
+                 framing: str = NEWLINE_FRAMING):
+        if framing not in FRAMING_MODES:
+            raise ValueError(f"Invalid framing mode: {framing}")
+
         self.host = host
         self.port = port
         self.required_players = num_players
@@ -65,9 +73,9 @@ class PokerEngineServer:
         self.blind_multiplier = blind_multiplier
         self.blind_increase_interval = blind_increase_interval
         self.initial_money = initial_money  # Initial money for each player
+        self.framing = framing  # How messages are delimited on the wire
         
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket = self.create_server_socket()
 
         # Generate one game ID for the entire simulation sequence
         self.simulation_game_id = str(uuid.uuid4()) if self.sim else None
@@ -75,10 +83,14 @@ class PokerEngineServer:
         self.game = Game(self.debug, self.blind_amount, 0, self.simulation_game_id)  # Initial game with sequence 0
         self.player_connections: Dict[int, socket.socket] = {}
         self.player_addresses: Dict[int, Tuple[str, int]] = {}
+        self.player_readers: Dict[int, MessageReader] = {}  # Buffered per-connection readers
         self.player_money: Dict[int, int] = {}  # Track player money between games
         self.player_delta: Dict[int, int] = {}  # Track cumulative delta (change from initial money)
         self.game_in_progress = False
         self.server_lock = threading.Lock()
+        self.batch_sends = False  # Queue writes and flush them with one sendmsg per connection
+        self.pending_sends: Dict[socket.socket, List[bytes]] = {}
+        self.dropped_connections: Set[socket.socket] = set()  # Closed after a failed write
         self.game_lock = threading.Lock()
         self.running = True
         self.current_player_idx = 0
@@ -90,6 +102,18 @@ class PokerEngineServer:
         # Dealer button management for continuous games
         self.dealer_button_position = 0
 
+        # Set when the server is one of several tables in a process (see TableManager)
+        self.table_id = None
+
+        # Optional deck.DeckPool handing out pre-shuffled decks to each game
+        self.deck_pool = None
+        self.log_sink = None  # Game log destination shared by all games, a JSON file per game when None
+
+    def create_server_socket(self):
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        return server_socket
+
     def start_server(self):
         try:
             self.server_socket.bind((self.host, self.port))
@@ -109,9 +133,13 @@ class PokerEngineServer:
 
     def stop_server(self):
         self.running = False
+        self.batch_sends = False
+        self.flush_sends()
         self.server_socket.close()
         for conn in self.player_connections.values():
             conn.close()
+        if self.log_sink is not None:
+            self.log_sink.flush()
         
         # If this was a simulation, replace RUNNING with DONE
         if self.sim:
@@ -148,6 +176,7 @@ class PokerEngineServer:
                 self.player_order[player_id] = self.connection_count # hold true order of players
                 self.player_connections[player_id] = client_socket
                 self.player_addresses[player_id] = address
+                self.player_readers[player_id] = MessageReader(client_socket, self.framing)
                 
                 # Initialize player money and delta for new connections
                 if player_id not in self.player_money:
@@ -189,7 +218,7 @@ class PokerEngineServer:
             self.update_blind_amount()
             
             # Create a new game instance with the current blind amount, game sequence, and shared game ID
-            self.game = Game(self.debug, self.blind_amount, self.game_count, self.simulation_game_id)
+            self.game = Game(self.debug, self.blind_amount, self.game_count, self.simulation_game_id, deck_pool=self.deck_pool, log_sink=self.log_sink)
             
             # Set the current dealer button position
             self.game.set_dealer_button_position(self.dealer_button_position)
@@ -229,6 +258,11 @@ class PokerEngineServer:
             # Run a single game
             self.run_single_game()
             
+            # Players whose connection dropped during the game don't play the next one
+            for player_id, conn in list(self.player_connections.items()):
+                if conn in self.dropped_connections:
+                    self.remove_player(player_id)
+
             # Rotate dealer button after each game for continuous mode
             self.rotate_dealer_button()
             
@@ -249,6 +283,39 @@ class PokerEngineServer:
 
     def run_single_game(self):
         """Run a single game"""
+        flow = self.game_flow()
+        self.batch_sends = True
+        try:
+            player_id = next(flow)
+            while True:
+                # Everything queued since the last read goes out before we wait
+                self.flush_sends()
+                player_id = flow.send(self.receive_action(player_id))
+        except StopIteration:
+            pass
+        finally:
+            self.batch_sends = False
+            self.flush_sends()
+
+    def receive_action(self, player_id):
+        """
+        Wait for the next action from a player.
+        Returns the raw message, TURN_TIMEOUT if the player took longer than
+        turn_timeout, or the exception raised while reading.
+        """
+        try:
+            return self.player_readers[player_id].read_message(self.turn_timeout)
+        except socket.timeout:
+            return TURN_TIMEOUT
+        except Exception as e:
+            return e
+
+    def game_flow(self):
+        """
+        The flow of a single game, independent of the transport.
+        Yields the id of the player whose action is needed and expects the result
+        of receive_action() to be sent back in.
+        """
         with self.game_lock:
             self.game_in_progress = True
         
@@ -339,7 +406,8 @@ class PokerEngineServer:
                     self.game_in_progress = False
 
                     if not self.sim:
-                        self.append_to_file(OUTPUT_GAME_RESULT_FILE, f"GAME_{self.game_count} " + str(score))
+                        table_prefix = f"TABLE_{self.table_id} " if self.table_id is not None else ""
+                        self.append_to_file(OUTPUT_GAME_RESULT_FILE, table_prefix + f"GAME_{self.game_count} " + str(score))
                     else:
                         pass
                     break
@@ -387,8 +455,6 @@ class PokerEngineServer:
                         action_processed = False
                         
                         while retry_count < RETRY_COUNT and not action_processed:
-                            conn = self.player_connections[player_id]
-                            
                             # Check if player is still connected
                             if player_id not in self.player_connections:
                                 break
@@ -397,8 +463,11 @@ class PokerEngineServer:
                             self.send_message(player_id, str(request_action_message))
 
                             try:
-                                conn.settimeout(5)
-                                action = conn.recv(4096).decode('utf-8')
+                                action = yield player_id
+                                if action is TURN_TIMEOUT:
+                                    raise socket.timeout()
+                                if isinstance(action, Exception):
+                                    raise action
                                 
                                 if not action:
                                     retry_count += 1
@@ -457,6 +526,12 @@ class PokerEngineServer:
                 # round end
                 end_round = ROUND_END(get_round_name_from_enum(self.game.get_current_round()))
                 self.game.end_round()
+                if self.game.is_all_in_runout():
+                    # Nobody can bet anymore: deal the rest of the board and go
+                    # straight to showdown with one state update for all streets
+                    self.game.run_out_board()
+                    self.broadcast_game_state()
+                    continue
                 self.broadcast_game_state()
 
                 self.broadcast_message(end_round)
@@ -476,9 +551,40 @@ class PokerEngineServer:
         """
         Send a message to a player in raw text.
         """
-        message = message + "\n"
         if player_id in self.player_connections:
-            self.player_connections[player_id].sendall(message.encode('utf-8'))
+            self.send_bytes(self.player_connections[player_id], encode_message(message, self.framing))
+
+    def send_bytes(self, conn, data: bytes):
+        """Write raw bytes to a connection, or queue them while sends are batched"""
+        if conn in self.dropped_connections:
+            return
+        if self.batch_sends:
+            self.pending_sends.setdefault(conn, []).append(data)
+        else:
+            conn.sendall(data)
+
+    def flush_sends(self):
+        """Write all queued messages, one vectored write per connection"""
+        pending, self.pending_sends = self.pending_sends, {}
+        for conn, buffers in pending.items():
+            try:
+                send_buffers(conn, buffers)
+            except Exception as e:
+                logger.error(f"Error sending to connection: {e}")
+                print(f"Error sending to connection: {e}")
+                self.drop_connection(conn)
+
+    def drop_connection(self, conn):
+        """
+        Close a connection whose write failed part way. Its stream is missing
+        messages now, so nothing more is sent on it; the player's next read
+        fails and they are folded, and they are removed once the game ends.
+        """
+        self.dropped_connections.add(conn)
+        try:
+            conn.close()
+        except OSError:
+            pass
 
     def send_text_message(self, player_id, message):
         mes = TEXT(message)
@@ -487,9 +593,9 @@ class PokerEngineServer:
         print(f"Sent message to player {player_id}: {message}")
 
     def broadcast(self, message):
-        message = message + "\n"
+        data = encode_message(message, self.framing)
         for _, conn in self.player_connections.items():
-            conn.sendall(message.encode('utf-8'))
+            self.send_bytes(conn, data)
 
     def broadcast_text(self, message):
         mes = TEXT(message)
@@ -519,45 +625,22 @@ class PokerEngineServer:
         logger.info(f"Processing action from player {player_id}: {action_tuple}")
         print(f"Processing action from player {player_id}: {action_tuple}")
         
-        # Check if player has enough money for the action (except fold and check)
-        if action_type != 1 and action_type != 2:  # Not fold and not check
+        # Check if player has enough money for the action (fold and check are never adjusted)
+        limited_action, forced_fold = self.game.limit_action_to_money(player_id, action_tuple, self.player_money)
+        if limited_action != action_tuple:
             current_money = self.player_money.get(player_id, 0)
             current_delta = self.player_delta.get(player_id, 0)
-            
-            # For CALL actions, calculate the actual amount needed
-            if action_type == 3:  # CALL
-                # Get the actual call amount from the game state
-                current_bet = self.game.current_round.raise_amount
-                player_bet = self.game.current_round.player_bets.get(player_id, 0)
-                actual_call_amount = current_bet - player_bet
-                
-                if actual_call_amount > current_money:
-                    logger.warning(f"Player {player_id} doesn't have enough money for call: needs {actual_call_amount}, has {current_money} (delta: {current_delta})")
-                    print(f"Player {player_id} doesn't have enough money for call: needs {actual_call_amount}, has {current_money} (delta: {current_delta})")
-                    
-                    # Force them to fold due to insufficient money for call
-                    logger.info(f"Forcing player {player_id} to fold due to insufficient money for call")
-                    print(f"Forcing player {player_id} to fold due to insufficient money for call")
-                    action_tuple = (PokerAction.FOLD, 0)
-                    self.broadcast_text(f"Player {player_id} automatically folded due to insufficient money")
-                    
+            logger.warning(f"Player {player_id} doesn't have enough money for action {action_tuple}: has {current_money} (delta: {current_delta})")
+            print(f"Player {player_id} doesn't have enough money for action {action_tuple}: has {current_money} (delta: {current_delta})")
+
+            if forced_fold:
+                logger.info(f"Forcing player {player_id} to fold due to insufficient money")
+                print(f"Forcing player {player_id} to fold due to insufficient money")
+                self.broadcast_text(f"Player {player_id} automatically folded due to insufficient money")
             else:
-                # For other actions (RAISE, ALL_IN), check the amount sent by client
-                if action_amount > current_money:
-                    logger.warning(f"Player {player_id} doesn't have enough money for action: needs {action_amount}, has {current_money} (delta: {current_delta})")
-                    print(f"Player {player_id} doesn't have enough money for action: needs {action_amount}, has {current_money} (delta: {current_delta})")
-                    
-                    # If it's an all-in action, allow it with the amount they have
-                    if action_type == 5:  # All-in
-                        action_tuple = (get_poker_action_enum_from_index(action_type), current_money)
-                        logger.info(f"Adjusting all-in amount to {current_money}")
-                    else:
-                        # For other actions, force them to fold
-                        logger.info(f"Forcing player {player_id} to fold due to insufficient money")
-                        print(f"Forcing player {player_id} to fold due to insufficient money")
-                        action_tuple = (PokerAction.FOLD, 0)
-                        self.broadcast_text(f"Player {player_id} automatically folded due to insufficient money")
-        
+                logger.info(f"Adjusting all-in amount to {current_money}")
+            action_tuple = limited_action
+
         try:
             self.game.update_game(player_id, action_tuple)
         except Exception as e:
@@ -574,6 +657,7 @@ class PokerEngineServer:
             self.player_connections[player_id].close()
             del self.player_connections[player_id]
             del self.player_addresses[player_id]
+            self.player_readers.pop(player_id, None)
             logger.info(f"Player {player_id} disconnected.")
             print(f"Player {player_id} disconnected.")
 
@@ -581,6 +665,10 @@ class PokerEngineServer:
         return uuid.uuid4().int & (1<<32)-1
     
     def append_to_file(self, path, score):
+        # A BackgroundLogWriter sink queues the line with the game logs, stop_server flushes it
+        if self.log_sink is not None:
+            self.log_sink.append_line(path, score)
+            return
         with open(path, "a") as file:
             file.write(f"{score}\n")
         
@@ -0,0 +1,26 @@
+"""Simple bots shared by the tests that play hands through BatchSimulator"""
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from poker_type.game import PokerAction
+
+
+def call_bot(player_id, hand, state):
+    if state.current_bet > state.player_bets.get(player_id, 0):
+        return (PokerAction.CALL, 0)
+    return (PokerAction.CHECK, 0)
+
+
+def fold_bot(player_id, hand, state):
+    return (PokerAction.FOLD, 0)
+
+
+def raise_bot(player_id, hand, state):
+    if state.round == "Preflop" and state.current_bet < 40:
+        return (PokerAction.RAISE, 40)
+    return call_bot(player_id, hand, state)
+
+
+def shove_bot(player_id, hand, state):
+    return (PokerAction.ALL_IN, state.player_money[player_id])
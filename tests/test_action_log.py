@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game.action_log import ActionLog, ActionSequence
+from game.game import Game
+from game.round_state import Pot, RoundState
+from poker_type.game import PokerAction
+
+
+class TestActionLog(unittest.TestCase):
+    def test_columns_and_records(self):
+        log = ActionLog([{"id": 0, "amount": 30, "eligible_players": [1, 2]}])
+        log.append(1, PokerAction.RAISE, 20, 1000, 20, 50, [Pot(20, {1})])
+        log.append(2, PokerAction.ALL_IN, 10, 1001, 30, 60, [Pot(20, {1, 2}), Pot(10, {1})])
+
+        self.assertEqual(len(log), 2)
+        self.assertEqual(list(log.amounts), [20, 10])
+        record = log[-1]
+        self.assertEqual(record.player_id, 2)
+        self.assertEqual(record.action, PokerAction.ALL_IN)
+        self.assertEqual(record.side_pots_after_action, [
+            {"amount": 20, "eligible_players": [1, 2]},
+            {"amount": 10, "eligible_players": [1]}
+        ])
+        self.assertEqual([p["id"] for p in record.total_side_pots_after_action], [0, 1, 2])
+
+        entry = ActionSequence(log)[0]
+        self.assertEqual(entry["player"], 0)
+        self.assertEqual(entry["action"], "RAISE")
+        self.assertEqual(entry["total_pot_after_action"], 50)
+        self.assertEqual(entry["total_side_pots_after_action"][-1], {"id": 1, "amount": 20, "eligible_players": [1]})
+
+        with self.assertRaises(IndexError):
+            log[2]
+
+    def test_snapshot_is_not_affected_by_later_pot_updates(self):
+        round_state = RoundState([1, 2])
+        round_state.update_player_action(1, PokerAction.RAISE, 20)
+        round_state.update_player_action(2, PokerAction.CALL)
+        # The single pot is updated in place, earlier entries keep their amounts
+        self.assertEqual([record.side_pots_after_action[0]["amount"] for record in round_state.action_history], [20, 40])
+
+    def test_game_log_is_materialised_on_write(self):
+        game = Game(write_log=False)
+        game.add_player(1)
+        game.add_player(2)
+        game.start_game()
+        game.update_game(1, (PokerAction.CALL, 0))
+        game.update_game(2, (PokerAction.CHECK, 0))
+        game.end_round()
+
+        sequence = game.json_game_log["rounds"][0]["action_sequence"]
+        self.assertIsInstance(sequence, ActionSequence)
+        self.assertEqual([entry["action"] for entry in sequence], ["CALL", "CHECK"])
+
+        game._materialize_action_sequences()
+        self.assertIsInstance(game.json_game_log["rounds"][0]["action_sequence"], list)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import time
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from async_server import AsyncPokerEngineServer, TableManager
+from message import PLAYER_ACTION
+from poker_type.game import PokerAction
+from poker_type.messsage import MessageType
+
+
+async def play_client(port, respond=True):
+    """Minimal client: calls or checks whenever asked, collects END messages"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    player_id = None
+    state = None
+    results = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        if message["type"] == MessageType.CONNECT.value:
+            player_id = message["message"]
+        elif message["type"] == MessageType.GAME_STATE.value:
+            state = message["message"]
+        elif message["type"] == MessageType.REQUEST_PLAYER_ACTION.value and respond:
+            to_call = state["current_bet"] - state["player_bets"].get(str(player_id), 0)
+            action = PokerAction.CALL if to_call > 0 else PokerAction.CHECK
+            writer.write((PLAYER_ACTION(player_id, action.value, 0).serialize() + "\n").encode('utf-8'))
+            await writer.drain()
+        elif message["type"] == MessageType.GAME_END.value:
+            results.append(message["message"]["all_scores"])
+    writer.close()
+    return player_id, results
+
+
+async def run_table(num_games, turn_timeout, responders):
+    server = AsyncPokerEngineServer(host='127.0.0.1', port=0, num_players=len(responders), turn_timeout=turn_timeout, sim=True)
+    server.simulation_rounds = num_games
+    server_task = asyncio.create_task(server.serve())
+    while server.server_socket is None:
+        await asyncio.sleep(0.01)
+
+    clients = []
+    for respond in responders:
+        clients.append(asyncio.create_task(play_client(server.port, respond)))
+        await asyncio.sleep(0.01)  # Keep connection order deterministic
+
+    results = await asyncio.wait_for(asyncio.gather(*clients), 30)
+    await asyncio.wait_for(server_task, 30)
+    return server, results
+
+
+class TestAsyncServer(unittest.TestCase):
+    def test_plays_continuous_games(self):
+        server, results = asyncio.run(run_table(2, 5, [True, True]))
+        self.assertEqual(server.game_count, 3)  # Counter passes the limit once before stopping
+        for player_id, scores in results:
+            self.assertEqual(len(scores), 2)
+            for all_scores in scores:
+                self.assertEqual(sum(all_scores.values()), 0)
+        self.assertEqual(sum(server.player_delta.values()), 0)
+
+    def test_turn_timeout_is_honoured(self):
+        start = time.time()
+        server, results = asyncio.run(run_table(1, 0.2, [True, False]))
+        self.assertLess(time.time() - start, 5)
+        (_, first_scores), (_, second_scores) = results
+        self.assertEqual(len(first_scores), 1)
+        self.assertEqual(first_scores, second_scores)
+        self.assertEqual(sum(server.player_delta.values()), 0)
+
+    def test_tables_share_one_event_loop(self):
+        async def scenario():
+            return await asyncio.gather(*(run_table(1, 5, [True, True]) for _ in range(5)))
+
+        tables = asyncio.run(scenario())
+        self.assertEqual(len(tables), 5)
+        for server, results in tables:
+            self.assertEqual(sum(server.player_delta.values()), 0)
+
+
+class TestTableManager(unittest.TestCase):
+    def test_routes_connections_to_isolated_tables(self):
+        async def scenario():
+            manager = TableManager(host='127.0.0.1', port=0, num_tables=3, num_players=2, turn_timeout=5, sim=True, simulation_rounds=2)
+            manager_task = asyncio.create_task(manager.serve())
+            while manager.server_socket is None:
+                await asyncio.sleep(0.01)
+
+            clients = []
+            for _ in range(6):
+                clients.append(asyncio.create_task(play_client(manager.port)))
+                await asyncio.sleep(0.01)
+            results = await asyncio.wait_for(asyncio.gather(*clients), 30)
+            await asyncio.wait_for(manager_task, 30)
+            return manager, results
+
+        manager, results = asyncio.run(scenario())
+        seated = [set(table.player_money) for table in manager.tables]
+        self.assertTrue(all(len(players) == 2 for players in seated))
+        self.assertEqual(len(set().union(*seated)), 6)
+
+        for table in manager.tables:
+            self.assertEqual(table.game_count, 3)
+            self.assertEqual(sum(table.player_delta.values()), 0)
+        self.assertEqual(len({table.simulation_game_id for table in manager.tables}), 3)
+
+        for player_id, scores in results:
+            self.assertEqual(len(scores), 2)
+            self.assertTrue(all(str(player_id) in all_scores for all_scores in scores))
+
+    def test_marks_simulation_done_once_all_tables_finish(self):
+        async def scenario():
+            manager = TableManager(host='127.0.0.1', port=0, num_tables=2, num_players=2, turn_timeout=5, sim=True)
+            manager.tables[0].simulation_rounds = 1
+            manager.tables[1].simulation_rounds = 4  # Still playing when table 0 is done
+            done_calls = []
+            for table in manager.tables:
+                table.replace_running_with_done = lambda: done_calls.append([t.running for t in manager.tables])
+
+            manager_task = asyncio.create_task(manager.serve())
+            while manager.server_socket is None:
+                await asyncio.sleep(0.01)
+            clients = []
+            for _ in range(4):
+                clients.append(asyncio.create_task(play_client(manager.port)))
+                await asyncio.sleep(0.01)
+
+            first_table_results = await asyncio.wait_for(asyncio.gather(*clients[:2]), 30)
+            self.assertFalse(manager.tables[0].running)
+            self.assertEqual(done_calls, [])  # Table 1 is still playing
+            await asyncio.wait_for(asyncio.gather(*clients[2:]), 30)
+            await asyncio.wait_for(manager_task, 30)
+            return manager, first_table_results, done_calls
+
+        manager, first_table_results, done_calls = asyncio.run(scenario())
+        self.assertEqual([len(scores) for _, scores in first_table_results], [1, 1])
+        self.assertEqual(done_calls, [[False, False]])
+
+    def test_rejects_connections_when_full(self):
+        manager = TableManager(num_tables=1, num_players=2)
+        manager.tables[0].player_connections = {1: None, 2: None}
+        self.assertIsNone(manager.table_for_new_connection())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game.batch import BatchSimulator
+from game.game import Game
+from poker_type.game import PokerAction
+from bots import call_bot, fold_bot, shove_bot
+
+
+def raise_bot(player_id, hand, state):
+    if state.round_num == 0 and state.current_bet <= 20:
+        return (PokerAction.RAISE, 40)
+    return call_bot(player_id, hand, state)
+
+
+def broken_bot(player_id, hand, state):
+    raise RuntimeError("bot crashed")
+
+
+class TestBatchSimulator(unittest.TestCase):
+    def test_requires_two_bots(self):
+        with self.assertRaises(ValueError):
+            BatchSimulator({1: call_bot})
+
+    def test_results_are_zero_sum(self):
+        sim = BatchSimulator({1: call_bot, 2: raise_bot, 3: call_bot})
+        deltas = sim.run(50)
+        self.assertEqual(sim.game_count, 50)
+        self.assertEqual(sum(deltas.values()), 0)
+        for player_id, delta in deltas.items():
+            self.assertEqual(sim.player_money[player_id], sim.initial_money + delta)
+
+    def test_folding_bot_loses_blinds(self):
+        sim = BatchSimulator({1: fold_bot, 2: call_bot}, blind_amount=10)
+        sim.run(10)
+        self.assertLess(sim.player_delta[1], 0)
+        self.assertEqual(sim.player_delta[1], -sim.player_delta[2])
+
+    def test_broken_bot_is_auto_folded(self):
+        sim = BatchSimulator({1: broken_bot, 2: call_bot})
+        score = sim.play_next_game()
+        self.assertEqual(sum(score.values()), 0)
+        self.assertGreater(sim.invalid_actions[1], 0)
+        self.assertEqual(sim.invalid_actions[2], 0)
+
+    def test_all_in_runs_out_the_board(self):
+        seen_rounds = []
+
+        def counting_call_bot(player_id, hand, state):
+            seen_rounds.append(state.round_num)
+            return call_bot(player_id, hand, state)
+
+        sim = BatchSimulator({1: shove_bot, 2: counting_call_bot}, seed=4)
+        with sim.output_context():
+            scores = sim.play_next_game()
+        game = sim.game
+        # Heads-up the blinds close preflop, the shove and call come on the flop.
+        # After that nobody can bet, so there are no turn and river rounds.
+        self.assertEqual(set(seen_rounds), {seen_rounds[0]})
+        self.assertEqual(game.round_index, 1)
+        self.assertEqual(len(game.board), 5)
+        self.assertEqual(list(game.json_game_log["rounds"]), [0, 1])
+        self.assertFalse(game.is_running)
+        self.assertEqual(sum(scores.values()), 0)
+
+    def test_dealer_button_rotates(self):
+        sim = BatchSimulator({1: call_bot, 2: call_bot, 3: call_bot})
+        positions = []
+        for _ in range(3):
+            positions.append(sim.dealer_button_position)
+            sim.play_next_game()
+        self.assertEqual(sorted(positions), [0, 1, 2])
+
+    def test_blind_schedule(self):
+        sim = BatchSimulator({1: call_bot, 2: call_bot}, blind_amount=10, blind_multiplier=2.0, blind_increase_interval=2)
+        sim.run(4)
+        self.assertEqual(sim.blind_amount, 40)
+
+
+class TestLimitActionToMoney(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(debug=True)
+        self.game.add_player(1)
+        self.game.add_player(2)
+        self.game.start_game()
+        self.game.update_game(1, (PokerAction.RAISE, 100))
+
+    def test_fold_and_check_untouched(self):
+        self.assertEqual(self.game.limit_action_to_money(2, (PokerAction.FOLD, 0), {2: 0}), ((PokerAction.FOLD, 0), False))
+        self.assertEqual(self.game.limit_action_to_money(2, (PokerAction.CHECK, 0), {2: 0}), ((PokerAction.CHECK, 0), False))
+
+    def test_unaffordable_call_folds(self):
+        self.assertEqual(self.game.limit_action_to_money(2, (PokerAction.CALL, 0), {2: 50}), ((PokerAction.FOLD, 0), True))
+        self.assertEqual(self.game.limit_action_to_money(2, (PokerAction.CALL, 0), {2: 100}), ((PokerAction.CALL, 0), False))
+
+    def test_all_in_is_capped(self):
+        self.assertEqual(self.game.limit_action_to_money(2, (PokerAction.ALL_IN, 500), {2: 80}), ((PokerAction.ALL_IN, 80), False))
+
+    def test_unaffordable_raise_folds(self):
+        self.assertEqual(self.game.limit_action_to_money(2, (PokerAction.RAISE, 500), {2: 80}), ((PokerAction.FOLD, 0), True))
+
+
+if __name__ == '__main__':
+    unittest.main()
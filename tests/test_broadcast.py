@@ -0,0 +1,113 @@
+import socket
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from framing import MessageReader, send_buffers
+from message import TEXT
+from server import PokerEngineServer
+
+
+class CountingSocket:
+    """Wraps a socket and records every write call"""
+    def __init__(self, sock):
+        self.sock = sock
+        self.writes = []
+
+    def sendall(self, data):
+        self.writes.append(("sendall", bytes(data)))
+        self.sock.sendall(data)
+
+    def sendmsg(self, buffers):
+        self.writes.append(("sendmsg", b"".join(bytes(b) for b in buffers)))
+        return self.sock.sendmsg(buffers)
+
+    def close(self):
+        self.sock.close()
+
+
+class TestBatchedBroadcast(unittest.TestCase):
+    def setUp(self):
+        self.server = PokerEngineServer(host='localhost', port=0, num_players=2)
+        self.pairs = [socket.socketpair() for _ in range(2)]
+        self.connections = {player_id: CountingSocket(pair[0]) for player_id, pair in zip([1, 2], self.pairs)}
+        self.server.player_connections = dict(self.connections)
+
+    def tearDown(self):
+        self.server.server_socket.close()
+        for a, b in self.pairs:
+            a.close()
+            b.close()
+
+    def test_unbatched_broadcast_encodes_once(self):
+        self.server.broadcast_text("hello")
+        first = self.connections[1].writes
+        second = self.connections[2].writes
+        self.assertEqual(len(first), 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first[0][1], (str(TEXT("hello")) + "\n").encode('utf-8'))
+
+    def test_batched_sends_flush_with_one_write_per_connection(self):
+        self.server.batch_sends = True
+        self.server.broadcast_text("one")
+        self.server.broadcast_text("two")
+        self.server.send_text_message(2, "only for two")
+        self.assertEqual(self.connections[1].writes, [])
+
+        self.server.flush_sends()
+        self.assertEqual([kind for kind, _ in self.connections[1].writes], ["sendmsg"])
+        self.assertEqual([kind for kind, _ in self.connections[2].writes], ["sendmsg"])
+
+        reader = MessageReader(self.pairs[1][1])
+        received = [reader.read_message(1) for _ in range(3)]
+        self.assertEqual(received, [str(TEXT("one")), str(TEXT("two")), str(TEXT("only for two"))])
+        self.assertEqual(self.server.pending_sends, {})
+
+    def test_failed_flush_drops_the_connection(self):
+        class FailingSocket(CountingSocket):
+            def sendmsg(self, buffers):
+                # Part of the first message goes out, then the write times out
+                self.sock.sendall(bytes(buffers[0])[:3])
+                raise socket.timeout("timed out")
+
+        failing = FailingSocket(self.pairs[0][0])
+        self.server.player_connections[1] = failing
+        self.server.batch_sends = True
+        self.server.broadcast_text("one")
+        self.server.broadcast_text("two")
+        self.server.flush_sends()
+        self.assertEqual(self.server.dropped_connections, {failing})
+
+        # Nothing more is written past the gap; the client sees the stream end
+        self.server.broadcast_text("three")
+        self.assertNotIn(failing, self.server.pending_sends)
+        self.server.flush_sends()
+        reader = MessageReader(self.pairs[0][1])
+        self.assertEqual(reader.read_message(1), "")
+
+        # The other player still gets every message
+        reader = MessageReader(self.pairs[1][1])
+        received = [reader.read_message(1) for _ in range(3)]
+        self.assertEqual(received, [str(TEXT("one")), str(TEXT("two")), str(TEXT("three"))])
+
+
+class TestSendBuffers(unittest.TestCase):
+    def test_partial_writes_are_resumed(self):
+        class ShortWriteSocket:
+            def __init__(self):
+                self.data = b""
+
+            def sendmsg(self, buffers):
+                # Only accept up to 3 bytes per call
+                chunk = b"".join(bytes(b) for b in buffers)[:3]
+                self.data += chunk
+                return len(chunk)
+
+        sock = ShortWriteSocket()
+        send_buffers(sock, [b"hello", b"", b"world", b"!"])
+        self.assertEqual(sock.data, b"helloworld!")
+
+
+if __name__ == '__main__':
+    unittest.main()
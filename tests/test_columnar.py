@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import unittest
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import eval7
+
+from deck import card_code, np
+from game.batch import BatchSimulator
+from game.columnar import ColumnarExporter, ColumnarSink, load_columns
+from game.log_sink import BackgroundLogWriter, json_default
+from bots import call_bot, raise_bot
+
+
+def flat(column):
+    """Values of a column, numpy's 2-D columns row by row"""
+    return column.ravel().tolist() if np is not None else list(column)
+
+
+class TestColumnarExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def play(self, num_games, log_sink=None):
+        sim = BatchSimulator({1: raise_bot, 2: call_bot, 3: call_bot}, write_logs=log_sink is not None, seed=5, log_sink=log_sink)
+        live_logs = []
+        with sim.output_context():
+            for _ in range(num_games):
+                sim.play_next_game()
+                live_logs.append(sim.game.json_game_log)
+        return [json.loads(json.dumps(log, default=json_default)) for log in live_logs], live_logs
+
+    def check_tables(self, tables, logs):
+        hands, players, actions = tables["hands"], tables["players"], tables["actions"]
+        self.assertEqual(list(hands["game_id"]), [log["gameId"] for log in logs])
+        self.assertEqual(len(actions["hand"]), sum(len(r["action_sequence"]) for log in logs for r in log["rounds"].values()))
+
+        first = logs[0]
+        board = [card_code(eval7.Card(card)) for card in first["finalBoard"]]
+        self.assertEqual(flat(hands["board"])[:5], board + [-1] * (5 - len(board)))
+        rows = [i for i, hand in enumerate(players["hand"]) if hand == 0]
+        self.assertEqual({int(players["player_id"][i]): int(players["delta"][i]) for i in rows},
+                         {int(p): score for p, score in first["playerMoney"]["gameScores"].items()})
+
+        preflop = first["rounds"]["0"]["action_sequence"]
+        self.assertEqual([int(a) for a in actions["forced"][:len(preflop)]], [1, 1] + [0] * (len(preflop) - 2))
+        self.assertEqual(int(actions["amount"][2]), preflop[2]["amount"])
+        self.assertEqual(int(actions["player_id"][2]), preflop[2]["player"] + 1)
+
+        # Player 1 raises every hand, the others call it
+        for i in range(len(players["hand"])):
+            player_id = int(players["player_id"][i])
+            self.assertEqual(int(players["vpip"][i]), 1)
+            self.assertEqual(int(players["pfr"][i]), int(player_id == 1))
+
+    def test_exporter_tables(self):
+        logs, live_logs = self.play(5)
+        exporter = ColumnarExporter()
+        for sequence, log in enumerate(logs, 1):
+            exporter.add(log, sequence)
+        self.assertEqual(len(exporter), 5)
+        self.check_tables(exporter.tables(), logs)
+        self.assertEqual(flat(exporter.tables()["hands"]["game_sequence"]), [1, 2, 3, 4, 5])
+
+        # Logs whose action sequences are still lazy ActionSequence views give the same tables
+        live = ColumnarExporter()
+        for sequence, log in enumerate(live_logs, 1):
+            live.add(log, sequence)
+        for table, columns in exporter.tables().items():
+            for name, values in columns.items():
+                self.assertEqual(flat(live.tables()[table][name]), flat(values), f"{table}.{name}")
+
+    def test_missing_seed_is_not_seed_zero(self):
+        exporter = ColumnarExporter()
+        for log in ({"seed": 0}, {"seed": None}, {}, {"seed": 42}):
+            exporter.add(log)
+        self.assertEqual(flat(exporter.tables()["hands"]["seed"]), [0, -1, -1, 42])
+
+    def test_column_files_round_trip(self):
+        logs, _ = self.play(4)
+        exporter = ColumnarExporter()
+        for log in logs:
+            exporter.add(log)
+        path = exporter.save(os.path.join(self.directory, "columns"), layout="columns")
+        self.assertTrue(os.path.isfile(os.path.join(path, "columns.json")))
+        self.check_tables(load_columns(path), logs)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_sink_writes_npz_chunks(self):
+        sink = ColumnarSink(self.directory, chunk_size=4)
+        logs, _ = self.play(6, log_sink=sink)
+        self.assertEqual(os.listdir(self.directory), ["chunk_00000.npz"])  # Written once full, not per flush
+        sink.flush()
+        sink.flush()  # Nothing new, no empty chunk
+        sink.close()
+        self.assertEqual(sorted(os.listdir(self.directory)), ["chunk_00000.npz", "chunk_00001.npz"])
+
+        tables = load_columns(self.directory)
+        self.check_tables(tables, logs)
+        self.assertEqual(tables["hands"]["board"].shape, (6, 5))
+        self.assertEqual(tables["hands"]["game_sequence"].tolist(), list(range(1, 7)))
+        players = tables["players"]
+        self.assertEqual(int(players["delta"].sum()), 0)
+        # Hands of the second chunk point past the first chunk's rows
+        self.assertEqual(sorted(set(players["hand"].tolist())), list(range(6)))
+        self.assertEqual(sorted(set(tables["actions"]["hand"].tolist())), list(range(6)))
+
+    def test_sink_column_chunks_continue_numbering(self):
+        logs, _ = self.play(3)
+        for batch in (logs[:2], logs[2:]):
+            sink = ColumnarSink(self.directory, layout="columns")
+            for log in batch:
+                sink.write(log)
+            sink.close()
+        self.assertEqual(sorted(os.listdir(self.directory)), ["chunk_00000", "chunk_00001"])
+        self.check_tables(load_columns(self.directory), logs)
+
+    def test_flushed_sink_fills_its_chunks(self):
+        logs, _ = self.play(10)
+        writer = BackgroundLogWriter(ColumnarSink(self.directory, layout="columns", chunk_size=4))
+        for sequence, log in enumerate(logs, 1):
+            writer.write(log, sequence)
+            writer.flush()  # Every hand, as a server writing through it may
+        self.assertEqual(sorted(os.listdir(self.directory)), ["chunk_00000", "chunk_00001", "chunk_00002"])
+        self.check_tables(load_columns(self.directory), logs)
+        writer.close()
+        self.assertEqual(sorted(os.listdir(self.directory)), ["chunk_00000", "chunk_00001", "chunk_00002"])
+        self.assertEqual(list(load_columns(self.directory)["hands"]["game_sequence"]), list(range(1, 11)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import random
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import eval7
+
+import deck as deck_module
+from deck import CARDS, DeckPool, PokerDeck, card_code, code_to_card
+from game.batch import BatchSimulator
+from game.replay import replay_game
+from bots import call_bot
+
+
+class TestCardCodes(unittest.TestCase):
+    def test_codes_round_trip(self):
+        self.assertEqual(len(set(str(card) for card in CARDS)), 52)
+        for code, card in enumerate(CARDS):
+            self.assertEqual(card_code(card), code)
+            self.assertIs(code_to_card(code), card)
+        self.assertEqual(card_code(eval7.Card("2c")), 0)
+        self.assertEqual(card_code(eval7.Card("As")), 51)
+
+
+class TestPokerDeck(unittest.TestCase):
+    def test_seeded_shuffle_matches_shuffling_eval7_cards(self):
+        # Same permutation as shuffling an eval7 deck's card list, so older logged seeds still replay
+        cards = list(eval7.Deck().cards)
+        random.Random(99).shuffle(cards)
+        deck = PokerDeck(99)
+        deck.shuffle()
+        self.assertEqual(deck.deal(52), cards)
+
+    def test_deal_and_len(self):
+        deck = PokerDeck(1)
+        deck.shuffle()
+        hand = deck.deal(2)
+        self.assertEqual(len(deck), 50)
+        self.assertNotIn(hand[0], deck.peek(50))
+        with self.assertRaises(ValueError):
+            deck.deal(51)
+
+    def test_remove_keeps_order_of_other_cards(self):
+        deck = PokerDeck(3)
+        deck.shuffle()
+        order = deck.peek(52)
+        deck.remove_multiple([order[0], order[5]])
+        self.assertEqual(len(deck), 50)
+        self.assertEqual(deck.deal(6), [order[1], order[2], order[3], order[4], order[6], order[7]])
+        self.assertEqual(deck[0], order[8])
+
+        with self.assertRaises(ValueError):
+            deck.remove(order[5])  # Already removed
+        with self.assertRaises(ValueError):
+            deck.remove(order[1])  # Already dealt
+
+    def test_sample_leaves_deck_unchanged(self):
+        deck = PokerDeck(5)
+        deck.remove(eval7.Card("As"))
+        sample = deck.sample(10)
+        self.assertEqual(len(set(sample)), 10)
+        self.assertNotIn(eval7.Card("As"), sample)
+        self.assertEqual(len(deck), 51)
+
+
+class TestDeckPool(unittest.TestCase):
+    def orders(self, pool, n):
+        return [bytes(pool.next_deck().codes) for _ in range(n)]
+
+    def check_pool(self, use_numpy):
+        background = DeckPool(7, batch_size=16, use_numpy=use_numpy)
+        inline = DeckPool(7, batch_size=16, background=False, use_numpy=use_numpy)
+        try:
+            orders = self.orders(background, 40)
+        finally:
+            background.close()
+        self.assertEqual(orders, self.orders(inline, 40))
+        self.assertTrue(all(sorted(order) == list(range(52)) for order in orders))
+        self.assertEqual(len(set(orders)), 40)
+
+        # Any deck can be regenerated from the pool seed and its index
+        resumed = DeckPool(7, batch_size=16, background=False, use_numpy=use_numpy, start_index=21)
+        first = resumed.next_deck()
+        self.assertEqual(first.pool_index, 21)
+        self.assertEqual(bytes(first.codes), orders[21])
+        self.assertNotEqual(self.orders(DeckPool(8, batch_size=16, background=False, use_numpy=use_numpy), 1)[0], orders[0])
+
+    @unittest.skipIf(deck_module.np is None, "numpy is not installed")
+    def test_numpy_pool(self):
+        self.check_pool(True)
+
+    def test_fallback_pool(self):
+        self.check_pool(False)
+
+    def test_pool_deck_is_dealt_without_shuffle(self):
+        pool = DeckPool(3, batch_size=4, background=False)
+        order = bytes(DeckPool(3, batch_size=4, background=False).next_deck().codes)
+        pool_deck = PokerDeck.from_pool(pool)
+        self.assertIsNone(pool_deck.seed)
+        self.assertEqual(pool_deck.deal_codes(52), list(order))
+
+    def test_games_from_pool_replay(self):
+        pool = DeckPool(11, batch_size=8, background=False)
+        sim = BatchSimulator({1: call_bot, 2: call_bot, 3: call_bot}, deck_pool=pool)
+        with sim.output_context():
+            for _ in range(10):
+                scores = sim.play_next_game()
+                sim.game._materialize_action_sequences()
+                game_log = sim.game.json_game_log
+                self.assertIsNone(game_log["seed"])
+                self.assertEqual(game_log["deckPool"]["seed"], 11)
+                self.assertEqual(replay_game(game_log).score, scores)
+        self.assertEqual(pool.next_index, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import random
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game.duplicate import DuplicateResult, run_duplicate, seat_rotations
+from poker_type.game import PokerAction
+from bots import call_bot, fold_bot
+
+
+BOTS = {"caller": call_bot, "caller2": call_bot, "caller3": call_bot, "folder": fold_bot}
+
+
+class TestDuplicate(unittest.TestCase):
+    def test_seat_rotations(self):
+        self.assertEqual(seat_rotations(["a", "b", "c"]), [["a", "b", "c"], ["b", "c", "a"], ["c", "a", "b"]])
+
+    def test_identical_bots_cancel_out(self):
+        # Every deal is played from both seats by the same strategy, so the card luck cancels exactly
+        result = run_duplicate(BOTS, ["caller", "caller2"], 30, seed=1)
+        self.assertEqual(result.deltas, {"caller": 0, "caller2": 0})
+        self.assertEqual(result.games, {"caller": 60, "caller2": 60})
+        self.assertTrue(all(delta == 0 for delta in result.deal_deltas["caller"]))
+        self.assertEqual(result.standard_error()["caller"], 0)
+
+    def test_deals_match_across_rotations(self):
+        result = run_duplicate(BOTS, ["caller", "caller2", "caller3"], 20, seed=4)
+        self.assertEqual(sum(result.deltas.values()), 0)
+        self.assertTrue(all(delta == 0 for delta in result.deltas.values()))
+
+    def test_skill_difference_remains(self):
+        result = run_duplicate(BOTS, ["caller", "folder"], 10, seed=2, blind_amount=10)
+        self.assertGreater(result.deltas["caller"], 0)
+        self.assertEqual(result.deltas["caller"], -result.deltas["folder"])
+        self.assertEqual(len(result.deal_deltas["folder"]), 10)
+
+    def test_merge(self):
+        first = run_duplicate(BOTS, ["caller", "folder"], 5, seed=1)
+        second = run_duplicate(BOTS, ["caller", "folder"], 5, seed=2)
+        merged = first.merge(second)
+        self.assertEqual(merged.games["caller"], 20)
+        self.assertEqual(len(merged.deal_deltas["caller"]), 10)
+        self.assertEqual(merged.deltas["caller"], first.deltas["caller"] + second.deltas["caller"])
+        with self.assertRaises(ValueError):
+            merged.merge(DuplicateResult(rotations=3))
+
+    def test_random_bots_repeat_without_touching_the_callers_state(self):
+        def random_bot(player_id, hand, state):
+            if random.random() < 0.3:
+                return (PokerAction.FOLD, 0)
+            return call_bot(player_id, hand, state)
+
+        bots = {"random": random_bot, "caller": call_bot}
+        random.seed(123)
+        expected_next = random.random()
+        random.seed(123)
+        first = run_duplicate(bots, ["random", "caller"], 10, seed=4)
+        self.assertEqual(random.random(), expected_next)
+        self.assertEqual(run_duplicate(bots, ["random", "caller"], 10, seed=4).deltas, first.deltas)
+
+    def test_rejects_repeated_bot(self):
+        with self.assertRaises(ValueError):
+            run_duplicate(BOTS, ["caller", "caller"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import eval7
+
+import deck as deck_module
+from game.batch import BatchSimulator
+from game.equity import LOGGED_EQUITY_SAMPLES, calculate_equity
+from game.hand_strength import HandStrengthCache
+from bots import call_bot, shove_bot
+
+
+class TestEquity(unittest.TestCase):
+    def test_exact_on_the_turn(self):
+        # Flush draw against a set: 9 hearts left, but 2h and 3h pair the board into a full house
+        result = calculate_equity({1: ["Ah", "Kh"], 2: ["Qs", "Qd"]}, ["Qh", "7h", "2c", "3s"])
+        self.assertTrue(result.exact)
+        self.assertEqual(result.runouts, 44)
+        self.assertAlmostEqual(result.win[1], 7 / 44)
+        self.assertAlmostEqual(result.equity[1] + result.equity[2], 1.0)
+
+    def test_complete_board_split(self):
+        result = calculate_equity({1: ["As", "Ks"], 2: ["Ad", "Kd"]}, [eval7.Card(c) for c in ("2c", "7d", "9h", "Th", "Jc")])
+        self.assertEqual((result.runouts, result.tie, result.equity), (1, {1: 1.0, 2: 1.0}, {1: 0.5, 2: 0.5}))
+
+    def check_sampling(self, use_numpy):
+        hands = {1: ["As", "Ah"], 2: ["Kd", "Kc"]}
+        result = calculate_equity(hands, samples=4000, seed=3, use_numpy=use_numpy)
+        self.assertFalse(result.exact)
+        self.assertEqual(result.runouts, 4000)
+        self.assertAlmostEqual(result.equity[1], 0.8126, delta=0.03)  # Exact preflop equity is 0.8126
+        self.assertEqual(calculate_equity(hands, samples=4000, seed=3, use_numpy=use_numpy), result)
+        self.assertEqual(calculate_equity(hands, samples=4000, seed=3, use_numpy=use_numpy, cache=HandStrengthCache()), result)
+
+    @unittest.skipIf(deck_module.np is None, "numpy is not installed")
+    def test_numpy_sampling(self):
+        self.check_sampling(True)
+
+    def test_fallback_sampling(self):
+        self.check_sampling(False)
+
+    def test_parallel_sampling(self):
+        result = calculate_equity({1: ["As", "Ah"], 2: ["Kd", "Kc"], 3: ["7s", "8s"]}, ["2s", "9s", "Tc"],
+                                  samples=3000, exact=False, workers=2, seed=5)
+        self.assertEqual(result.runouts, 3000)
+        self.assertAlmostEqual(sum(result.equity.values()), 1.0)
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(ValueError):
+            calculate_equity({1: ["As", "Ah"]})
+        with self.assertRaises(ValueError):
+            calculate_equity({1: ["As", "Ah"], 2: ["As", "Kc"]})  # Same card twice
+        with self.assertRaises(ValueError):
+            calculate_equity({1: ["As", "Ah"], 2: ["Kd", "Kc"]}, samples=0)
+
+    def test_more_workers_than_samples(self):
+        result = calculate_equity({1: ["As", "Ah"], 2: ["Kd", "Kc"]}, samples=2, exact=False, workers=4, seed=1)
+        self.assertEqual(result.runouts, 2)
+
+
+class TestAllInEquityLog(unittest.TestCase):
+    def test_all_in_equity_is_logged(self):
+        sim = BatchSimulator({1: shove_bot, 2: shove_bot, 3: call_bot}, seed=2, record_equity=True)
+        with sim.output_context():
+            sim.play_next_game()
+        equity = sim.game.json_game_log["allInEquity"]
+        self.assertEqual(equity["round"], 0)
+        self.assertEqual(equity["board"], [])
+        self.assertAlmostEqual(sum(equity["equity"].values()), 1.0)
+        # Preflop can't be enumerated, the hand loop only samples a few runouts
+        self.assertEqual((equity["runouts"], equity["exact"]), (LOGGED_EQUITY_SAMPLES, False))
+
+        sim = BatchSimulator({1: shove_bot, 2: shove_bot, 3: call_bot}, seed=2, record_equity=True, equity_samples=300)
+        with sim.output_context():
+            sim.play_next_game()
+        self.assertEqual(sim.game.json_game_log["allInEquity"]["runouts"], 300)
+
+    def test_not_logged_by_default(self):
+        sim = BatchSimulator({1: shove_bot, 2: shove_bot}, seed=2)
+        with sim.output_context():
+            sim.play_next_game()
+        self.assertNotIn("allInEquity", sim.game.json_game_log)
+
+
+if __name__ == '__main__':
+    unittest.main()
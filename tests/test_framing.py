@@ -0,0 +1,102 @@
+import asyncio
+import socket
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from framing import (
+    LENGTH_PREFIX_FRAMING,
+    NEWLINE_FRAMING,
+    MessageReader,
+    encode_message,
+    read_stream_message
+)
+from message import PLAYER_ACTION
+
+
+class TestMessageReader(unittest.TestCase):
+    def setUp(self):
+        self.server_side, self.client_side = socket.socketpair()
+
+    def tearDown(self):
+        self.server_side.close()
+        self.client_side.close()
+
+    def test_pipelined_messages_in_one_segment(self):
+        reader = MessageReader(self.server_side)
+        first = PLAYER_ACTION(1, 3, 0).serialize()
+        second = PLAYER_ACTION(1, 2, 0).serialize()
+        self.client_side.sendall(encode_message(first) + encode_message(second))
+        self.assertEqual(reader.read_message(1), first)
+        # Second message is served from the buffer
+        self.assertEqual(reader.pop_message(), second)
+
+    def test_split_message(self):
+        reader = MessageReader(self.server_side)
+        data = encode_message(PLAYER_ACTION(1, 4, 100).serialize())
+        self.client_side.sendall(data[:10])
+        with self.assertRaises(socket.timeout):
+            reader.read_message(0.05)
+        self.client_side.sendall(data[10:])
+        self.assertEqual(PLAYER_ACTION.parse(reader.read_message(1)).message["amount"], 100)
+
+    def test_blank_lines_are_skipped(self):
+        reader = MessageReader(self.server_side)
+        self.client_side.sendall(b"\n\r\n" + encode_message("hello"))
+        self.assertEqual(reader.read_message(1), "hello")
+
+    def test_eof_returns_empty(self):
+        reader = MessageReader(self.server_side)
+        self.client_side.sendall(encode_message("last"))
+        self.client_side.close()
+        self.assertEqual(reader.read_message(1), "last")
+        self.assertEqual(reader.read_message(1), "")
+
+    def test_length_prefixed(self):
+        reader = MessageReader(self.server_side, LENGTH_PREFIX_FRAMING)
+        large = "x" * 100000 + "\n" + "y"
+        self.client_side.sendall(encode_message(large, LENGTH_PREFIX_FRAMING) + encode_message("small", LENGTH_PREFIX_FRAMING))
+        self.assertEqual(reader.read_message(1), large)
+        self.assertEqual(reader.read_message(1), "small")
+
+    def test_oversized_message_rejected(self):
+        reader = MessageReader(self.server_side, max_message_size=16)
+        self.client_side.sendall(b"x" * 64)
+        with self.assertRaises(ValueError):
+            reader.read_message(1)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            MessageReader(self.server_side, "xml")
+
+
+class TestReadStreamMessage(unittest.TestCase):
+    def read_all(self, data, framing):
+        async def scenario():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            messages = []
+            while True:
+                message = await read_stream_message(reader, framing)
+                if message == "":
+                    return messages
+                messages.append(message)
+        return asyncio.run(scenario())
+
+    def test_newline(self):
+        data = encode_message("a") + b"\n" + encode_message("b")
+        self.assertEqual(self.read_all(data, NEWLINE_FRAMING), ["a", "b"])
+
+    def test_length_prefixed(self):
+        data = encode_message("a\nb", LENGTH_PREFIX_FRAMING) + encode_message("c", LENGTH_PREFIX_FRAMING)
+        self.assertEqual(self.read_all(data, LENGTH_PREFIX_FRAMING), ["a\nb", "c"])
+
+    def test_truncated_length_prefixed(self):
+        data = encode_message("abcdef", LENGTH_PREFIX_FRAMING)[:-2]
+        self.assertEqual(self.read_all(data, LENGTH_PREFIX_FRAMING), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from deck import np
+from game.batch import BatchSimulator
+from game.hand_store import HandStore, HandStoreReader, game_key
+from bots import call_bot, raise_bot
+
+
+class TestHandStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_games(self, num_games, batch_size=4):
+        store = HandStore(self.directory, batch_size=batch_size)
+        sim = BatchSimulator({1: raise_bot, 2: call_bot, 3: call_bot}, write_logs=True, seed=3, log_sink=store)
+        logs = []
+        with sim.output_context():
+            for _ in range(num_games):
+                sim.play_next_game()
+                logs.append(json.loads(json.dumps(sim.game.json_game_log)))
+        store.close()
+        return logs
+
+    def test_lookup_by_sequence_and_game_id(self):
+        logs = self.run_games(10)
+        with HandStoreReader(self.directory) as store:
+            self.assertEqual(len(store), 10)
+            self.assertEqual(store.get(1), logs[0])
+            self.assertEqual(store.get(7), logs[6])
+            self.assertIsNone(store.get(11))
+            self.assertEqual(store.find(logs[4]['gameId']), [logs[4]])
+            self.assertEqual(store.find("not-a-game"), [])
+            self.assertEqual(store.read_range(2, 6), logs[2:6])
+            self.assertEqual(store.read_range(8, 50), logs[8:])
+
+            entry = store.entry(3)
+            self.assertEqual((entry.game_key, entry.game_sequence), (game_key(logs[3]['gameId']), 4))
+            scores = logs[3]['playerMoney']['gameScores']
+            self.assertEqual(entry.deltas, {int(player): score for player, score in scores.items()})
+            self.assertEqual(sum(entry.deltas.values()), 0)
+
+    def test_reopened_store_appends_and_drops_unindexed_lines(self):
+        logs = self.run_games(3)
+        with open(os.path.join(self.directory, "hands.jsonl"), 'ab') as f:
+            f.write(b'{"gameId": "torn')  # A crash between the log and the index write
+
+        store = HandStore(self.directory)
+        store.write({"gameId": "extra", "playerMoney": {"gameScores": {"9": 5}}}, 42)
+        store.close()
+        with HandStoreReader(self.directory) as store:
+            self.assertEqual(store.read_range(0, 4), logs + [{"gameId": "extra", "playerMoney": {"gameScores": {"9": 5}}}])
+            # Sequences aren't contiguous any more, the lookup falls back to a scan
+            self.assertEqual(store.get(42)["gameId"], "extra")
+            self.assertEqual(store.get(2), logs[1])
+            self.assertEqual(store.entry(3).deltas, {9: 5})
+
+    def test_too_many_players_for_the_index(self):
+        store = HandStore(self.directory, player_slots=2)
+        with self.assertRaises(ValueError):
+            store.write({"gameId": "x", "playerMoney": {"gameScores": {"1": 0, "2": 0, "3": 0}}})
+        store.close()
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_index_array(self):
+        logs = self.run_games(6)
+        with HandStoreReader(self.directory) as store:
+            index = store.index_array()
+        self.assertEqual(index['game_sequence'].tolist(), list(range(1, 7)))
+        self.assertEqual(index['slots']['delta'].sum(), 0)
+        totals = {}
+        for log in logs:
+            for player, score in log['playerMoney']['gameScores'].items():
+                totals[int(player)] = totals.get(int(player), 0) + score
+        ids = index['slots']['player_id'][0][:3].tolist()
+        self.assertEqual(dict(zip(ids, index['slots']['delta'].sum(axis=0)[:3].tolist())), totals)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import random
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import eval7
+
+from deck import CARDS, card_code
+from game.batch import BatchSimulator
+from game.hand_strength import HandStrengthCache, canonical_key, representative_hand
+from bots import call_bot
+
+
+def cards(text):
+    return [eval7.Card(card) for card in text.split()]
+
+
+class TestHandStrengthCache(unittest.TestCase):
+    def test_matches_eval7(self):
+        cache = HandStrengthCache()
+        rng = random.Random(4)
+        for size in (5, 6, 7):
+            for _ in range(3000):
+                hand = rng.sample(CARDS, size)
+                self.assertEqual(cache.evaluate(hand), eval7.evaluate(hand), hand)
+
+    def test_suit_isomorphic_hands_share_an_entry(self):
+        cache = HandStrengthCache()
+        self.assertEqual(cache.evaluate(cards("As Ad 2h 3s 4d 7c 9h")), cache.evaluate(cards("Ah Ac 2s 3d 4c 7h 9s")))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+
+        # Suits of the cards outside a flush don't matter, the flush ranks do
+        flush = cards("Ah Kh 9h 5h 2h")
+        self.assertEqual(canonical_key([card_code(c) for c in flush + cards("3c 3d")]),
+                         canonical_key([card_code(c) for c in flush + cards("3s 3d")]))
+        self.assertNotEqual(canonical_key([card_code(c) for c in cards("Ah Kh 9h 5h 2c 3h 3d")]),
+                            canonical_key([card_code(c) for c in cards("Ah Kh 9h 5h 2h 3c 3d")]))
+
+    def test_representative_hand_has_the_same_key(self):
+        for hand in (cards("As Ad Ah Ac Ks Kd Kh"), cards("2c 3c 4c 5c 6c 6d 6h"), cards("Ts Js Qs Ks As 9s 8s")):
+            key = canonical_key([card_code(c) for c in hand])
+            self.assertEqual(canonical_key([card_code(c) for c in representative_hand(key)]), key)
+
+    def test_bounded_and_clear(self):
+        cache = HandStrengthCache(maxsize=8)
+        rng = random.Random(5)
+        for _ in range(100):
+            cache.evaluate(rng.sample(CARDS, 7))
+        self.assertEqual(len(cache), 8)
+        cache.clear()
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 0, 0))
+
+    def test_games_with_cache_score_the_same(self):
+        bots = {1: call_bot, 2: call_bot, 3: call_bot}
+        cache = HandStrengthCache()
+        plain = BatchSimulator(bots, seed=9)
+        cached = BatchSimulator(bots, seed=9, hand_cache=cache)
+        self.assertEqual(plain.run(20), cached.run(20))
+        self.assertGreater(cache.misses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import unittest
+import zlib
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game.batch import BatchSimulator
+from game.log_sink import BackgroundLogWriter, GzipJsonlSink, JsonFileSink, JsonlSink, LogSink, read_game_logs, read_jsonl
+from bots import call_bot
+
+
+class GatedSink(LogSink):
+    """Records what it is given, write() waits until the gate is opened"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.written = []
+
+    def write(self, game_log, game_sequence=None):
+        self.started.set()
+        self.gate.wait()
+        self.written.append(game_sequence)
+
+
+class TestLogSinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_games(self, sink, num_games):
+        sim = BatchSimulator({1: call_bot, 2: call_bot, 3: call_bot}, write_logs=True, seed=1, log_sink=sink)
+        logs = []
+        with sim.output_context():
+            for _ in range(num_games):
+                sim.play_next_game()
+                logs.append(json.loads(json.dumps(sim.game.json_game_log)))
+        return sim, logs
+
+    def test_sink_without_write_fails_on_creation(self):
+        class NoWriteSink(LogSink):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoWriteSink()
+
+    def test_json_file_sink_keeps_the_per_game_files(self):
+        _, logs = self.run_games(JsonFileSink(self.directory), 3)
+        names = sorted(os.listdir(self.directory))
+        self.assertEqual(names, sorted(f"game_log_{i}_{log['gameId']}.json" for i, log in enumerate(logs, 1)))
+        with open(os.path.join(self.directory, names[0])) as f:
+            self.assertIn('\n  "gameId"', f.read())  # Still indented
+
+    def test_jsonl_sink_batches_and_flushes(self):
+        sink = JsonlSink(self.directory, batch_size=4)
+        sim, logs = self.run_games(sink, 3)
+        # run() wasn't used, so nothing forced a flush yet and the batch isn't full
+        self.assertEqual(os.listdir(self.directory), [])
+        sink.flush()
+        self.assertEqual(list(read_jsonl(sink.path)), logs)
+
+        with open(sink.path) as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+        sink.close()
+
+    def test_jsonl_sink_rotates(self):
+        sink = JsonlSink(self.directory, prefix="logs", max_bytes=1, batch_size=2)
+        _, logs = self.run_games(sink, 3)
+        sink.close()
+        # Every record is bigger than max_bytes, so each gets a file of its own
+        self.assertEqual(sorted(os.listdir(self.directory)), ["logs_00000.jsonl", "logs_00001.jsonl", "logs_00002.jsonl"])
+        read_back = [log for name in sorted(os.listdir(self.directory)) for log in read_jsonl(os.path.join(self.directory, name))]
+        self.assertEqual(read_back, logs)
+
+        # A new sink continues after the existing files
+        sink = JsonlSink(self.directory, prefix="logs")
+        sink.write({"gameId": "x"})
+        sink.close()
+        self.assertEqual(list(read_jsonl(os.path.join(self.directory, "logs_00003.jsonl"))), [{"gameId": "x"}])
+
+    def test_gzip_sink_rotates_by_game_count(self):
+        sink = GzipJsonlSink(self.directory, max_games=2, batch_size=3)
+        _, logs = self.run_games(sink, 5)
+        sink.close()
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ["game_logs_00000.jsonl.gz", "game_logs_00001.jsonl.gz", "game_logs_00002.jsonl.gz"])
+        with gzip.open(os.path.join(self.directory, "game_logs_00001.jsonl.gz"), 'rt') as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+
+        read_back = list(read_game_logs(self.directory))
+        self.assertEqual(read_back, logs)
+        for field in ('rounds', 'playerHands', 'finalBoard', 'playerMoney', 'sidePots'):
+            self.assertIn(field, read_back[0])
+
+    def test_read_game_logs_orders_files_by_number(self):
+        for name, game_id in (("game_logs_00010.jsonl", 10), ("game_logs_00002.jsonl.gz", 2), ("game_logs_notes.jsonl", "ignored")):
+            line = json.dumps({"gameId": game_id}) + "\n"
+            with (gzip.open if name.endswith('.gz') else open)(os.path.join(self.directory, name), 'wt') as f:
+                f.write(line)
+        self.assertEqual([log["gameId"] for log in read_game_logs(self.directory)], [2, 10])
+
+    def test_run_flushes_the_sink(self):
+        sink = JsonlSink(self.directory)
+        sim = BatchSimulator({1: call_bot, 2: call_bot}, write_logs=True, seed=1, log_sink=sink)
+        sim.run(5)
+        self.assertEqual(len(list(read_jsonl(sink.path))), 5)
+        sink.close()
+
+
+    def test_background_writer_flush_writes_every_game(self):
+        writer = BackgroundLogWriter(JsonlSink(self.directory, batch_size=1000), max_pending=2)
+        _, logs = self.run_games(writer, 6)
+        result_path = os.path.join(self.directory, "game_result.log")
+        writer.append_line(result_path, "GAME_6 {}")
+        writer.flush()  # Nothing left in the JsonlSink buffer or the queue
+
+        self.assertEqual(list(read_jsonl(os.path.join(self.directory, "game_logs_00000.jsonl"))), logs)
+        with open(result_path) as f:
+            self.assertEqual(f.read(), "GAME_6 {}\n")
+        self.assertEqual((writer.written, writer.dropped), (7, 0))
+        writer.close()
+        self.assertFalse(writer.thread.is_alive())
+        with self.assertRaises(ValueError):
+            writer.write({})
+
+    def test_background_writer_keeps_the_sink_batches(self):
+        sink = GzipJsonlSink(self.directory, batch_size=4)
+        writer = BackgroundLogWriter(sink)
+        logs = []
+        for sequence in range(10):
+            log = {"gameId": str(sequence)}
+            writer.write(log, sequence)
+            writer.queue.join()  # One hand at a time, the queue runs empty after each
+            logs.append(log)
+        self.assertEqual(len(sink.pending), 2)  # The last two wait for a full batch
+        writer.close()
+
+        path = os.path.join(self.directory, "game_logs_00000.jsonl.gz")
+
+        self.assertEqual(list(read_jsonl(path)), logs)
+        with open(path, 'rb') as f:
+            data = f.read()
+        members = 0
+        while data:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            decompressor.decompress(data)
+            data = decompressor.unused_data
+            members += 1
+        self.assertEqual(members, 3)  # Two full batches and the rest on close
+
+    def test_background_writer_drops_when_full(self):
+        sink = GatedSink()
+        writer = BackgroundLogWriter(sink, max_pending=2, block=False)
+        writer.write({}, 1)
+        sink.started.wait()  # The writer thread holds game 1, the queue is empty again
+        for sequence in range(2, 6):
+            writer.write({}, sequence)
+        self.assertEqual(writer.dropped, 2)
+
+        sink.gate.set()
+        writer.close()
+        self.assertEqual(sink.written, [1, 2, 3])
+
+    def test_background_writer_blocks_when_full(self):
+        sink = GatedSink()
+        writer = BackgroundLogWriter(sink, max_pending=1)
+        writer.write({}, 1)
+        sink.started.wait()
+        writer.write({}, 2)
+        producer = threading.Thread(target=writer.write, args=({}, 3))
+        producer.start()
+        producer.join(0.05)
+        self.assertTrue(producer.is_alive())  # Waiting for room in the queue
+
+        sink.gate.set()
+        producer.join()
+        writer.flush()
+        self.assertEqual((sink.written, writer.dropped), ([1, 2, 3], 0))
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
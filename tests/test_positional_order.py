@@ -6,6 +6,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from game.game import Game
+from poker_type.game import PokerAction
 
 class TestPositionalOrder(unittest.TestCase):
     """Test cases for positional ordering in poker games"""
@@ -240,5 +241,24 @@ class TestPositionalOrder(unittest.TestCase):
             self.assertEqual(preflop_order[5], self.game.big_blind_player,
                             f"Big blind should act last in preflop with dealer at position {dealer_pos}")
 
+    def test_seat_masks_follow_folds(self):
+        """Folded players leave the active seat mask, order queries skip them and unknown ids"""
+        for player_id in self.players_6:
+            self.game.add_player(player_id)
+        self.game.set_dealer_button_position(4)
+        self.game.start_game()
+
+        folded = self.players_6[5]
+        self.game.update_game(folded, (PokerAction.FOLD, 0))
+        self.assertFalse(self.game.is_active(folded))
+        self.assertTrue(self.game.is_active(self.players_6[0]))
+        self.assertFalse(self.game.is_active(12345))
+        self.assertEqual(self.game.active_mask, 0b011111)
+
+        order = self.game.get_positional_order(self.game.active_players + [12345])
+        self.assertEqual(order, [self.players_6[4], self.players_6[0], self.players_6[1], self.players_6[2], self.players_6[3]])
+        with self.assertRaises(ValueError):
+            self.game.update_game(folded, (PokerAction.CHECK, 0))
+
 if __name__ == '__main__':
     unittest.main(verbosity=2) 
\ No newline at end of file
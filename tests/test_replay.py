@@ -0,0 +1,81 @@
+import json
+import random
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from deck import PokerDeck
+from game.batch import BatchSimulator
+from game.game import Game
+from game.replay import replay_game
+from poker_type.game import PokerAction
+
+
+def random_bot(player_id, hand, state):
+    to_call = state.current_bet - state.player_bets.get(player_id, 0)
+    choice = random.random()
+    if choice < 0.1:
+        return (PokerAction.FOLD, 0)
+    if choice < 0.15:
+        return (PokerAction.ALL_IN, 10 ** 9)
+    if choice < 0.35:
+        return (PokerAction.RAISE, to_call + random.randint(1, 100))
+    return (PokerAction.CALL, 0) if to_call > 0 else (PokerAction.CHECK, 0)
+
+
+def dealt_cards(seed):
+    deck = PokerDeck(seed)
+    deck.shuffle()
+    return [str(card) for card in deck.deal(9)]
+
+
+class TestSeededDeck(unittest.TestCase):
+    def test_same_seed_same_cards(self):
+        self.assertEqual(dealt_cards(42), dealt_cards(42))
+        self.assertNotEqual(dealt_cards(42), dealt_cards(43))
+
+    def test_seed_is_drawn_and_logged_when_missing(self):
+        game = Game(write_log=False)
+        game.add_player(1)
+        game.add_player(2)
+        game.start_game()
+        self.assertEqual(game.json_game_log["seed"], game.deck.seed)
+        self.assertEqual(dealt_cards(game.deck.seed)[:4], [str(c) for hand in game.hands.values() for c in hand])
+
+    def test_batch_seed_deals_same_hands(self):
+        def hands(seed):
+            sim = BatchSimulator({1: random_bot, 2: random_bot}, seed=seed)
+            random.seed(0)
+            sim.run(5)
+            return sim.game.json_game_log["playerHands"], sim.game.json_game_log["seed"]
+
+        self.assertEqual(hands(7), hands(7))
+        self.assertNotEqual(hands(7), hands(8))
+
+
+class TestReplay(unittest.TestCase):
+    def test_replays_logged_hands(self):
+        random.seed(5)
+        sim = BatchSimulator({1: random_bot, 2: random_bot, 3: random_bot, 4: random_bot}, initial_money=1000, seed=3)
+        with sim.output_context():
+            for _ in range(40):
+                scores = sim.play_next_game()
+                game = sim.game
+                game._materialize_action_sequences()
+                game_log = json.loads(json.dumps(game.json_game_log))
+
+                replayed = replay_game(game_log)
+                self.assertEqual(replayed.score, scores)
+                self.assertEqual([str(card) for card in replayed.board], game_log["finalBoard"])
+                for player_id in replayed.players:
+                    if str(player_id - 1) not in game_log["playerHands"]:
+                        self.assertFalse(replayed.is_active(player_id))  # Couldn't afford the big blind
+
+    def test_rejects_log_without_seed(self):
+        with self.assertRaises(ValueError):
+            replay_game({"blinds": {"small": 5, "big": 10}, "rounds": {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
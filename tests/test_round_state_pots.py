@@ -0,0 +1,192 @@
+import random
+import unittest
+from unittest import mock
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game.game import Game
+from game.round_state import Pot, RoundState
+from poker_type.game import PokerAction
+
+
+def reference_side_pots(round_state):
+    """Side pots recomputed from scratch, as (amount, eligible players) pairs"""
+    active_players = {p for p, a in round_state.player_actions.items() if a != PokerAction.FOLD}
+    total = sum(round_state.player_bets.values())
+    if len(active_players) <= 1:
+        return [(total, active_players)]
+
+    levels = sorted(set(bet for bet in round_state.player_bets.values() if bet > 0))
+    if len(levels) <= 1:
+        return [(total, active_players)]
+
+    pots = []
+    prev_level = 0
+    for level in levels:
+        contributors = [p for p, bet in round_state.player_bets.items() if bet >= level]
+        eligible = {p for p in contributors if p in active_players}
+        pots.append(((level - prev_level) * len(contributors), eligible))
+        prev_level = level
+    return pots
+
+
+def as_pairs(round_state):
+    return [(pot.amount, set(pot.eligible_players)) for pot in round_state.pots]
+
+
+class TestIncrementalPots(unittest.TestCase):
+    def play_random_round(self, rng, players):
+        round_state = RoundState(players)
+        round_state.post_forced_blind(players[0], PokerAction.RAISE, 5)
+        round_state.post_forced_blind(players[1], PokerAction.RAISE, 10)
+        while not round_state.is_round_complete():
+            player_id = rng.choice(sorted(round_state.waiting_for))
+            to_call = round_state.raise_amount - round_state.player_bets[player_id]
+            choice = rng.random()
+            if choice < 0.15:
+                round_state.update_player_action(player_id, PokerAction.FOLD)
+            elif choice < 0.3:
+                round_state.update_player_action(player_id, PokerAction.ALL_IN, rng.randint(1, 200))
+            elif choice < 0.45 and round_state.raise_amount < 500:
+                round_state.update_player_action(player_id, PokerAction.RAISE, to_call + rng.randint(1, 50))
+            elif to_call > 0:
+                round_state.update_player_action(player_id, PokerAction.CALL)
+            elif round_state.bettor is None or round_state.bettor == player_id:
+                round_state.update_player_action(player_id, PokerAction.CHECK)
+            else:
+                round_state.update_player_action(player_id, PokerAction.CALL)
+
+            self.assertEqual(round_state.pot, sum(round_state.player_bets.values()))
+            self.assertEqual(round_state.pot, sum(pot.amount for pot in round_state.pots))
+            if len(set(b for b in round_state.player_bets.values() if b > 0)) > 1:
+                self.assertEqual(as_pairs(round_state), reference_side_pots(round_state))
+        return round_state
+
+    def test_matches_full_recalculation(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            players = list(range(1, rng.randint(2, 6) + 1))
+            round_state = self.play_random_round(rng, players)
+            self.assertEqual(as_pairs(round_state), reference_side_pots(round_state))
+
+    def test_ordinary_actions_patch_side_pots(self):
+        round_state = RoundState([1, 2, 3, 4])
+        round_state.post_forced_blind(1, PokerAction.RAISE, 5)
+        round_state.post_forced_blind(2, PokerAction.RAISE, 10)
+        with mock.patch.object(RoundState, '_create_side_pots', autospec=True,
+                               side_effect=RoundState._create_side_pots) as rebuild:
+            round_state.update_player_action(3, PokerAction.CALL)
+            round_state.update_player_action(4, PokerAction.RAISE, 30)
+            round_state.update_player_action(1, PokerAction.FOLD)
+            round_state.update_player_action(2, PokerAction.CALL)
+            self.assertEqual(rebuild.call_count, 0)
+            self.assertEqual(as_pairs(round_state), reference_side_pots(round_state))
+
+            # An all-in between the existing levels splits a pot, so everything is rebuilt
+            round_state.update_player_action(3, PokerAction.ALL_IN, 10)
+            self.assertEqual(rebuild.call_count, 1)
+        self.assertEqual(as_pairs(round_state), reference_side_pots(round_state))
+
+    def test_patched_pots_keep_eligible_order(self):
+        # Eligible sets end up in the logs as lists; patching must not reorder them
+        rng = random.Random(11)
+        for _ in range(100):
+            players = rng.sample(range(1, 2 ** 32), rng.randint(2, 6))
+            round_state = self.play_random_round(rng, players)
+            rebuilt = round_state.copy()
+            rebuilt._side_pots_current = False
+            rebuilt._create_side_pots()
+            self.assertEqual([(pot.amount, list(pot.eligible_players)) for pot in round_state.pots],
+                             [(pot.amount, list(pot.eligible_players)) for pot in rebuilt.pots])
+
+    def test_repeated_completion_checks_keep_pots(self):
+        round_state = RoundState([1, 2, 3])
+        round_state.update_player_action(1, PokerAction.ALL_IN, 50)
+        round_state.update_player_action(2, PokerAction.RAISE, 100)
+        round_state.update_player_action(3, PokerAction.CALL)
+        self.assertTrue(round_state.is_round_complete())
+        first = round_state.pots
+        self.assertTrue(round_state.is_round_complete())
+        self.assertIs(round_state.pots, first)
+        self.assertEqual(as_pairs(round_state), [(150, {1, 2, 3}), (100, {2, 3})])
+
+    def test_raise_reopens_action_for_players_still_in(self):
+        round_state = RoundState([1, 2, 3, 4])
+        round_state.update_player_action(1, PokerAction.FOLD)
+        round_state.update_player_action(2, PokerAction.ALL_IN, 40)
+        round_state.update_player_action(3, PokerAction.CALL)
+        round_state.update_player_action(4, PokerAction.RAISE, 100)
+        self.assertEqual(round_state.waiting_for, {3})
+        self.assertIsNone(round_state.player_actions[3])
+
+    def test_reset_clears_bet_levels(self):
+        round_state = RoundState([1, 2])
+        round_state.update_player_action(1, PokerAction.RAISE, 30)
+        round_state.update_player_action(2, PokerAction.CALL)
+        round_state.reset_for_next_round([1, 2])
+        self.assertEqual(round_state.pot, 0)
+        round_state.update_player_action(1, PokerAction.RAISE, 20)
+        self.assertEqual(as_pairs(round_state), [(20, {1, 2})])
+
+
+class TestCumulativePots(unittest.TestCase):
+    def test_records_share_completed_round_pots(self):
+        game = Game(write_log=False)
+        for player_id in (1, 2, 3):
+            game.add_player(player_id)
+        game.start_game()
+        game.update_game(1, (PokerAction.RAISE, 50))
+        game.update_game(2, (PokerAction.RAISE, 100))
+        game.update_game(3, (PokerAction.CALL, 0))
+        game.update_game(1, (PokerAction.CALL, 0))
+        game.end_round()
+        self.assertEqual(game.cumulative_pot, 300)
+        preflop_pots = game.cumulative_side_pots
+        self.assertEqual([(p["id"], p["amount"]) for p in preflop_pots], [(0, 300)])
+
+        game.start_round()
+        game.update_game(1, (PokerAction.CHECK, 0))
+        game.update_game(2, (PokerAction.RAISE, 40))
+        game.update_game(3, (PokerAction.CALL, 0))
+        records = game.current_round.action_history
+        self.assertTrue(all(record.cumulative_side_pots_base is preflop_pots for record in records))
+        self.assertEqual(records[-1].total_pot_after_action, 380)
+        self.assertEqual([(p["id"], p["amount"]) for p in records[-1].total_side_pots_after_action],
+                         [(0, 300), (1, 80)])
+
+        game.update_game(1, (PokerAction.FOLD, 0))
+        game.end_round()
+        self.assertEqual([(p["id"], p["amount"]) for p in game.cumulative_side_pots], [(0, 300), (1, 80)])
+        self.assertEqual(len(preflop_pots), 1)  # Earlier records are not affected
+
+
+class TestCompactState(unittest.TestCase):
+    def test_state_objects_have_no_instance_dict(self):
+        game = Game(write_log=False)
+        game.add_player(1)
+        game.add_player(2)
+        game.start_game()
+        game.update_game(1, (PokerAction.RAISE, 20))
+        record = game.current_round.action_history[0]
+        for obj in (game, game.current_round, game.current_round.pots[0], record):
+            self.assertFalse(hasattr(obj, '__dict__'), type(obj).__name__)
+        with self.assertRaises(AttributeError):
+            game.not_an_attribute = 1
+
+    def test_final_pots_are_pot_instances(self):
+        game = Game(write_log=False)
+        for player_id in (1, 2, 3):
+            game.add_player(player_id)
+        game.start_game()
+        game.update_game(1, (PokerAction.ALL_IN, 30))
+        game.update_game(2, (PokerAction.RAISE, 60))
+        game.update_game(3, (PokerAction.CALL, 0))
+        game.end_round()
+        pots = game._calculate_cumulative_side_pots()
+        self.assertTrue(all(type(pot) is Pot for pot in pots))
+        self.assertEqual([(pot.amount, pot.eligible_players) for pot in pots], [(90, {1, 2, 3}), (60, {2, 3})])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import eval7
+
+from game.round_state import Pot
+from game.showdown import evaluate_hands, pot_winners, rank_hands, resolve_pots
+
+
+def cards(text):
+    return [eval7.Card(card) for card in text.split()]
+
+
+class TestShowdown(unittest.TestCase):
+    def setUp(self):
+        self.board = cards("2h 3s 4d 7c 9h")
+        self.hands = {
+            1: cards("As Ad"),  # Pair of aces
+            2: cards("Ks Kd"),  # Pair of kings
+            3: cards("Ac Ah"),  # Pair of aces, ties with player 1
+            4: cards("Qh Jc"),  # High card
+        }
+
+    def test_rank_hands(self):
+        ranks = rank_hands(evaluate_hands(self.hands, self.board, [1, 2, 3, 4]))
+        self.assertEqual(ranks, {1: 0, 2: 1, 3: 0, 4: 2})
+
+    def test_pot_winners_follow_eligible_order(self):
+        ranks = {1: 0, 2: 1, 3: 0}
+        eligible = {3, 1, 2}
+        self.assertEqual(pot_winners(eligible, ranks), [p for p in eligible if p != 2])
+        self.assertEqual(pot_winners(set(), ranks), [])
+
+    def test_resolve_side_pots(self):
+        ranks = rank_hands(evaluate_hands(self.hands, self.board, [1, 2, 4]))
+        pots = [Pot(150, {1, 2, 4}), Pot(101, {2, 4}), Pot(0, {2}), Pot(40, {3})]
+        awards = resolve_pots(pots, ranks, [1, 2, 4])
+        self.assertEqual([(a.amount, a.winners, a.share, a.remainder) for a in awards],
+                         [(150, [1], 150, 0), (101, [2], 101, 0)])
+
+    def test_split_pot_remainder(self):
+        ranks = rank_hands(evaluate_hands(self.hands, self.board, [1, 3]))
+        (award,) = resolve_pots([Pot(101, {1, 3})], ranks, [1, 3])
+        self.assertEqual((award.share, award.remainder, sorted(award.winners)), (50, 1, [1, 3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import contextlib
+import copy
+import io
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game.game import Game
+from poker_type.game import PokerAction
+
+
+def call_or_check(game, player_id):
+    if game.current_round.bettor in (None, player_id):
+        return (PokerAction.CHECK, 0)
+    return (PokerAction.CALL, 0)
+
+
+def fold_on_flop(game, player_id):
+    if game.round_index == 1 and player_id == 1:
+        return (PokerAction.FOLD, 0)
+    return call_or_check(game, player_id)
+
+
+def play_out(game, choose):
+    """Finish the hand with the same flow as BatchSimulator, return the scores and the log"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        while True:
+            if len(game.active_players) == 1 or (game.is_current_round_complete() and game.is_game_over()):
+                if game.is_running:
+                    game.end_game()
+                game._materialize_action_sequences()
+                return dict(game.get_final_score()), strip_timestamps(game.json_game_log)
+
+            while not game.is_current_round_complete():
+                waiting_for = game.get_current_waiting_for()
+                if game.round_index == 0:
+                    queue = game.get_preflop_order(list(waiting_for))
+                else:
+                    queue = game.get_positional_order(list(waiting_for))
+                for player_id in queue:
+                    game.update_game(player_id, choose(game, player_id))
+
+            game.end_round()
+            if game.is_all_in_runout():
+                game.run_out_board()
+            else:
+                game.start_round()
+
+
+def strip_timestamps(game_log):
+    game_log = copy.deepcopy(game_log)
+    for round_log in game_log["rounds"].values():
+        round_log.pop("actionTimes")
+        for action in round_log["action_sequence"]:
+            action.pop("timestamp")
+    return game_log
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(write_log=False, seed=21)
+        for player_id in (1, 2, 3):
+            self.game.add_player(player_id)
+        self.game.small_blind_player = 2
+        self.game.big_blind_player = 3
+        self.game.start_game()
+        self.game.post_blinds()
+        self.game.update_game(1, (PokerAction.RAISE, 30))
+
+    def test_restore_replays_the_same_branch(self):
+        snapshot = self.game.snapshot()
+        first = play_out(self.game, call_or_check)
+
+        self.game.restore(snapshot)
+        other = play_out(self.game, fold_on_flop)
+        self.assertNotEqual(other[0], first[0])
+
+        # The snapshot is still valid after being restored once
+        self.game.restore(snapshot)
+        self.assertTrue(self.game.is_running)
+        self.assertEqual(self.game.round_index, 0)
+        self.assertEqual(play_out(self.game, call_or_check), first)
+
+    def test_snapshot_is_independent_of_the_game(self):
+        snapshot = self.game.snapshot()
+        pot = self.game.current_round.pot
+        pot_amounts = [p.amount for p in self.game.current_round.pots]
+        next_cards = self.game.deck.peek(5)
+
+        self.game.update_game(2, (PokerAction.CALL, 0))
+        self.game.deck.deal(3)
+        self.game.restore(snapshot)
+
+        self.assertEqual(self.game.current_round.pot, pot)
+        self.assertEqual([p.amount for p in self.game.current_round.pots], pot_amounts)
+        self.assertEqual(self.game.current_round.waiting_for, {2, 3})
+        self.assertEqual(len(self.game.current_round.action_history), 3)
+        self.assertEqual(self.game.deck.peek(5), next_cards)
+
+    def test_restored_game_matches_an_unbranched_game(self):
+        reference = Game(write_log=False, seed=21)
+        for player_id in (1, 2, 3):
+            reference.add_player(player_id)
+        reference.small_blind_player = 2
+        reference.big_blind_player = 3
+        reference.start_game()
+        reference.post_blinds()
+        reference.update_game(1, (PokerAction.RAISE, 30))
+
+        snapshot = self.game.snapshot()
+        play_out(self.game, fold_on_flop)
+        self.game.restore(snapshot)
+        result = play_out(self.game, call_or_check)
+        expected = play_out(reference, call_or_check)
+        self.assertEqual(result[0], expected[0])
+        self.assertEqual({k: v for k, v in result[1].items() if k != "gameId"},
+                         {k: v for k, v in expected[1].items() if k != "gameId"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game.tournament import (
+    MatchSpec,
+    TournamentResult,
+    build_schedule,
+    merge_results,
+    run_match,
+    run_tournament,
+    shard
+)
+from bots import call_bot, fold_bot
+
+
+BOTS = {"caller": call_bot, "folder": fold_bot, "caller2": call_bot}
+
+
+class TestSchedule(unittest.TestCase):
+    def test_build_schedule_cycles_permutations(self):
+        specs = build_schedule(["a", "b"], 4, 10, base_seed=100, blind_amount=20)
+        self.assertEqual([spec.seats for spec in specs], [["a", "b"], ["b", "a"], ["a", "b"], ["b", "a"]])
+        self.assertEqual([spec.seed for spec in specs], [100, 101, 102, 103])
+        self.assertTrue(all(spec.blind_amount == 20 for spec in specs))
+
+    def test_invalid_table_size(self):
+        with self.assertRaises(ValueError):
+            build_schedule(["a", "b"], 1, 1, seats_per_table=3)
+
+    def test_shards_cover_schedule(self):
+        specs = build_schedule(["a", "b", "c"], 10, 1)
+        shards = [shard(specs, 3, i) for i in range(3)]
+        self.assertEqual(sorted(spec.seed for s in shards for spec in s), list(range(10)))
+
+
+class TestTournamentResult(unittest.TestCase):
+    def test_merge_and_round_trip(self):
+        a = TournamentResult({"x": 10, "y": -10}, {"x": 5, "y": 5}, 1)
+        b = TournamentResult({"x": -4, "z": 4}, {"x": 2, "z": 2}, 1)
+        merged = merge_results([a, b])
+        self.assertEqual(merged.deltas, {"x": 6, "y": -10, "z": 4})
+        self.assertEqual(merged.games, {"x": 7, "y": 5, "z": 2})
+        self.assertEqual(merged.matches, 2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "result.json")
+            merged.save(path)
+            self.assertEqual(TournamentResult.load(path), merged)
+
+
+class TestRunTournament(unittest.TestCase):
+    def test_run_match_is_zero_sum_and_seeded(self):
+        spec = MatchSpec(["caller", "caller2"], 20, seed=7)
+        first = run_match(BOTS, spec)
+        second = run_match(BOTS, spec)
+        self.assertEqual(sum(first.deltas.values()), 0)
+        self.assertEqual(first, second)
+
+    def test_run_match_leaves_the_random_module_alone(self):
+        random.seed(42)
+        expected_next = random.random()
+        random.seed(42)
+        run_match(BOTS, MatchSpec(["caller", "folder"], 5, seed=7))
+        self.assertEqual(random.random(), expected_next)
+
+    def test_process_pool_matches_inline(self):
+        specs = build_schedule(list(BOTS), 6, 5, seats_per_table=2)
+        inline = run_tournament(BOTS, specs, max_workers=1)
+        pooled = run_tournament(BOTS, specs, max_workers=2, chunksize=2)
+        self.assertEqual(inline, pooled)
+        self.assertEqual(pooled.matches, 6)
+        self.assertLess(pooled.deltas["folder"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()